@@ -0,0 +1,413 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Mesures de performance des chemins critiques du jeu.
+
+Chaque mesure (un « banc ») répète une opération, en micro-banc sur une
+méthode du moteur ou de l'affichage, ou de bout en bout sur des parties
+complètes à graine fixe. Le débit (opérations par seconde) et les centiles
+de la durée d'un appel sont affichés, et peuvent être écrits en JSON puis
+comparés à une référence pour signaler les régressions :
+
+    python benchmark.py --sortie reference.json
+    python benchmark.py --reference reference.json
+
+L'affichage est mesuré avec le pilote vidéo factice de SDL, sans fenêtre.
+"""
+
+import argparse
+import copy
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from constante import DIM_PLATEAU
+from moteur import Moteur, GAUCHE, DROITE, CHUTE
+from plateau import PlateauBits, PlateauCreux, PlateauListe
+from simulation import jouer_partie
+
+# Graine de toutes les parties mesurées, pour des mesures reproductibles
+GRAINE = 1234
+# Dimensions du grand plateau des mesures de passage à l'échelle
+GRAND_PLATEAU = 4000, 4000
+# Hausse relative de la médiane au-delà de laquelle une mesure régresse
+SEUIL = 0.10
+
+BANCS = {}
+
+
+def banc(nom: str):
+    """
+    Enregistre une fonction de mesure dans BANCS sous le nom donné.
+
+    Args:
+        nom (str): Le nom du banc, affiché et utilisé dans le fichier JSON.
+
+    Returns:
+        function: Le décorateur.
+    """
+    def enregistrer(fonction):
+        BANCS[nom] = fonction
+        return fonction
+    return enregistrer
+
+
+def mesurer(fonction, preparer=None, echantillons: int =200, nombre: int =100,
+            operations: int =1):
+    """
+    Mesure la durée d'un appel à une fonction.
+
+    La fonction est appelée nombre fois par échantillon, et la durée d'un
+    appel est la durée de l'échantillon divisée par nombre. La préparation,
+    appelée avant chaque échantillon, n'est pas comptée ; si elle retourne
+    une fonction, c'est celle-ci qui est mesurée pendant l'échantillon.
+
+    Args:
+        fonction (function): La fonction mesurée, sans argument, ou None si
+            preparer la retourne.
+        preparer (function, optional): Une fonction sans argument appelée avant
+            chaque échantillon. Par défaut, aucune.
+        echantillons (int, optional): Le nombre d'échantillons. Par défaut, 200.
+        nombre (int, optional): Le nombre d'appels par échantillon. Par défaut, 100.
+        operations (int, optional): Le nombre d'opérations faites par un
+            appel, pour le débit. Par défaut, 1.
+
+    Returns:
+        dict: Le débit (ops_s, en opérations par seconde) et les durées d'un
+            appel en microsecondes (moyenne, p50, p90, p99, min).
+    """
+    durees = []
+    for _ in range(echantillons):
+        appel = fonction
+        if preparer is not None:
+            appel = preparer() or fonction
+        debut = time.perf_counter_ns()
+        for _ in range(nombre):
+            appel()
+        durees.append((time.perf_counter_ns() - debut) / nombre / 1000)
+    durees.sort()
+    centiles = statistics.quantiles(durees, n=100, method="inclusive")
+    moyenne = statistics.fmean(durees)
+    return {"ops_s": operations * 1e6 / moyenne, "moyenne_us": moyenne, "p50_us": centiles[49],
+            "p90_us": centiles[89], "p99_us": centiles[98], "min_us": durees[0],
+            "echantillons": echantillons, "nombre": nombre, "operations": operations}
+
+
+def moteur_en_cours(plateau=PlateauBits, largeur: int =DIM_PLATEAU[0],
+                    hauteur: int =DIM_PLATEAU[1]):
+    """
+    Crée un moteur au milieu d'une partie, avec des pièces déjà posées.
+
+    Args:
+        plateau (type, optional): La classe de plateau. Par défaut, PlateauBits.
+        largeur (int, optional): Le nombre de colonnes. Par défaut, DIM_PLATEAU[0].
+        hauteur (int, optional): Le nombre de lignes. Par défaut, DIM_PLATEAU[1].
+
+    Returns:
+        Moteur: Le moteur, avec une pièce courante en haut du plateau.
+    """
+    moteur = Moteur(plateau, graine=GRAINE, largeur=largeur, hauteur=hauteur)
+    actions = (GAUCHE, GAUCHE, CHUTE, DROITE, CHUTE, DROITE, DROITE, CHUTE, CHUTE)
+    for i in range(30):
+        moteur.step(actions[i % len(actions)])
+    while moteur.current is not None:
+        moteur.step()
+    moteur.action(GAUCHE)
+    return moteur
+
+
+for _nom, _plateau in (("bits", PlateauBits), ("liste", PlateauListe), ("creux", PlateauCreux)):
+
+    @banc(f"moteur.est_valide.{_nom}")
+    def _banc_est_valide(plateau=_plateau):
+        moteur = moteur_en_cours(plateau)
+        return mesurer(lambda: moteur._est_valide(y=1), nombre=1000)
+
+    @banc(f"moteur.poser_piece.{_nom}")
+    def _banc_poser_piece(plateau=_plateau):
+        depart = moteur_en_cours(plateau)
+        depart.position[1] += depart.drop_distance()
+        depart._calculer_donnees_piece_courante()
+
+        def preparer():
+            return copy.deepcopy(depart)._poser_piece
+        return mesurer(None, preparer, nombre=1)
+
+
+@banc("moteur.poser_piece.zobrist")
+def _banc_poser_piece_zobrist():
+    depart = moteur_en_cours()
+    depart.position[1] += depart.drop_distance()
+    depart._calculer_donnees_piece_courante()
+    # La clé de Zobrist est créée ici, puis tenue à jour par _poser_piece
+    depart.hachage()
+
+    def preparer():
+        return copy.deepcopy(depart)._poser_piece
+    return mesurer(None, preparer, nombre=1)
+
+
+@banc("moteur.est_valide.creux.grand")
+def _banc_est_valide_grand():
+    moteur = moteur_en_cours(PlateauCreux, *GRAND_PLATEAU)
+    return mesurer(lambda: moteur._est_valide(y=1), nombre=1000)
+
+
+@banc("moteur.calculer_donnees_piece_courante")
+def _banc_calculer_donnees():
+    moteur = moteur_en_cours()
+    return mesurer(moteur._calculer_donnees_piece_courante, nombre=1000)
+
+
+@banc("moteur.step")
+def _banc_step():
+    moteur = moteur_en_cours()
+    etat = copy.deepcopy(moteur)
+    actions = iter(range(10 ** 9))
+
+    def preparer():
+        # Chaque échantillon repart du même état, pour ne pas mesurer une partie perdue
+        moteur.__dict__.update(copy.deepcopy(etat).__dict__)
+    return mesurer(lambda: moteur.step(next(actions) % 6), preparer, nombre=100)
+
+
+@banc("vecteur.step.4096")
+def _banc_vecteur_step(nombre: int =4096):
+    # Débit en pas de plateau par seconde : un appel avance toutes les parties,
+    # et les parties perdues recommencent, comme pendant un entraînement
+    import numpy as np
+    from vecteur import MoteurVectoriel
+    vecteur = MoteurVectoriel(nombre, np.arange(GRAINE, GRAINE + nombre))
+    actions = np.random.default_rng(GRAINE).integers(0, 6, (64, nombre))
+    tours = iter(range(10 ** 9))
+
+    def avancer():
+        vecteur.step(actions[next(tours) % len(actions)])
+        vecteur.reset(vecteur.perdu)
+    return mesurer(avancer, echantillons=50, nombre=10, operations=nombre)
+
+
+def _jeu(largeur: int =DIM_PLATEAU[0], hauteur: int =DIM_PLATEAU[1]):
+    """
+    Crée une interface de jeu sur le pilote vidéo factice, sans limite d'images.
+
+    Args:
+        largeur (int, optional): Le nombre de colonnes. Par défaut, DIM_PLATEAU[0].
+        hauteur (int, optional): Le nombre de lignes. Par défaut, DIM_PLATEAU[1].
+
+    Returns:
+        tetris.Jeu: Le jeu, avec un moteur au milieu d'une partie.
+    """
+    from tetris import Jeu
+    jeu = Jeu(largeur, hauteur)
+    jeu.fps = 0
+    jeu.moteur = moteur_en_cours(jeu.moteur.classe_plateau, largeur, hauteur)
+    jeu._dessiner_plateau()
+    return jeu
+
+
+@banc("affichage.dessiner_plateau.complet")
+def _banc_dessiner_complet():
+    jeu = _jeu()
+    return mesurer(jeu._dessiner_plateau, jeu._invalider, nombre=1)
+
+
+@banc("affichage.dessiner_plateau.complet.1080p")
+def _banc_dessiner_complet_1080p():
+    jeu = _jeu()
+    # Fenêtre agrandie : cases de 45 pixels, copiées depuis leurs tuiles
+    jeu.rendu._redimensionner((1920, 1080))
+    jeu._invalider()
+    jeu._dessiner_plateau()
+    return mesurer(jeu._dessiner_plateau, jeu._invalider, nombre=1)
+
+
+@banc("affichage.dessiner_plateau.deplacement")
+def _banc_dessiner_deplacement(dimensions: tuple =DIM_PLATEAU):
+    jeu = _jeu(*dimensions)
+    sens = [GAUCHE, DROITE]
+
+    def deplacer():
+        sens.reverse()
+        jeu.moteur.action(sens[0])
+    return mesurer(jeu._dessiner_plateau, deplacer, echantillons=500, nombre=1)
+
+
+@banc("affichage.dessiner_plateau.deplacement.grand")
+def _banc_dessiner_deplacement_grand():
+    return _banc_dessiner_deplacement(GRAND_PLATEAU)
+
+
+@banc("affichage.dessiner_plateau.veille")
+def _banc_dessiner_veille():
+    jeu = _jeu()
+    return mesurer(jeu._dessiner_plateau, nombre=100)
+
+
+@banc("partie.aleatoire")
+def _banc_partie_aleatoire():
+    graines = iter(range(GRAINE, GRAINE + 10 ** 9))
+    return mesurer(lambda: jouer_partie(next(graines), "aleatoire"), echantillons=100, nombre=10)
+
+
+@banc("partie.ia.100_pieces")
+def _banc_partie_ia():
+    graines = iter(range(GRAINE, GRAINE + 10 ** 9))
+    return mesurer(lambda: jouer_partie(next(graines), "ia", max_pieces=100),
+                   echantillons=10, nombre=1)
+
+
+# Programmes dont le démarrage est mesuré : le jeu jusqu'à sa fenêtre prête,
+# et les outils sans fenêtre, qui ne doivent pas charger Pygame
+DEMARRAGES = {
+    "tetris (Jeu prêt)": "import tetris; tetris.Jeu()",
+    "simulation": "import simulation",
+    "enregistrement": "import enregistrement",
+}
+
+
+def mesurer_demarrage(code: str, repetitions: int =5):
+    """
+    Mesure le démarrage d'un nouveau processus Python qui exécute du code.
+
+    Chaque processus est lancé avec -X importtime : la durée d'import de
+    chaque module est lue sur sa sortie d'erreur.
+
+    Args:
+        code (str): Le code exécuté au démarrage.
+        repetitions (int, optional): Le nombre de processus lancés. Par défaut, 5.
+
+    Returns:
+        tuple: La durée médiane en millisecondes, la durée cumulée médiane
+            d'import de chaque module importé directement par les modules du
+            code (dict, en ms) et True si Pygame a été chargé.
+    """
+    sonde = ("import sys, time; _t = time.perf_counter(); " + code +
+             "; print(time.perf_counter() - _t, 'pygame' in sys.modules)")
+    durees, imports, pygame_charge = [], {}, False
+    for _ in range(repetitions):
+        sortie = subprocess.run([sys.executable, "-X", "importtime", "-c", sonde],
+                                capture_output=True, text=True, check=True,
+                                env=dict(os.environ, SDL_VIDEODRIVER="dummy"))
+        duree, pygame_charge = sortie.stdout.split()[-2:]
+        durees.append(float(duree) * 1000)
+        for ligne in sortie.stderr.splitlines():
+            # « import time: propre | cumulé | nom », indenté de deux espaces par
+            # niveau : seuls les modules importés directement par le code sont gardés
+            champs = ligne.split("|")
+            if (len(champs) == 3 and champs[1].strip().isdigit()
+                    and len(champs[2]) - len(champs[2].lstrip()) == 3):
+                imports.setdefault(champs[2].strip(), []).append(int(champs[1]) / 1000)
+    return (statistics.median(durees),
+            {nom: statistics.median(valeurs) for nom, valeurs in imports.items()},
+            pygame_charge == "True")
+
+
+def rapport_demarrage(repetitions: int =5):
+    """
+    Mesure le démarrage de chaque programme de DEMARRAGES.
+
+    Args:
+        repetitions (int, optional): Le nombre de processus par programme.
+            Par défaut, 5.
+
+    Returns:
+        str: Le rapport : durée de démarrage, chargement de Pygame et modules
+            les plus longs à importer.
+    """
+    lignes = []
+    for nom, code in DEMARRAGES.items():
+        duree, imports, pygame_charge = mesurer_demarrage(code, repetitions)
+        etat_pygame = "chargé" if pygame_charge else "non chargé"
+        lignes.append(f"{nom:25} {duree:8.1f} ms   pygame {etat_pygame}")
+        for module, cumul in sorted(imports.items(), key=lambda m: -m[1])[:6]:
+            lignes.append(f"    {module:30} {cumul:8.1f} ms")
+    return "\n".join(lignes)
+
+
+def comparer(resultats: dict, reference: dict, seuil: float =SEUIL):
+    """
+    Compare des mesures à une référence, sur la médiane de la durée d'un appel.
+
+    Args:
+        resultats (dict): Les mesures, par nom de banc.
+        reference (dict): Les mesures de référence, par nom de banc.
+        seuil (float, optional): La hausse relative tolérée. Par défaut, SEUIL.
+
+    Returns:
+        tuple: Les lignes du rapport (list) et les noms des bancs qui régressent (list).
+    """
+    lignes, regressions = [], []
+    for nom, mesure in resultats.items():
+        if nom not in reference:
+            lignes.append(f"{nom:45} {mesure['p50_us']:12.2f} us   (nouveau)")
+            continue
+        ancien = reference[nom]["p50_us"]
+        rapport = mesure["p50_us"] / ancien if ancien else float("inf")
+        etat = ""
+        if rapport > 1 + seuil:
+            etat = "RÉGRESSION"
+            regressions.append(nom)
+        elif rapport < 1 - seuil:
+            etat = "amélioration"
+        lignes.append(f"{nom:45} {ancien:12.2f} -> {mesure['p50_us']:10.2f} us "
+                      f"{rapport:6.2f}x  {etat}")
+    return lignes, regressions
+
+
+def main():
+    """
+    Lit les options de la ligne de commande, lance les bancs et compare
+    leurs mesures à la référence.
+
+    Returns:
+        Aucune valeur de retour.
+    """
+    parser = argparse.ArgumentParser(description="Mesure les performances du jeu.")
+    parser.add_argument("--filtre", default="", help="ne lance que les bancs contenant ce texte")
+    parser.add_argument("--sortie", metavar="FICHIER", help="écrit les mesures en JSON")
+    parser.add_argument("--reference", metavar="FICHIER",
+                        help="compare les mesures à celles de ce fichier JSON")
+    parser.add_argument("--demarrage", action="store_true",
+                        help="mesure seulement le démarrage des programmes (-X importtime)")
+    parser.add_argument("--seuil", type=float, default=SEUIL,
+                        help="hausse relative de la médiane signalée comme régression")
+    args = parser.parse_args()
+    if args.demarrage:
+        print(rapport_demarrage())
+        sys.exit()
+
+    resultats = {}
+    print(f"{'banc':45} {'ops/s':>12} {'p50 us':>10} {'p90 us':>10} {'p99 us':>10}")
+    for nom, fonction in BANCS.items():
+        if args.filtre not in nom:
+            continue
+        resultats[nom] = mesure = fonction()
+        print(f"{nom:45} {mesure['ops_s']:12.0f} {mesure['p50_us']:10.2f} "
+              f"{mesure['p90_us']:10.2f} {mesure['p99_us']:10.2f}")
+
+    if args.sortie:
+        with open(args.sortie, "w", encoding="utf-8") as fichier:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "date": time.strftime("%Y-%m-%d %H:%M:%S"), "bancs": resultats},
+                      fichier, indent=2)
+    if args.reference:
+        with open(args.reference, encoding="utf-8") as fichier:
+            reference = json.load(fichier)["bancs"]
+        lignes, regressions = comparer(resultats, reference, args.seuil)
+        print()
+        print("\n".join(lignes))
+        if regressions:
+            print(f"{len(regressions)} régression(s) au-delà de {args.seuil:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
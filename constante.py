@@ -1,3 +1,5 @@
+from collections import namedtuple
+
 TAILLE_FENETRE = 640, 480
 DIM_PLATEAU = 10, 20
 BORDURE_PLATEAU = 4
@@ -23,49 +25,152 @@ POSITION_PIECES = POSITION_SCORE[0], 150
 POSITION_LIGNES = POSITION_SCORE[0], 180
 POSITION_TETRIS = POSITION_SCORE[0], 210
 POSITION_NIVEAU = POSITION_SCORE[0], 240
+POSITIONS_STATS = (POSITION_SCORE, POSITION_PIECES, POSITION_LIGNES,
+                   POSITION_TETRIS, POSITION_NIVEAU)
+# Zone de l'écran occupée par les statistiques, à droite du plateau,
+# et hauteur de la bande effacée autour de chaque statistique
+HAUTEUR_STAT = 30
+ZONE_STATS = (START_PLABORD[0] + TAILLE_PLABORD[0], POSITION_SCORE[1] - HAUTEUR_STAT / 2,
+              TAILLE_FENETRE[0] - START_PLABORD[0] - TAILLE_PLABORD[0],
+              POSITION_NIVEAU[1] - POSITION_SCORE[1] + HAUTEUR_STAT)
+# Polices de caractères (fichier, taille), chargées à leur première utilisation
+POLICES = {'defaut': ('freesansbold.ttf', 18), 'titre': ('freesansbold.ttf', 100)}
+# Nombre maximal de textes rendus gardés en cache
+TAILLE_CACHE_TEXTES = 64
+# Zone de l'écran, à gauche du plateau, de l'affichage des mesures du profileur,
+# position de ses deux lignes et nombre d'images entre deux mises à jour
+ZONE_PROFIL = (0, 10, START_PLABORD[0], 50)
+POSITIONS_PROFIL = (START_PLABORD[0] / 2, 22), (START_PLABORD[0] / 2, 47)
+PERIODE_PROFIL = 30
+
+# Disposition du rendu terminal : colonne et ligne (à partir de 1) de la case
+# (0, 0) du plateau, et nombre de caractères par case
+ORIGINE_TERMINAL = 3, 6
+LARGEUR_CASE_TERMINAL = 2
+
+# Un plateau plus grand que DIM_PLATEAU défile : seules DIM_PLATEAU cases sont
+# visibles, et la vue se recentre quand la pièce courante arrive à moins de
+# MARGE_VUE cases de son bord
+MARGE_VUE = 2
+
+# Nombre maximal d'images par seconde pendant la partie
+IMAGES_PAR_SECONDE = 60
+# Délai maximal (ms) d'une attente bloquante sur les événements
+DELAI_ATTENTE = 1000
 
-# Définition des formes de pièces Tetris
+# Pas de temps fixe de la simulation, et nombre de pas entre deux chutes
+# d'une ligne selon le niveau (21 pas = 0,35 s au niveau 1)
+TICKS_PAR_SECONDE = 60
+DELAIS_CHUTE = (21, 19, 17, 15, 13, 11, 9, 7, 6, 5, 4, 3, 2, 1)
+# Retard maximal (s) que la simulation rattrape après un ralentissement
+RETARD_MAX = 0.25
+# Répétition des déplacements d'une touche tenue, en pas de simulation : délai
+# avant la première répétition (DAS, 10 pas = 167 ms) puis période des
+# répétitions suivantes (ARR, au moins 1)
+DELAI_REPETITION = 10
+PERIODE_REPETITION = 2
+
+# Graine des clés de hachage de Zobrist (les clés sont les mêmes à chaque
+# lancement), et nombre d'entrées de la table de transposition du joueur
+# automatique
+GRAINE_ZOBRIST = 0x5EED7E7215
+TAILLE_TABLE_TRANSPOSITION = 1 << 16
+
+# Définition des formes de pièces Tetris, une matrice 4x4 par rotation.
+# Le chiffre d'une case est l'indice de couleur de la pièce, 0 si elle est vide.
 PIECES = {
     'O': [
-        '0000\n0110\n0110\n0000',
+        [[0, 0, 0, 0],
+         [0, 1, 1, 0],
+         [0, 1, 1, 0],
+         [0, 0, 0, 0]],
     ],
     'S': [
-        '0000\n0022\n0220\n0000',
-        '0000\n0200\n0220\n0020',
+        [[0, 0, 0, 0],
+         [0, 0, 2, 2],
+         [0, 2, 2, 0],
+         [0, 0, 0, 0]],
+        [[0, 0, 0, 0],
+         [0, 2, 0, 0],
+         [0, 2, 2, 0],
+         [0, 0, 2, 0]],
     ],
     'Z': [
-        '0000\n3300\n0330\n0000',
-        '0000\n0030\n0330\n0300',
+        [[0, 0, 0, 0],
+         [3, 3, 0, 0],
+         [0, 3, 3, 0],
+         [0, 0, 0, 0]],
+        [[0, 0, 0, 0],
+         [0, 0, 3, 0],
+         [0, 3, 3, 0],
+         [0, 3, 0, 0]],
     ],
     'I': [
-        '0400\n0400\n0400\n0400',
-        '0000\n4444\n0000\n0000',
+        [[0, 4, 0, 0],
+         [0, 4, 0, 0],
+         [0, 4, 0, 0],
+         [0, 4, 0, 0]],
+        [[0, 0, 0, 0],
+         [4, 4, 4, 4],
+         [0, 0, 0, 0],
+         [0, 0, 0, 0]],
     ],
     'J': [
-        '0000\n5000\n5550\n0000',
-        '0000\n0550\n0500\n0500',
-        '0000\n0000\n5550\n0050',
-        '0000\n0050\n0050\n0550',
+        [[0, 0, 0, 0],
+         [5, 0, 0, 0],
+         [5, 5, 5, 0],
+         [0, 0, 0, 0]],
+        [[0, 0, 0, 0],
+         [0, 5, 5, 0],
+         [0, 5, 0, 0],
+         [0, 5, 0, 0]],
+        [[0, 0, 0, 0],
+         [0, 0, 0, 0],
+         [5, 5, 5, 0],
+         [0, 0, 5, 0]],
+        [[0, 0, 0, 0],
+         [0, 0, 5, 0],
+         [0, 0, 5, 0],
+         [0, 5, 5, 0]],
     ],
     'L': [
-        '0000\n0060\n6660\n0000',
-        '0000\n0060\n0060\n0660',
-        '0000\n0000\n6660\n6000',
-        '0000\n0660\n0060\n0060',
+        [[0, 0, 0, 0],
+         [0, 0, 6, 0],
+         [6, 6, 6, 0],
+         [0, 0, 0, 0]],
+        [[0, 0, 0, 0],
+         [0, 0, 6, 0],
+         [0, 0, 6, 0],
+         [0, 6, 6, 0]],
+        [[0, 0, 0, 0],
+         [0, 0, 0, 0],
+         [6, 6, 6, 0],
+         [6, 0, 0, 0]],
+        [[0, 0, 0, 0],
+         [0, 6, 6, 0],
+         [0, 0, 6, 0],
+         [0, 0, 6, 0]],
     ],
     'T': [
-        '0000\n0700\n7770\n0000',
-        '0000\n0700\n0770\n0700',
-        '0000\n0000\n7770\n0700',
-        '0000\n0070\n0770\n0070',
-    ]
+        [[0, 0, 0, 0],
+         [0, 7, 0, 0],
+         [7, 7, 7, 0],
+         [0, 0, 0, 0]],
+        [[0, 0, 0, 0],
+         [0, 7, 0, 0],
+         [0, 7, 7, 0],
+         [0, 7, 0, 0]],
+        [[0, 0, 0, 0],
+         [0, 0, 0, 0],
+         [7, 7, 7, 0],
+         [0, 7, 0, 0]],
+        [[0, 0, 0, 0],
+         [0, 0, 7, 0],
+         [0, 7, 7, 0],
+         [0, 0, 7, 0]],
+    ],
 }
 
-# Conversion des pièces Tetris en listes de listes d'entiers
-for name, rotations in PIECES.items():
-    PIECES[name] = [[[int(i) for i in p] for p in r.splitlines()]
-                    for r in rotations]
-
 # Définition d'un dictionnaire de couleurs pour les différentes valeurs des pièces Tetris
 COULEURS = {
     0: (0, 0, 0),
@@ -81,4 +186,42 @@ COULEURS = {
 }
 
 # Création d'une liste contenant les clés (noms) des pièces Tetris
-PIECES_KEYS = list(PIECES.keys())
\ No newline at end of file
+PIECES_KEYS = list(PIECES.keys())
+
+# Tables précalculées pour chaque pièce et chaque rotation.
+# Les coordonnées suivent la convention du moteur : x est l'indice de ligne
+# de la matrice 4x4 et y l'indice de colonne.
+#   indice : position de la pièce dans PIECES_KEYS
+#   cases  : tuple des décalages (x, y) des cases occupées
+#   boite  : boîte englobante (x min, y min, x max, y max)
+#   couleur: indice de couleur dans COULEURS
+#   profil : pour chaque colonne x occupée, le couple (x, y le plus bas)
+Forme = namedtuple('Forme', 'indice cases boite couleur profil')
+
+
+def _calculer_forme(indice, matrice):
+    """
+    Calcule la table d'une rotation de pièce à partir de sa matrice.
+
+    Args:
+        indice (int): La position de la pièce dans PIECES_KEYS.
+        matrice (list): La matrice 4x4 de la rotation.
+
+    Returns:
+        Forme: Les données précalculées de la rotation.
+    """
+    cases = tuple((i, ind) for i, ligne in enumerate(matrice)
+                  for ind, case in enumerate(ligne) if case != 0)
+    xs, ys = [cx for cx, cy in cases], [cy for cx, cy in cases]
+    bas = {}
+    for cx, cy in cases:
+        bas[cx] = max(bas.get(cx, cy), cy)
+    couleur = matrice[cases[0][0]][cases[0][1]]
+    return Forme(indice, cases, (min(xs), min(ys), max(xs), max(ys)), couleur,
+                 tuple(sorted(bas.items())))
+
+
+FORMES = {
+    name: tuple(_calculer_forme(indice, matrice) for matrice in PIECES[name])
+    for indice, name in enumerate(PIECES_KEYS)
+}
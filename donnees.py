@@ -0,0 +1,421 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Jeu de données de parties, pour l'entraînement : un fichier par écrivain,
+des enregistrements de taille fixe ajoutés à la fin, lus par numpy.memmap.
+
+Chaque enregistrement est un pas d'une partie : l'état avant l'action
+(plateau, un bit par case ; pièce courante et suivante, rotation et
+position), l'action jouée, puis ce qu'elle a rapporté (points et lignes)
+et si la partie s'est terminée. Les colonnes sont de largeur fixe (voir
+format_enregistrement) et petit-boutistes : 25 octets de plateau et 51
+octets en tout sur un plateau de 10 x 20.
+
+Le fichier commence par un en-tête (ENTETE) : signature, version et
+dimensions du plateau. Il n'est jamais réécrit : Ecrivain ajoute ses
+enregistrements par lots à la fin, et un enregistrement incomplet à la fin
+(écriture interrompue) est ignoré à la lecture. Plusieurs processus
+écrivent chacun leur fichier, que Trajectoires lit ensemble sans les
+charger en mémoire :
+
+    python simulation.py --parties 1000 --politique ia --donnees parties/
+    python donnees.py parties/
+"""
+
+import argparse
+import glob
+import os
+import struct
+import numpy as np
+from constante import DIM_PLATEAU
+
+# En-tête d'un fichier : signature, version, largeur et hauteur du plateau
+ENTETE = struct.Struct("<4sBHH")
+SIGNATURE = b"TRAJ"
+VERSION = 1
+# Table de bytes.translate : b"1" pour une case occupée, b"0" sinon
+_OCCUPATION = bytes([ord("0")] + [ord("1")] * 255)
+# Extension des fichiers d'un dossier de données
+EXTENSION = ".traj"
+# Nombre d'enregistrements gardés par un écrivain avant de les écrire
+TAILLE_LOT_ECRITURE = 4096
+# Le mélange tire des blocs d'enregistrements consécutifs au hasard, puis
+# mélange les enregistrements de BLOCS_MELANGES blocs à la fois : la mémoire
+# utilisée ne dépend pas de la taille du jeu de données
+TAILLE_BLOC = 4096
+BLOCS_MELANGES = 16
+
+
+def format_enregistrement(largeur: int =DIM_PLATEAU[0], hauteur: int =DIM_PLATEAU[1]):
+    """
+    Retourne le type NumPy d'un enregistrement, pour un plateau donné.
+
+    Args:
+        largeur (int, optional): Le nombre de colonnes. Par défaut, DIM_PLATEAU[0].
+        hauteur (int, optional): Le nombre de lignes. Par défaut, DIM_PLATEAU[1].
+
+    Returns:
+        numpy.dtype: Le type structuré, sans alignement.
+    """
+    return np.dtype([
+        ("partie", "<u8"),  # graine de la partie
+        ("pas", "<u4"),  # numéro du pas dans la partie, à partir de 0
+        ("plateau", "u1", ((largeur * hauteur + 7) // 8,)),  # case i : bit i % 8 de l'octet i // 8
+        ("piece", "i1"),  # indice dans PIECES_KEYS, -1 sans pièce courante
+        ("suivante", "i1"),
+        ("rotation", "u1"),
+        ("x", "<i2"),
+        ("y", "<i2"),
+        ("action", "u1"),
+        ("points", "<i4"),  # score gagné par l'action
+        ("lignes", "u1"),  # lignes complétées par l'action
+        ("fin", "?"),  # dernier pas de la partie
+    ])
+
+
+class Ecrivain:
+    """
+    Cette classe ajoute les pas des parties jouées à la fin d'un fichier.
+
+    Pour chaque pas, ajouter(moteur, action) est appelé avant d'appliquer
+    l'action ; les points et les lignes rapportés sont calculés à l'appel
+    suivant, ou par terminer(moteur) à la fin de la partie. Les
+    enregistrements sont gardés en mémoire et écrits par lots, le fichier
+    n'étant ouvert que le temps d'écrire un lot.
+    """
+
+    def __init__(self, chemin: str, largeur: int =DIM_PLATEAU[0], hauteur: int =DIM_PLATEAU[1],
+                 taille_lot: int =TAILLE_LOT_ECRITURE):
+        """
+        Prépare le fichier, en le créant avec son en-tête s'il n'existe pas.
+
+        Args:
+            chemin (str): Le chemin du fichier.
+            largeur (int, optional): Le nombre de colonnes. Par défaut, DIM_PLATEAU[0].
+            hauteur (int, optional): Le nombre de lignes. Par défaut, DIM_PLATEAU[1].
+            taille_lot (int, optional): Le nombre d'enregistrements écrits à la
+                fois. Par défaut, TAILLE_LOT_ECRITURE.
+
+        Returns:
+            Aucune valeur de retour.
+
+        Raises:
+            ValueError: Si le fichier existe pour un autre plateau, ou n'est pas
+                un fichier de données.
+        """
+        self.dimensions = largeur, hauteur
+        self.format = format_enregistrement(largeur, hauteur)
+        self.taille_lot = max(1, taille_lot)
+        if os.path.exists(chemin) and os.path.getsize(chemin):
+            if lire_entete(chemin) != self.dimensions:
+                raise ValueError(f"{chemin} : plateau de dimensions différentes")
+        else:
+            with open(chemin, "wb") as fichier:
+                fichier.write(ENTETE.pack(SIGNATURE, VERSION, largeur, hauteur))
+        self.chemin = chemin
+        # Colonnes du lot en cours, une liste par champ ; les plateaux sont
+        # des bytes, mis en cache tant que la clé de Zobrist ne change pas
+        self._lot = {nom: [] for nom in self.format.names}
+        self._cle, self._plateau = None, None
+        # Score et lignes du moteur avant le dernier pas, pas encore complété,
+        # et numéro du prochain pas de la partie en cours
+        self._avant, self._pas = None, 0
+        self.ecrits = 0
+
+    def ajouter(self, moteur, action: int):
+        """
+        Ajoute l'état du moteur et l'action qui va y être jouée.
+
+        Args:
+            moteur (Moteur): Le moteur, avant l'action.
+            action (int): L'action jouée.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self._completer(moteur, False)
+        if len(self._lot["pas"]) >= self.taille_lot:
+            self.vider()
+        lot = self._lot
+        cle = moteur.hachage().valeur
+        if cle != self._cle:
+            largeur, hauteur = self.dimensions
+            masque = int(moteur.plateau.sauver()[0].translate(_OCCUPATION)[::-1], 2)
+            self._cle, self._plateau = cle, masque.to_bytes((largeur * hauteur + 7) // 8,
+                                                           "little")
+        lot["partie"].append(moteur.graine)
+        lot["pas"].append(self._pas)
+        self._pas += 1
+        lot["plateau"].append(self._plateau)
+        if moteur.current is None:
+            lot["piece"].append(-1)
+            lot["rotation"].append(0)
+            lot["x"].append(0)
+            lot["y"].append(0)
+        else:
+            lot["piece"].append(moteur.current[0].indice)
+            lot["x"].append(moteur.position[0])
+            lot["y"].append(moteur.position[1])
+            lot["rotation"].append(moteur.position[2])
+        lot["suivante"].append(moteur.next[0].indice)
+        lot["action"].append(action)
+        self._avant = moteur.score, moteur.lignes
+
+    def _completer(self, moteur, fin: bool):
+        """
+        Complète le dernier enregistrement avec ce que son action a rapporté.
+
+        Args:
+            moteur (Moteur): Le moteur, après l'action du dernier enregistrement.
+            fin (bool): Vrai si la partie est terminée.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        if self._avant is None:
+            return
+        score, lignes = self._avant
+        self._lot["points"].append(moteur.score - score)
+        self._lot["lignes"].append(moteur.lignes - lignes)
+        self._lot["fin"].append(fin)
+        self._avant = None
+
+    def terminer(self, moteur):
+        """
+        Termine la partie en cours : son dernier pas est marqué comme final.
+
+        Args:
+            moteur (Moteur): Le moteur à la fin de la partie.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self._completer(moteur, True)
+        self._cle, self._pas = None, 0
+
+    def vider(self):
+        """
+        Écrit les enregistrements complets du lot à la fin du fichier.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        lot = self._lot
+        n = len(lot["fin"])
+        if not n:
+            return
+        tableau = np.zeros(n, dtype=self.format)
+        for nom in self.format.names:
+            if nom == "plateau":
+                tableau[nom] = np.frombuffer(b"".join(lot[nom][:n]), np.uint8).reshape(n, -1)
+            else:
+                tableau[nom] = lot[nom][:n]
+            # Un enregistrement pas encore complété reste pour le lot suivant
+            del lot[nom][:n]
+        with open(self.chemin, "ab") as fichier:
+            fichier.write(tableau.tobytes())
+        self.ecrits += n
+
+    def fermer(self):
+        """
+        Écrit les derniers enregistrements. Un pas dont le résultat n'est
+        pas connu (partie non terminée) n'est pas écrit.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.vider()
+
+    def __enter__(self):
+        """
+        Retourne l'écrivain, pour l'utiliser dans un bloc with.
+
+        Returns:
+            Ecrivain: L'écrivain.
+        """
+        return self
+
+    def __exit__(self, *exception):
+        """
+        Ferme l'écrivain à la sortie du bloc with.
+
+        Args:
+            *exception: L'exception levée dans le bloc, s'il y en a une.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.fermer()
+
+
+def lire_entete(chemin: str):
+    """
+    Lit l'en-tête d'un fichier de données.
+
+    Args:
+        chemin (str): Le chemin du fichier.
+
+    Returns:
+        tuple: La largeur et la hauteur du plateau.
+
+    Raises:
+        ValueError: Si le fichier n'est pas un fichier de données.
+    """
+    with open(chemin, "rb") as fichier:
+        donnees = fichier.read(ENTETE.size)
+    if len(donnees) < ENTETE.size:
+        raise ValueError(f"{chemin} : fichier trop court")
+    signature, version, largeur, hauteur = ENTETE.unpack(donnees)
+    if signature != SIGNATURE or version != VERSION:
+        raise ValueError(f"{chemin} : ce n'est pas un fichier de données de parties")
+    return largeur, hauteur
+
+
+class Trajectoires:
+    """
+    Cette classe lit des fichiers de données sans les charger en mémoire.
+
+    Chaque fichier est projeté en mémoire (numpy.memmap) : seuls les
+    enregistrements demandés sont lus sur le disque.
+    """
+
+    def __init__(self, *chemins):
+        """
+        Ouvre des fichiers de données, ou tous les fichiers .traj de dossiers.
+
+        Args:
+            *chemins (str): Les fichiers ou les dossiers.
+
+        Returns:
+            Aucune valeur de retour.
+
+        Raises:
+            ValueError: Si aucun fichier n'est trouvé, ou si les fichiers ne
+                sont pas tous du même plateau.
+        """
+        fichiers = []
+        for chemin in chemins:
+            if os.path.isdir(chemin):
+                fichiers += sorted(glob.glob(os.path.join(chemin, "*" + EXTENSION)))
+            else:
+                fichiers.append(chemin)
+        if not fichiers:
+            raise ValueError("aucun fichier de données")
+        dimensions = {lire_entete(chemin) for chemin in fichiers}
+        if len(dimensions) > 1:
+            raise ValueError("les fichiers de données ne sont pas du même plateau")
+        self.largeur, self.hauteur = dimensions.pop()
+        self.format = format_enregistrement(self.largeur, self.hauteur)
+        self.colonnes = []
+        for chemin in fichiers:
+            # Un enregistrement incomplet à la fin du fichier est ignoré
+            n = (os.path.getsize(chemin) - ENTETE.size) // self.format.itemsize
+            if n:
+                self.colonnes.append(np.memmap(chemin, dtype=self.format, mode="r",
+                                               offset=ENTETE.size, shape=(n,)))
+        # Premier enregistrement de chaque fichier, dans la numérotation commune
+        self.debuts = np.cumsum([0] + [len(c) for c in self.colonnes])
+
+    def __len__(self):
+        """
+        Retourne le nombre d'enregistrements de tous les fichiers.
+
+        Returns:
+            int: Le nombre d'enregistrements.
+        """
+        return int(self.debuts[-1])
+
+    def lire(self, indices):
+        """
+        Lit des enregistrements et déplie leurs plateaux.
+
+        Args:
+            indices (numpy.ndarray): Les numéros des enregistrements.
+
+        Returns:
+            dict: Un tableau par champ ; 'plateau' est un tableau de booléens
+                de forme (N, hauteur, largeur).
+        """
+        indices = np.asarray(indices)
+        fichiers = np.searchsorted(self.debuts, indices, side="right") - 1
+        parties = []
+        for f in np.unique(fichiers):
+            choisis = indices[fichiers == f]
+            # Des lectures dans l'ordre du fichier
+            ordre = np.argsort(choisis, kind="stable")
+            lus = np.empty(len(choisis), dtype=self.format)
+            lus[ordre] = self.colonnes[f][choisis[ordre] - self.debuts[f]]
+            parties.append((np.flatnonzero(fichiers == f), lus))
+        resultat = np.empty(len(indices), dtype=self.format)
+        for positions, lus in parties:
+            resultat[positions] = lus
+        lot = {nom: resultat[nom] for nom in self.format.names}
+        lot["plateau"] = np.unpackbits(resultat["plateau"], axis=1, bitorder="little",
+                                       count=self.largeur * self.hauteur
+                                       ).reshape(-1, self.hauteur, self.largeur).astype(bool)
+        return lot
+
+    def lots(self, taille: int, melanger: bool =True, graine: int =None):
+        """
+        Parcourt tous les enregistrements une fois, par lots.
+
+        Avec le mélange, des blocs de TAILLE_BLOC enregistrements consécutifs
+        sont tirés dans un ordre aléatoire, et les enregistrements de
+        BLOCS_MELANGES blocs sont mélangés ensemble : seuls les indices de
+        ces blocs sont en mémoire, quelle que soit la taille des fichiers.
+
+        Args:
+            taille (int): Le nombre d'enregistrements d'un lot (le dernier
+                peut être plus petit).
+            melanger (bool, optional): Mélange les enregistrements. Par défaut, True.
+            graine (int, optional): La graine du mélange. Par défaut, aléatoire.
+
+        Yields:
+            dict: Les lots, comme lire.
+        """
+        n = len(self)
+        if not melanger:
+            for debut in range(0, n, taille):
+                yield self.lire(np.arange(debut, min(debut + taille, n)))
+            return
+        generateur = np.random.default_rng(graine)
+        blocs = generateur.permutation((n + TAILLE_BLOC - 1) // TAILLE_BLOC)
+        reste = np.empty(0, dtype=np.int64)
+        for debut in range(0, len(blocs), BLOCS_MELANGES):
+            indices = np.concatenate([reste] + [
+                np.arange(b * TAILLE_BLOC, min((b + 1) * TAILLE_BLOC, n))
+                for b in blocs[debut:debut + BLOCS_MELANGES]])
+            generateur.shuffle(indices)
+            complets = len(indices) // taille * taille
+            for k in range(0, complets, taille):
+                yield self.lire(indices[k:k + taille])
+            reste = indices[complets:]
+        if len(reste):
+            yield self.lire(reste)
+
+
+def main():
+    """
+    Lit les chemins de la ligne de commande et affiche le résumé de leurs données.
+
+    Returns:
+        Aucune valeur de retour.
+    """
+    parser = argparse.ArgumentParser(description="Résume des fichiers de données de parties.")
+    parser.add_argument("chemins", nargs="+", help="fichiers .traj ou dossiers")
+    args = parser.parse_args()
+    try:
+        trajectoires = Trajectoires(*args.chemins)
+    except ValueError as erreur:
+        parser.error(str(erreur))
+    print(f"{len(trajectoires)} pas de {len(trajectoires.colonnes)} fichier(s), "
+          f"plateau {trajectoires.largeur} x {trajectoires.hauteur}, "
+          f"{trajectoires.format.itemsize} octets par pas")
+    if len(trajectoires):
+        parties = sum(int(c["fin"].sum()) for c in trajectoires.colonnes)
+        points = sum(int(c["points"].sum(dtype=np.int64)) for c in trajectoires.colonnes)
+        print(f"{parties} parties terminées, {points} points")
+
+
+if __name__ == "__main__":
+    main()
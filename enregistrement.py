@@ -0,0 +1,182 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Enregistrement et relecture des parties.
+
+Une partie est entièrement déterminée par la graine du moteur et par les
+actions du joueur, datées en pas de simulation (Moteur.tick). Un
+enregistrement ne garde donc que ces informations, dans un format binaire
+compact, et peut être rejoué sans fenêtre à la vitesse maximale :
+
+    python enregistrement.py partie.tet
+"""
+
+import argparse
+import struct
+import sys
+from array import array
+from constante import DIM_PLATEAU
+from moteur import Moteur, RIEN
+from plateau import PlateauBits
+
+# En-tête du fichier : signature, version, graine, nombre de pas, nombre
+# d'actions, largeur et hauteur du plateau. La version 1, sans les
+# dimensions, ne concernait que le plateau par défaut (DIM_PLATEAU).
+ENTETE = struct.Struct("<4sBQIIHH")
+ENTETE_V1 = struct.Struct("<4sBQII")
+SIGNATURE = b"TETR"
+VERSION = 2
+
+
+class Enregistrement:
+    """
+    Cette classe représente les entrées d'une partie : sa graine et ses
+    actions, chacune associée au pas de simulation où elle a été jouée.
+    """
+
+    def __init__(self, graine: int, largeur: int =DIM_PLATEAU[0],
+                 hauteur: int =DIM_PLATEAU[1]):
+        """
+        Crée un enregistrement vide.
+
+        Args:
+            graine (int): La graine du moteur enregistré.
+            largeur (int, optional): Le nombre de colonnes du plateau.
+                Par défaut, DIM_PLATEAU[0].
+            hauteur (int, optional): Le nombre de lignes du plateau.
+                Par défaut, DIM_PLATEAU[1].
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.graine = graine
+        self.largeur, self.hauteur = largeur, hauteur
+        self.ticks = array("I")
+        self.actions = array("B")
+        self.fin = 0
+
+    def __len__(self):
+        """
+        Retourne le nombre d'actions enregistrées.
+
+        Returns:
+            int: Le nombre d'actions.
+        """
+        return len(self.actions)
+
+    def ajouter(self, tick: int, action: int):
+        """
+        Ajoute une action jouée au pas donné. Les actions RIEN sont ignorées.
+
+        Args:
+            tick (int): Le numéro du pas (Moteur.ticks avant le pas).
+            action (int): L'action jouée.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        if action != RIEN:
+            self.ticks.append(tick)
+            self.actions.append(action)
+        self.fin = max(self.fin, tick + 1)
+
+    def sauver(self, chemin: str):
+        """
+        Écrit l'enregistrement dans un fichier.
+
+        Args:
+            chemin (str): Le chemin du fichier.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        with open(chemin, "wb") as fichier:
+            fichier.write(ENTETE.pack(SIGNATURE, VERSION, self.graine, self.fin, len(self),
+                                      self.largeur, self.hauteur))
+            # Les tableaux sont écrits en petit-boutiste, comme l'en-tête
+            ticks = array("I", self.ticks)
+            if sys.byteorder == "big":
+                ticks.byteswap()
+            fichier.write(ticks.tobytes())
+            fichier.write(self.actions.tobytes())
+
+    @classmethod
+    def charger(cls, chemin: str):
+        """
+        Lit un enregistrement écrit par sauver.
+
+        Args:
+            chemin (str): Le chemin du fichier.
+
+        Returns:
+            Enregistrement: L'enregistrement lu.
+
+        Raises:
+            ValueError: Si le fichier n'est pas un enregistrement valide.
+        """
+        with open(chemin, "rb") as fichier:
+            donnees = fichier.read()
+        if len(donnees) < ENTETE_V1.size:
+            raise ValueError(f"{chemin} : fichier trop court")
+        signature, version, graine, fin, n = ENTETE_V1.unpack_from(donnees)
+        if signature != SIGNATURE or version not in (1, VERSION):
+            raise ValueError(f"{chemin} : ce n'est pas un enregistrement de partie")
+        entete = ENTETE_V1 if version == 1 else ENTETE
+        if len(donnees) != entete.size + 5 * n:
+            raise ValueError(f"{chemin} : taille de fichier incorrecte")
+        dimensions = DIM_PLATEAU if version == 1 else ENTETE.unpack_from(donnees)[5:]
+        if min(dimensions) < 1:
+            raise ValueError(f"{chemin} : dimensions de plateau incorrectes")
+        enregistrement = cls(graine, *dimensions)
+        enregistrement.fin = fin
+        debut = entete.size
+        enregistrement.ticks.frombytes(donnees[debut:debut + 4 * n])
+        if sys.byteorder == "big":
+            enregistrement.ticks.byteswap()
+        enregistrement.actions.frombytes(donnees[debut + 4 * n:])
+        return enregistrement
+
+
+def rejouer(enregistrement: Enregistrement, plateau=PlateauBits):
+    """
+    Rejoue un enregistrement sans affichage, aussi vite que possible.
+
+    Args:
+        enregistrement (Enregistrement): La partie à rejouer.
+        plateau (type, optional): La classe de plateau du moteur.
+            Par défaut, PlateauBits.
+
+    Returns:
+        Moteur: Le moteur dans son état à la fin de la partie.
+    """
+    moteur = Moteur(plateau, graine=enregistrement.graine, largeur=enregistrement.largeur,
+                    hauteur=enregistrement.hauteur)
+    actions = iter(zip(enregistrement.ticks, enregistrement.actions))
+    prochain = next(actions, None)
+    while moteur.ticks < enregistrement.fin and not moteur.perdu:
+        action = RIEN
+        if prochain is not None and prochain[0] == moteur.ticks:
+            action = prochain[1]
+            prochain = next(actions, None)
+        moteur.tick(action)
+    return moteur
+
+
+def main():
+    """
+    Rejoue la partie enregistrée donnée sur la ligne de commande et affiche son résultat.
+
+    Returns:
+        Aucune valeur de retour.
+    """
+    parser = argparse.ArgumentParser(description="Rejoue une partie enregistrée sans fenêtre.")
+    parser.add_argument("fichier", help="enregistrement écrit par tetris.py --enregistrer")
+    args = parser.parse_args()
+    fin_de_partie = rejouer(Enregistrement.charger(args.fichier))
+    print(f"Score: {fin_de_partie.score}  Pièces: {fin_de_partie.pieces}  "
+          f"Lignes: {fin_de_partie.lignes}  Tetris: {fin_de_partie.tetris}  "
+          f"Niveau: {fin_de_partie.niveau}  Pas: {fin_de_partie.ticks}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Lecture des touches du joueur, répétition des touches tenues et mesure de
+la latence entre une touche et son affichage.
+
+Chaque touche pressée devient une action mise en file, datée à sa lecture :
+aucune n'est perdue, même si plusieurs arrivent dans la même image ou si la
+simulation rattrape un retard. Le moteur consomme au plus une action par
+pas. Une touche de déplacement tenue est répétée sur les pas de simulation
+(et non sur les images) : après DELAI_REPETITION pas, puis tous les
+PERIODE_REPETITION pas. La latence d'une action est le temps entre la
+lecture de sa touche et l'envoi à l'écran de la première image qui suit
+son application.
+"""
+
+import collections
+import time
+from array import array
+from pygame.locals import KEYDOWN, KEYUP
+from constante import DELAI_REPETITION, PERIODE_REPETITION
+from moteur import GAUCHE, DROITE, BAS
+
+# Actions répétées tant que leur touche est tenue
+REPETABLES = (GAUCHE, DROITE, BAS)
+# Nombre de latences gardées pour les centiles glissants
+TAILLE_LATENCES = 600
+
+
+class Entrees:
+    """
+    Cette classe transforme les événements clavier en actions du moteur.
+
+    traiter(event) reçoit chaque événement lu, action() donne l'action de
+    chaque pas de simulation et affichee() est appelée après chaque envoi
+    d'une image à l'écran.
+    """
+
+    def __init__(self, touches: dict, delai: int =DELAI_REPETITION,
+                 periode: int =PERIODE_REPETITION):
+        """
+        Crée une lecture des entrées sans touche en attente.
+
+        Args:
+            touches (dict): La correspondance entre touches et actions du moteur.
+            delai (int, optional): Le nombre de pas avant la première répétition
+                d'une touche tenue. Par défaut, DELAI_REPETITION.
+            periode (int, optional): Le nombre de pas entre deux répétitions,
+                au moins 1. Par défaut, PERIODE_REPETITION.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.touches = touches
+        self.delai, self.periode = delai, max(1, periode)
+        # Actions en attente, avec la date de lecture de leur touche (ns)
+        self.file = collections.deque()
+        # Actions répétables tenues, la dernière pressée en dernier
+        self.tenues = []
+        self._ticks_tenue = 0
+        self.recues, self.appliquees, self.repetees = 0, 0, 0
+        self.latences = array("q", bytes(8 * TAILLE_LATENCES))
+        self.mesures = 0
+        # Dates de lecture des actions appliquées, pas encore affichées
+        self._a_afficher = []
+
+    def traiter(self, event):
+        """
+        Traite un événement s'il concerne une touche d'action.
+
+        Args:
+            event (pygame.event.Event): L'événement lu.
+
+        Returns:
+            bool: True si l'événement a été consommé, sinon False.
+        """
+        if event.type not in (KEYDOWN, KEYUP) or event.key not in self.touches:
+            return False
+        action = self.touches[event.key]
+        if event.type == KEYDOWN:
+            self.file.append((action, time.perf_counter_ns()))
+            self.recues += 1
+            if action in REPETABLES:
+                if action in self.tenues:
+                    self.tenues.remove(action)
+                self.tenues.append(action)
+                self._ticks_tenue = 0
+        elif action in self.tenues:
+            derniere = self.tenues[-1] == action
+            self.tenues.remove(action)
+            if derniere:
+                # La touche tenue avant elle reprend son délai depuis le début
+                self._ticks_tenue = 0
+        return True
+
+    def action(self):
+        """
+        Retourne l'action d'un pas de simulation.
+
+        Une touche pressée en attente passe en premier ; sinon, la dernière
+        touche de déplacement tenue est répétée si son délai est écoulé.
+
+        Returns:
+            int or None: L'action, ou None si aucune touche ne donne d'action.
+        """
+        if self.tenues:
+            self._ticks_tenue += 1
+        if self.file:
+            action, lecture = self.file.popleft()
+            self.appliquees += 1
+            self._a_afficher.append(lecture)
+            return action
+        ticks = self._ticks_tenue - self.delai
+        if self.tenues and ticks >= 0 and ticks % self.periode == 0:
+            self.repetees += 1
+            return self.tenues[-1]
+        return None
+
+    def affichee(self):
+        """
+        Enregistre la latence des actions appliquées depuis la dernière image,
+        qui vient d'être envoyée à l'écran.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        if not self._a_afficher:
+            return
+        maintenant = time.perf_counter_ns()
+        for lecture in self._a_afficher:
+            self.latences[self.mesures % TAILLE_LATENCES] = maintenant - lecture
+            self.mesures += 1
+        self._a_afficher.clear()
+
+    def vider(self):
+        """
+        Oublie les touches en attente et les touches tenues, par exemple
+        après une pause pendant laquelle elles ont pu être relâchées.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.file.clear()
+        self.tenues.clear()
+        self._ticks_tenue = 0
+        self._a_afficher.clear()
+
+    def centiles(self, centiles: tuple =(50, 99)):
+        """
+        Calcule des centiles de la latence sur les dernières actions.
+
+        Args:
+            centiles (tuple, optional): Les centiles voulus. Par défaut, (50, 99).
+
+        Returns:
+            tuple: Les latences en millisecondes, une par centile (0 sans mesure).
+        """
+        valeurs = sorted(self.latences[:min(self.mesures, TAILLE_LATENCES)])
+        if not valeurs:
+            return (0.0,) * len(centiles)
+        return tuple(valeurs[min(len(valeurs) - 1, len(valeurs) * c // 100)] / 1e6
+                     for c in centiles)
+
+    def resume(self):
+        """
+        Résume les touches reçues et appliquées et la latence.
+
+        Returns:
+            str: Le résumé, sur une ligne.
+        """
+        p50, p99 = self.centiles()
+        return (f"{self.recues} touches reçues, {self.appliquees} appliquées, "
+                f"{len(self.file)} en attente, {self.repetees} répétitions ; "
+                f"latence p50 {p50:.1f} ms, p99 {p99:.1f} ms")
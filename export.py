@@ -0,0 +1,209 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Export des images d'une partie enregistrée, sans fenêtre et en parallèle.
+
+La partie (enregistrement.py) est d'abord rejouée sans dessin, ce qui ne
+prend que quelques millisecondes, pour connaître sa durée et copier l'état
+du moteur (Moteur.snapshot) au début de chaque plage d'images. Les plages
+sont ensuite dessinées par un groupe de processus, chacun avec le dessin de
+Jeu._dessiner_plateau dans une image en mémoire (rendu.RenduImage), et
+écrites dans l'ordre :
+- en PNG, un fichier par image (image_000000.png, image_000001.png...) ;
+- en RVB brut, toutes les images à la suite dans un seul fichier, chaque
+  processus écrivant les siennes directement à leur place.
+
+    python export.py partie.tet images/ --format png
+    python export.py partie.tet partie.rgb --format rgb --fps 30
+"""
+
+import argparse
+import bisect
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame
+from constante import IMAGES_PAR_SECONDE, TAILLE_FENETRE, TICKS_PAR_SECONDE
+from enregistrement import Enregistrement
+from moteur import Moteur, Etat, RIEN
+from rendu import RenduImage
+from tetris import Jeu
+
+FORMATS = ("png", "rgb")
+# Nombre d'images dessinées à la suite par un processus (5 s à 60 images/s)
+IMAGES_PAR_PLAGE = 300
+# Nom des fichiers PNG, par numéro d'image
+MODELE_PNG = "image_{:06d}.png"
+# Taille d'une image en RVB brut, en octets
+TAILLE_IMAGE_RGB = TAILLE_FENETRE[0] * TAILLE_FENETRE[1] * 3
+
+
+def pas_image(image: int, fps: int):
+    """
+    Retourne le pas de simulation montré par une image.
+
+    Args:
+        image (int): Le numéro de l'image, à partir de 0 (la partie avant son premier pas).
+        fps (int): Le nombre d'images par seconde de l'export.
+
+    Returns:
+        int: Le numéro du pas (Moteur.ticks).
+    """
+    return image * TICKS_PAR_SECONDE // fps
+
+
+def decouper(enregistrement: Enregistrement, fps: int =IMAGES_PAR_SECONDE,
+             images_par_plage: int =IMAGES_PAR_PLAGE):
+    """
+    Rejoue une partie sans dessin et la découpe en plages d'images.
+
+    Args:
+        enregistrement (Enregistrement): La partie.
+        fps (int, optional): Le nombre d'images par seconde, au plus
+            TICKS_PAR_SECONDE. Par défaut, IMAGES_PAR_SECONDE.
+        images_par_plage (int, optional): Le nombre d'images d'une plage.
+            Par défaut, IMAGES_PAR_PLAGE.
+
+    Returns:
+        tuple: Le nombre d'images de la partie, et la liste des plages
+            (première image, image suivant la dernière, état du moteur au
+            début de la plage sérialisé par Etat.to_bytes).
+    """
+    moteur = Moteur(graine=enregistrement.graine, largeur=enregistrement.largeur,
+                    hauteur=enregistrement.hauteur)
+    actions = dict(zip(enregistrement.ticks, enregistrement.actions))
+    etats = []
+    while True:
+        while moteur.ticks == pas_image(len(etats) * images_par_plage, fps):
+            etats.append(moteur.snapshot().to_bytes())
+        if moteur.ticks >= enregistrement.fin or moteur.perdu:
+            break
+        moteur.tick(actions.get(moteur.ticks, RIEN))
+    # Les images montrent les pas 0 à moteur.ticks compris
+    images = ((moteur.ticks + 1) * fps - 1) // TICKS_PAR_SECONDE + 1
+    plages = [(debut, min(debut + images_par_plage, images), etats[k])
+              for k, debut in enumerate(range(0, images, images_par_plage))]
+    return images, plages
+
+
+def exporter_plage(debut: int, fin: int, etat: bytes, actions: list, fps: int,
+                   format_images: str, sortie: str):
+    """
+    Dessine et écrit une plage d'images. Exécutée dans les processus du groupe.
+
+    Args:
+        debut (int): Le numéro de la première image.
+        fin (int): Le numéro de l'image qui suit la dernière.
+        etat (bytes): L'état du moteur à la première image (Etat.to_bytes).
+        actions (list): Les actions (pas, action) jouées pendant la plage.
+        fps (int): Le nombre d'images par seconde.
+        format_images (str): 'png' ou 'rgb'.
+        sortie (str): Le dossier des PNG, ou le fichier RVB (déjà à sa taille finale).
+
+    Returns:
+        int: Le nombre d'images écrites.
+    """
+    etat = Etat.from_bytes(etat)
+    jeu = Jeu(etat.largeur, etat.hauteur, rendu=RenduImage())
+    # Pas d'attente entre les images
+    jeu.fps = 0
+    moteur, surface = jeu.moteur, jeu.rendu.surface
+    moteur.restore(etat)
+    actions = dict(actions)
+    fichier = None
+    if format_images == "rgb":
+        fichier = open(sortie, "r+b")
+        fichier.seek(debut * TAILLE_IMAGE_RGB)
+    try:
+        for image in range(debut, fin):
+            cible = pas_image(image, fps)
+            while moteur.ticks < cible and not moteur.perdu:
+                moteur.tick(actions.get(moteur.ticks, RIEN))
+            jeu._dessiner_plateau()
+            if fichier is None:
+                pygame.image.save(surface, os.path.join(sortie, MODELE_PNG.format(image)))
+            else:
+                fichier.write(pygame.image.tobytes(surface, "RGB"))
+    finally:
+        if fichier is not None:
+            fichier.close()
+    return fin - debut
+
+
+def exporter(enregistrement: Enregistrement, sortie: str, format_images: str ="png",
+             fps: int =IMAGES_PAR_SECONDE, processus: int =None,
+             images_par_plage: int =IMAGES_PAR_PLAGE):
+    """
+    Exporte toutes les images d'une partie, plage par plage, en parallèle.
+
+    Args:
+        enregistrement (Enregistrement): La partie.
+        sortie (str): Le dossier des PNG (créé si besoin), ou le fichier RVB.
+        format_images (str, optional): 'png' ou 'rgb'. Par défaut, 'png'.
+        fps (int, optional): Le nombre d'images par seconde, au plus
+            TICKS_PAR_SECONDE. Par défaut, IMAGES_PAR_SECONDE.
+        processus (int, optional): Le nombre de processus. Par défaut, un par cœur.
+        images_par_plage (int, optional): Le nombre d'images d'une plage.
+            Par défaut, IMAGES_PAR_PLAGE.
+
+    Returns:
+        int: Le nombre d'images écrites.
+
+    Raises:
+        ValueError: Si le format ou le nombre d'images par seconde est invalide.
+    """
+    if format_images not in FORMATS:
+        raise ValueError(f"format inconnu : {format_images} (parmi {', '.join(FORMATS)})")
+    if not 1 <= fps <= TICKS_PAR_SECONDE:
+        raise ValueError(f"le nombre d'images par seconde doit être entre 1 "
+                         f"et {TICKS_PAR_SECONDE}")
+    images, plages = decouper(enregistrement, fps, images_par_plage)
+    if format_images == "png":
+        os.makedirs(sortie, exist_ok=True)
+    else:
+        with open(sortie, "wb") as fichier:
+            fichier.truncate(images * TAILLE_IMAGE_RGB)
+    ticks = enregistrement.ticks
+    ecrites = 0
+    with ProcessPoolExecutor(max_workers=processus or os.cpu_count() or 1) as groupe:
+        futures = []
+        for debut, fin, etat in plages:
+            # Seules les actions de la plage sont envoyées au processus
+            premier = bisect.bisect_left(ticks, pas_image(debut, fps))
+            dernier = bisect.bisect_right(ticks, pas_image(fin - 1, fps))
+            actions = list(zip(ticks[premier:dernier], enregistrement.actions[premier:dernier]))
+            futures.append(groupe.submit(exporter_plage, debut, fin, etat, actions, fps,
+                                         format_images, sortie))
+        for future in as_completed(futures):
+            ecrites += future.result()
+    return ecrites
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporte les images d'une partie enregistrée.")
+    parser.add_argument("fichier", help="enregistrement écrit par tetris.py --enregistrer")
+    parser.add_argument("sortie", help="dossier des images PNG, ou fichier des images RVB")
+    parser.add_argument("--format", choices=FORMATS, default="png", dest="format_images",
+                        help="png : un fichier par image ; rgb : images brutes à la suite")
+    parser.add_argument("--fps", type=int, default=IMAGES_PAR_SECONDE,
+                        help=f"images par seconde de partie (au plus {TICKS_PAR_SECONDE})")
+    parser.add_argument("--processus", type=int, default=None,
+                        help="nombre de processus (par défaut, un par cœur)")
+    parser.add_argument("--plage", type=int, default=IMAGES_PAR_PLAGE,
+                        help="nombre d'images dessinées à la suite par un processus")
+    args = parser.parse_args()
+    if args.plage < 1:
+        parser.error("--plage doit être au moins 1")
+    debut_export = time.perf_counter()
+    try:
+        nombre = exporter(Enregistrement.charger(args.fichier), args.sortie, args.format_images,
+                          args.fps, args.processus, args.plage)
+    except ValueError as erreur:
+        parser.error(str(erreur))
+    duree = time.perf_counter() - debut_export
+    print(f"{nombre} images ({nombre / args.fps:.1f} s de partie) écrites en {duree:.2f} s, "
+          f"{nombre / duree:.0f} images/s")
+    if args.format_images == "rgb":
+        print(f"ffmpeg -f rawvideo -pix_fmt rgb24 -s {TAILLE_FENETRE[0]}x{TAILLE_FENETRE[1]} "
+              f"-r {args.fps} -i {args.sortie} partie.mp4")
@@ -0,0 +1,293 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Joueur automatique : recherche du meilleur placement des deux pièces connues.
+
+Pour la pièce courante puis pour la pièce suivante, toutes les positions
+d'arrivée (rotation, colonne) sont énumérées à partir des tables FORMES. Une
+pièce qui arrive d'au-dessus du plateau peut atteindre chacune d'elles en
+tournant puis en se déplaçant avant de tomber, et sa ligne d'arrivée se
+déduit de la hauteur des colonnes.
+
+Les plateaux obtenus sont évalués tous ensemble avec NumPy : chaque plateau
+est une ligne d'un tableau (candidats, hauteur) d'entiers, un bit par case
+comme dans PlateauBits. La note d'un plateau combine la hauteur cumulée des
+colonnes, les lignes complétées, les trous et les différences de hauteur
+entre colonnes voisines, toutes comptées par des ET, OU et comptes de bits.
+
+Le placement choisi ne dépend que des cases occupées et des deux pièces :
+il est gardé dans une table de transposition (zobrist.py), par clé de
+Zobrist, et n'est pas recalculé quand la même position revient.
+"""
+
+import numpy as np
+from constante import DIM_PLATEAU, FORMES, PIECES_KEYS
+from moteur import Moteur, GAUCHE, DROITE, ROTATION, CHUTE, RIEN
+from zobrist import TableTransposition
+
+# Poids de la note d'un plateau : hauteur cumulée, lignes, trous, bosses
+POIDS = (-0.510066, 0.760666, -0.35663, -0.184483)
+# Valeur renvoyée par la table de transposition pour une position absente
+_ABSENTE = object()
+
+
+class IA:
+    """
+    Cette classe choisit le placement des pièces et les actions qui y mènent.
+
+    Elle s'utilise comme source d'actions : action(moteur) renvoie l'action
+    à jouer pour la pièce courante du moteur.
+    """
+
+    def __init__(self, poids: tuple =POIDS, largeur: int =DIM_PLATEAU[0],
+                 hauteur: int =DIM_PLATEAU[1], table: TableTransposition =None):
+        """
+        Prépare les positions d'arrivée de chaque pièce.
+
+        Args:
+            poids (tuple, optional): Les poids de la hauteur cumulée, des lignes,
+                des trous et des bosses. Par défaut, POIDS.
+            largeur (int, optional): Le nombre de colonnes. Par défaut, DIM_PLATEAU[0].
+            hauteur (int, optional): Le nombre de lignes. Par défaut, DIM_PLATEAU[1].
+            table (TableTransposition, optional): La table des placements déjà
+                choisis ; TableTransposition(0) n'en garde aucun. Par défaut,
+                une table de TAILLE_TABLE_TRANSPOSITION entrées.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.poids = poids
+        self.largeur, self.hauteur = largeur, hauteur
+        self.plein = (1 << largeur) - 1
+        # Nombre de bits à 1 de chaque ligne possible
+        self.nombre_bits = np.array([bin(i).count("1") for i in range(1 << largeur)], np.int32)
+        self.candidats = [self._candidats(FORMES[nom]) for nom in PIECES_KEYS]
+        # Placement visé (rotation, x) pour la pièce numéro pieces du moteur
+        self._piece, self._cible = None, None
+        self.table = TableTransposition() if table is None else table
+
+    def _candidats(self, rotations):
+        """
+        Énumère les positions d'arrivée possibles d'une pièce.
+
+        Args:
+            rotations (tuple): Les tables (Forme) de chaque rotation de la pièce.
+
+        Returns:
+            tuple: Les tableaux (rotations, positions, colonnes, decalages, masques) :
+                la rotation et la position horizontale de chaque candidat, la
+                colonne et le décalage vertical de chacune de ses 4 cases, et le
+                masque de bits de chacune des 4 lignes de sa matrice.
+        """
+        liste = []
+        for rotation, forme in enumerate(rotations):
+            xmin, _, xmax, _ = forme.boite
+            for x in range(-xmin, self.largeur - xmax):
+                masques = [0] * 4
+                for cx, cy in forme.cases:
+                    masques[cy] |= 1 << cx + x
+                liste.append((rotation, x, [cx + x for cx, cy in forme.cases],
+                              [cy for cx, cy in forme.cases], masques))
+        return tuple(np.array([c[i] for c in liste]) for i in range(5))
+
+    def _hauteurs(self, grilles):
+        """
+        Calcule la hauteur de chaque colonne de quelques plateaux.
+
+        Args:
+            grilles (numpy.ndarray): Les plateaux sans ligne complète, (N, hauteur).
+
+        Returns:
+            numpy.ndarray: La hauteur des colonnes, de forme (N, largeur).
+        """
+        cumul = np.bitwise_or.accumulate(grilles, axis=1)
+        return (cumul[:, :, None] >> np.arange(self.largeur) & 1).sum(axis=1)
+
+    def _arrivees(self, hauteurs, colonnes, decalages):
+        """
+        Calcule la ligne d'arrivée de chaque candidat sur chaque plateau.
+
+        Une pièce lâchée d'au-dessus s'arrête dès qu'une de ses cases touche
+        le sommet de sa colonne.
+
+        Args:
+            hauteurs (numpy.ndarray): La hauteur des colonnes, de forme (P, largeur).
+            colonnes (numpy.ndarray): Les colonnes des cases des C candidats, (C, 4).
+            decalages (numpy.ndarray): Les décalages verticaux des cases, (C, 4).
+
+        Returns:
+            numpy.ndarray: La position verticale d'arrivée, de forme (P, C).
+        """
+        return (self.hauteur - 1 - hauteurs[:, colonnes] - decalages).min(axis=2)
+
+    def _poser(self, grilles, arrivees, decalages, masques):
+        """
+        Pose chaque candidat sur chaque plateau.
+
+        Args:
+            grilles (numpy.ndarray): Les P plateaux, de forme (P, hauteur).
+            arrivees (numpy.ndarray): Les positions d'arrivée, de forme (P, C).
+            decalages (numpy.ndarray): Les décalages verticaux des cases, (C, 4).
+            masques (numpy.ndarray): Les masques des 4 lignes des candidats, (C, 4).
+
+        Returns:
+            tuple: Les P * C plateaux obtenus, de forme (P * C, hauteur), et un
+                tableau de booléens, vrai pour les pièces sorties par le haut.
+        """
+        p, c = arrivees.shape
+        debordes = (arrivees[:, :, None] + decalages < 0).any(axis=2).ravel()
+        # Les lignes sans case de la matrice (masque nul) peuvent sortir du
+        # plateau : elles sont ramenées au bord, où leur OU ne change rien.
+        lignes = np.clip(arrivees[:, :, None] + np.arange(4), 0, self.hauteur - 1)
+        resultats = np.repeat(grilles, c, axis=0)
+        indices = np.arange(p * c).reshape(p, c, 1)
+        resultats[indices, lignes] |= masques
+        return resultats, debordes
+
+    def _mesurer(self, grilles):
+        """
+        Mesure la forme des plateaux une fois leurs lignes complètes retirées.
+
+        Les lignes ne sont pas déplacées. Une ligne complète est sous le sommet
+        de chaque colonne : la retirer baisse la colonne d'une case sans
+        changer ses trous, il suffit donc de l'ignorer. Le OU cumulé des
+        lignes, depuis le haut, a un bit à 1 pour chaque case située sous le
+        sommet de sa colonne ; la hauteur cumulée est le nombre de ces bits,
+        et l'écart entre deux colonnes voisines le nombre de lignes où leurs
+        bits diffèrent.
+
+        Args:
+            grilles (numpy.ndarray): Les plateaux, de forme (N, hauteur).
+
+        Returns:
+            tuple: Le nombre de lignes complètes, la hauteur cumulée des colonnes,
+                le nombre de trous et la somme des écarts entre colonnes voisines,
+                chacun de forme (N,).
+        """
+        completes = grilles == self.plein
+        restantes = np.where(completes, 0, grilles)
+        cumul = np.where(completes, 0, np.bitwise_or.accumulate(restantes, axis=1))
+        bits = self.nombre_bits
+        hauteur = bits[cumul].sum(axis=1)
+        trous = hauteur - bits[restantes].sum(axis=1)
+        bosses = bits[(cumul ^ cumul >> 1) & self.plein >> 1].sum(axis=1)
+        return completes.sum(axis=1), hauteur, trous, bosses
+
+    def _retirer(self, grilles, lignes):
+        """
+        Retire les lignes complètes des plateaux.
+
+        Les lignes complètes sont ramenées en haut de chaque plateau par un
+        tri stable, puis vidées.
+
+        Args:
+            grilles (numpy.ndarray): Les plateaux, de forme (N, hauteur).
+            lignes (numpy.ndarray): Le nombre de lignes complètes de chaque plateau.
+
+        Returns:
+            numpy.ndarray: Les plateaux sans leurs lignes complètes.
+        """
+        if not lignes.any():
+            return grilles
+        ordre = np.argsort(grilles != self.plein, axis=1, kind="stable")
+        grilles = np.take_along_axis(grilles, ordre, axis=1)
+        grilles[np.arange(self.hauteur) < lignes[:, None]] = 0
+        return grilles
+
+    def _noter(self, lignes, hauteur, trous, bosses):
+        """
+        Note des plateaux : plus la note est haute, meilleur est le plateau.
+
+        Args:
+            lignes (numpy.ndarray): Le nombre de lignes complétées.
+            hauteur (numpy.ndarray): La hauteur cumulée des colonnes.
+            trous (numpy.ndarray): Le nombre de trous.
+            bosses (numpy.ndarray): La somme des écarts entre colonnes voisines.
+
+        Returns:
+            numpy.ndarray: La note de chaque plateau.
+        """
+        a, b, c, d = self.poids
+        return a * hauteur + b * lignes + c * trous + d * bosses
+
+    def choisir(self, grille, piece: int, suivante: int =None):
+        """
+        Choisit le placement de la pièce courante.
+
+        Avec la pièce suivante, chaque placement de la pièce courante est
+        noté par le meilleur plateau obtenu en posant ensuite la suivante.
+
+        Args:
+            grille (list): Le plateau, une liste de lignes de couleurs (0 si vide).
+            piece (int): L'indice de la pièce courante dans PIECES_KEYS.
+            suivante (int, optional): L'indice de la pièce suivante.
+                Par défaut, aucune.
+
+        Returns:
+            tuple: La rotation et la position horizontale choisies, ou None
+                si toutes les positions font perdre la partie.
+        """
+        grilles = (np.array(grille, dtype=bool) << np.arange(self.largeur)).sum(axis=1)[None]
+        rotations, positions, colonnes, decalages, masques = self.candidats[piece]
+        arrivees = self._arrivees(self._hauteurs(grilles), colonnes, decalages)
+        grilles, debordes = self._poser(grilles, arrivees, decalages, masques)
+        lignes, *forme = self._mesurer(grilles)
+        if suivante is None:
+            notes = self._noter(lignes, *forme)
+        else:
+            # Seuls les plateaux de la pièce courante sont réellement compactés,
+            # ceux de la pièce suivante sont seulement mesurés
+            grilles = self._retirer(grilles, lignes)
+            _, _, colonnes2, decalages2, masques2 = self.candidats[suivante]
+            arrivees2 = self._arrivees(self._hauteurs(grilles), colonnes2, decalages2)
+            grilles2, debordes2 = self._poser(grilles, arrivees2, decalages2, masques2)
+            lignes2, *forme2 = self._mesurer(grilles2)
+            notes2 = self._noter(lignes2 + np.repeat(lignes, len(colonnes2)), *forme2)
+            notes2[debordes2] = -np.inf
+            notes = notes2.reshape(len(colonnes), len(colonnes2)).max(axis=1)
+        notes[debordes] = -np.inf
+        meilleur = int(notes.argmax())
+        if notes[meilleur] == -np.inf:
+            return None
+        return int(rotations[meilleur]), int(positions[meilleur])
+
+    def action(self, moteur: Moteur):
+        """
+        Retourne l'action qui rapproche la pièce courante du placement choisi.
+
+        Le placement est choisi une fois par pièce, ou repris de la table de
+        transposition si la position (plateau et pièces) a déjà été vue ; la
+        pièce est ensuite tournée, déplacée puis lâchée.
+
+        Args:
+            moteur (Moteur): Le moteur de la partie.
+
+        Returns:
+            int: L'action à jouer.
+        """
+        if moteur.current is None:
+            # La prochaine action fera entrer la pièce suivante
+            return RIEN
+        if self._piece != moteur.pieces:
+            self._piece = moteur.pieces
+            piece, suivante = moteur.current[0].indice, moteur.next[0].indice
+            zobrist = moteur.hachage()
+            cle = zobrist.valeur ^ zobrist.pieces[piece][0] ^ zobrist.suivantes[suivante]
+            self._cible = self.table.chercher(cle, _ABSENTE)
+            if self._cible is _ABSENTE:
+                # Lignes denses quel que soit le plateau (PlateauCreux garde des
+                # dictionnaires de cases occupées)
+                plateau = moteur.plateau
+                grille = plateau.fenetre(0, 0, plateau.largeur, plateau.hauteur)
+                self._cible = self.choisir(grille, piece, suivante)
+                self.table.ranger(cle, self._cible)
+        if self._cible is None:
+            return CHUTE
+        x, _, rotation = moteur.position
+        if rotation != self._cible[0]:
+            return ROTATION
+        if x < self._cible[1]:
+            return DROITE
+        if x > self._cible[1]:
+            return GAUCHE
+        return CHUTE
@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Configuration de la journalisation du jeu.
+
+Chaque module écrit dans son propre logger (logging.getLogger(__name__)) avec
+des arguments différés : le message n'est formaté que si son niveau est actif.
+Sans appel à configurer, seuls les avertissements et les erreurs sont affichés,
+ce qui rend le jeu silencieux en production.
+
+En mode asynchrone, les messages sont déposés dans une file par un
+QueueHandler et écrits par un thread séparé (QueueListener) : les entrées
+sorties ne bloquent jamais la boucle de jeu.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+
+FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+# Niveaux acceptés par configurer (option --journal des programmes)
+NIVEAUX = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+
+def configurer(niveau: str ="WARNING", fichier: str =None, asynchrone: bool =True):
+    """
+    Configure la journalisation de tous les modules du jeu.
+
+    Args:
+        niveau (str, optional): Le niveau minimal des messages, parmi
+            NIVEAUX (en majuscules ou non). Par défaut, WARNING.
+        fichier (str, optional): Le fichier où écrire le journal.
+            Par défaut, la sortie d'erreur.
+        asynchrone (bool, optional): Écrit le journal depuis un thread séparé.
+            Par défaut, True.
+
+    Returns:
+        logging.handlers.QueueListener or None: Le thread d'écriture en mode
+            asynchrone (arrêté automatiquement à la sortie), sinon None.
+
+    Raises:
+        ValueError: Si le niveau est inconnu.
+    """
+    if niveau.upper() not in NIVEAUX:
+        raise ValueError(f"niveau de journal inconnu : {niveau} (parmi {', '.join(NIVEAUX)})")
+    racine = logging.getLogger()
+    racine.setLevel(niveau.upper())
+    for handler in racine.handlers[:]:
+        racine.removeHandler(handler)
+    if fichier:
+        sortie = logging.FileHandler(fichier, encoding="utf-8")
+    else:
+        sortie = logging.StreamHandler()
+    sortie.setFormatter(logging.Formatter(FORMAT))
+    if not asynchrone:
+        racine.addHandler(sortie)
+        return None
+    file_messages = queue.SimpleQueue()
+    racine.addHandler(logging.handlers.QueueHandler(file_messages))
+    ecrivain = logging.handlers.QueueListener(file_messages, sortie)
+    ecrivain.start()
+    atexit.register(ecrivain.stop)
+    return ecrivain
@@ -0,0 +1,568 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Moteur de règles du Tetris, indépendant de Pygame.
+
+Ce module contient toute la logique du jeu (plateau, pièce courante et suivante,
+score, niveau, compteurs) sans affichage, sans police et sans attente, afin de
+pouvoir simuler des milliers de parties par seconde. La classe Jeu du module
+tetris n'est qu'une interface graphique au-dessus de ce moteur.
+"""
+
+import logging
+import os
+import struct
+from constante import DIM_PLATEAU, FORMES, PIECES_KEYS, DELAIS_CHUTE
+from plateau import PlateauBits
+from zobrist import Zobrist
+
+# Actions comprises par Moteur.step et Moteur.tick
+RIEN, GAUCHE, DROITE, BAS, ROTATION, CHUTE = range(6)
+ACTIONS = (RIEN, GAUCHE, DROITE, BAS, ROTATION, CHUTE)
+
+MASQUE_64 = (1 << 64) - 1
+
+# Format binaire d'un Etat : version, dimensions, pièces, position, perdu,
+# niveau, score, pieces, lignes, tetris, ticks, attente de chute, générateur, graine
+FORMAT_ETAT = struct.Struct("<BHHbbBhhBHIIIIIHQQ")
+VERSION_ETAT = 1
+# Table de bytes.translate : b"1" pour une case occupée, b"0" sinon
+_OCCUPATION = bytes([ord("0")] + [ord("1")] * 255)
+
+journal = logging.getLogger(__name__)
+
+
+class Generateur:
+    """
+    Générateur pseudo-aléatoire des pièces (SplitMix64).
+
+    Son état tient dans un entier de 64 bits et la suite tirée ne dépend que
+    de la graine, quelle que soit la version de Python : une partie rejouée
+    avec la même graine reçoit exactement les mêmes pièces.
+    """
+
+    def __init__(self, graine: int):
+        """
+        Crée un générateur à partir d'une graine.
+
+        Args:
+            graine (int): La graine, ramenée sur 64 bits.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.etat = graine & MASQUE_64
+
+    def suivant(self, n: int):
+        """
+        Tire un entier entre 0 et n - 1.
+
+        Args:
+            n (int): Le nombre de valeurs possibles.
+
+        Returns:
+            int: L'entier tiré.
+        """
+        self.etat = (self.etat + 0x9E3779B97F4A7C15) & MASQUE_64
+        z = self.etat
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASQUE_64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASQUE_64
+        z ^= z >> 31
+        return (z * n) >> 64
+
+
+class Etat:
+    """
+    Cette classe représente une copie de l'état d'une partie, prise par
+    Moteur.snapshot et remise en place par Moteur.restore.
+
+    Tous les attributs sont des entiers, des tuples ou des bytes : un état
+    n'est jamais modifié, il peut être gardé ou partagé sans être copié.
+    Les pièces sont identifiées par leur indice dans PIECES_KEYS (-1 s'il
+    n'y a pas de pièce courante).
+    """
+
+    __slots__ = ("largeur", "hauteur", "plateau", "classe_plateau", "piece", "suivante",
+                 "position", "perdu", "niveau", "score", "pieces", "lignes", "tetris",
+                 "ticks", "attente_chute", "generateur", "graine", "zobrist")
+
+    @property
+    def cases(self):
+        """
+        Retourne la couleur de chaque case du plateau.
+
+        Returns:
+            bytes: Les couleurs, ligne par ligne (0 pour une case vide).
+        """
+        return self.plateau[0]
+
+    def to_bytes(self):
+        """
+        Sérialise l'état dans un format binaire compact et stable.
+
+        Après l'en-tête (FORMAT_ETAT), le plateau est écrit comme un bit par
+        case (1 si elle est occupée) puis la couleur des cases occupées,
+        deux par octet.
+
+        Returns:
+            bytes: L'état sérialisé.
+        """
+        x, y, rotation = self.position
+        entete = FORMAT_ETAT.pack(VERSION_ETAT, self.largeur, self.hauteur, self.piece,
+                                  self.suivante, rotation, x, y, self.perdu, self.niveau,
+                                  self.score, self.pieces, self.lignes, self.tetris,
+                                  self.ticks, self.attente_chute, self.generateur, self.graine)
+        cases = self.cases
+        masque = int(cases.translate(_OCCUPATION)[::-1], 2)
+        couleurs = cases.replace(b"\x00", b"")
+        if len(couleurs) % 2:
+            couleurs += b"\x00"
+        return (entete + masque.to_bytes((len(cases) + 7) // 8, "little")
+                + bytes(couleurs[i] << 4 | couleurs[i + 1] for i in range(0, len(couleurs), 2)))
+
+    @classmethod
+    def from_bytes(cls, donnees: bytes):
+        """
+        Lit un état écrit par to_bytes.
+
+        Args:
+            donnees (bytes): L'état sérialisé.
+
+        Returns:
+            Etat: L'état lu.
+
+        Raises:
+            ValueError: Si les données ne sont pas un état valide.
+        """
+        if len(donnees) < FORMAT_ETAT.size or donnees[0] != VERSION_ETAT:
+            raise ValueError("ce n'est pas un état de partie")
+        etat = cls()
+        (_, etat.largeur, etat.hauteur, etat.piece, etat.suivante, rotation, x, y, perdu,
+         etat.niveau, etat.score, etat.pieces, etat.lignes, etat.tetris, etat.ticks,
+         etat.attente_chute, etat.generateur, etat.graine) = FORMAT_ETAT.unpack_from(donnees)
+        etat.position, etat.perdu = (x, y, rotation), bool(perdu)
+        taille = etat.largeur * etat.hauteur
+        debut = FORMAT_ETAT.size + (taille + 7) // 8
+        masque = int.from_bytes(donnees[FORMAT_ETAT.size:debut], "little")
+        occupees = masque.bit_count()
+        # Taille attendue : en-tête, masque, puis deux couleurs par octet
+        if len(donnees) != debut + (occupees + 1) // 2 or masque >> taille:
+            raise ValueError("état de partie de taille incorrecte")
+        couleurs = [c for octet in donnees[debut:] for c in (octet >> 4, octet & 15)]
+        cases = bytearray(taille)
+        i = 0
+        while masque:
+            bas = masque & -masque
+            cases[bas.bit_length() - 1] = couleurs[i]
+            masque ^= bas
+            i += 1
+        etat.plateau, etat.classe_plateau = (bytes(cases),), None
+        # La clé de Zobrist n'est pas sérialisée : elle est recalculée
+        etat.zobrist = None
+        return etat
+
+
+class Moteur:
+    """
+    Cette classe représente l'état et les règles d'une partie de Tetris.
+    """
+
+    def __init__(self, plateau=PlateauBits, graine: int =None, largeur: int =DIM_PLATEAU[0],
+                 hauteur: int =DIM_PLATEAU[1]):
+        """
+        Initialise un moteur avec une partie prête à être jouée.
+
+        Args:
+            plateau (type, optional): La classe de plateau à utiliser
+                (PlateauBits, PlateauListe ou PlateauCreux). Par défaut, PlateauBits.
+            graine (int, optional): La graine du tirage des pièces. Par défaut,
+                une graine aléatoire, gardée dans l'attribut graine.
+            largeur (int, optional): Le nombre de colonnes du plateau, au moins 4.
+                Par défaut, DIM_PLATEAU[0].
+            hauteur (int, optional): Le nombre de lignes du plateau.
+                Par défaut, DIM_PLATEAU[1].
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.classe_plateau = plateau
+        self.dimensions = largeur, hauteur
+        # Incrémenté à chaque changement visible de l'état (pièce ou plateau)
+        self.version = 0
+        # Clé de Zobrist du plateau (zobrist.Zobrist), créée par le premier
+        # appel à hachage puis tenue à jour à chaque pièce posée
+        self.zobrist = None
+        self.reset(graine)
+
+    def _get_piece(self):
+        """
+        Retourne une pièce Tetris aléatoire parmi les pièces disponibles.
+
+        Returns:
+            tuple: Les tables (Forme) de chaque rotation de la pièce tirée.
+        """
+        return FORMES[PIECES_KEYS[self.generateur.suivant(len(PIECES_KEYS))]]
+
+    def _get_current_piece_color(self):
+        """
+        Retourne la couleur de la pièce Tetris actuelle.
+
+        Returns:
+            int: L'indice de couleur de la pièce Tetris actuelle.
+        """
+        return self.current[0].couleur
+
+    def _calculer_donnees_piece_courante(self):
+        """
+        Calcule les coordonnées de la pièce Tetris actuelle
+        en fonction de sa position et de son orientation.
+
+        Ces coordonnées sont stockées dans l'attribut coordonnees, et la pièce
+        préparée pour le plateau dans l'attribut forme.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        x, y, rotation = self.position
+        self.forme = self.preparees[rotation]
+        self.coordonnees = [[cx + x, cy + y] for cx, cy in self.current[rotation].cases]
+        self.version += 1
+
+    @property
+    def cle(self):
+        """
+        Retourne la clé de Zobrist de la position : cases occupées du plateau,
+        pièce courante, rotation et position.
+
+        La clé du plateau est tenue à jour à chaque pièce posée ; celle de la
+        pièce n'est combinée qu'à la lecture, pour ne rien coûter aux
+        déplacements.
+
+        Returns:
+            int: La clé, sur 64 bits.
+        """
+        zobrist = self.hachage()
+        if self.current is None:
+            return zobrist.valeur
+        x, y, rotation = self.position
+        return zobrist.valeur ^ zobrist.piece(self.current[0].indice, x, y, rotation)
+
+    def hachage(self):
+        """
+        Retourne la clé de Zobrist du plateau, en la créant au premier appel.
+
+        La clé n'est calculée entièrement qu'une fois, puis tenue à jour à
+        chaque pièce posée et ligne retirée : les parties qui ne lisent
+        jamais de clé ne paient pas ce suivi.
+
+        Returns:
+            zobrist.Zobrist: La clé du plateau (attribut valeur) et ses tables.
+        """
+        if self.zobrist is None:
+            self.zobrist = Zobrist(*self.dimensions)
+            self.zobrist.charger(self.plateau.sauver()[0])
+        return self.zobrist
+
+    def _est_valide(self, x: int =0, y: int =0, rotation: int =0):
+        """
+        Vérifie si la position d'une pièce est valide sur le plateau.
+
+        Args:
+            x (int, optional): Le décalage horizontal de la position.
+                Par défaut, x = 0.
+            y (int, optional): Le décalage vertical de la position.
+                Par défaut, y = 0.
+            rotation (int, optional): Le décalage de rotation de la pièce.
+                Par défaut, rotation = 0.
+
+        Returns:
+            bool: True si la position est valide, sinon False.
+        """
+        if rotation == 0:
+            forme = self.forme
+        else:
+            forme = self.preparees[(self.position[2] + rotation) % len(self.current)]
+        return self.plateau.est_libre(forme, self.position[0] + x, self.position[1] + y)
+
+    def _poser_piece(self):
+        """
+        Place la pièce Tetris actuelle sur le plateau lorsque la chute est terminée.
+
+        Met à jour le plateau, retire les lignes complétées et calcule le score,
+        le niveau et le nombre de Tetris.
+
+        Returns:
+            int: Le nombre de lignes complétées par cette pièce.
+        """
+        journal.debug("La pièce est posée")
+        if self.position[1] <= 0:
+            self.perdu = True
+        # Ajout de la pièce parmi le plateau et retrait des lignes complétées
+        lignes = self.plateau.poser(self.coordonnees, self._get_current_piece_color())
+        if self.zobrist is not None:
+            self.zobrist.poser(self.coordonnees)
+        if lignes:
+            journal.debug("%d ligne(s) complétée(s), plateau : %s", lignes, self.plateau.couleurs)
+        # calculer le score et autre
+        self.lignes += lignes
+        self.score += lignes * self.niveau
+        self.niveau = int(self.lignes / 10) + 1
+        if lignes >= 4:
+            self.tetris += 1
+            self.score += self.niveau * self.tetris
+        # Travail avec la pièce courante terminé
+        self.current = None
+        self.version += 1
+        return lignes
+
+    def _first(self):
+        """
+        Initialise la partie en créant un plateau vide et en remettant
+        les statistiques à zéro.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.plateau = self.classe_plateau(*self.dimensions)
+        if self.zobrist is not None:
+            self.zobrist.vider()
+        self.version += 1
+        # Pièces préparées pour ce plateau, par indice de pièce puis par rotation
+        self._preparees = [tuple(self.plateau.preparer(forme.cases) for forme in FORMES[nom])
+                           for nom in PIECES_KEYS]
+        self.score, self.pieces, self.lignes, self.tetris, self.niveau = 0, 0, 0, 0, 1
+        self.current, self.next, self.perdu = None, self._get_piece(), False
+        self.position, self.coordonnees = [0, 0, 0], []
+        self.forme, self.preparees = None, ()
+
+    def _next(self):
+        """
+        Prépare la pièce Tetris suivante pour le jeu.
+
+        La pièce suivante devient la pièce courante, une nouvelle pièce suivante
+        est tirée et la position de la pièce courante est réinitialisée.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        journal.debug("Piece suivante")
+        self.current, self.next = self.next, self._get_piece()
+        self.preparees = self._preparees[self.current[0].indice]
+        self.pieces += 1
+        self.position = [int(self.dimensions[0] / 2) - 2, -4, 0]
+        self.attente_chute = 0
+        self._calculer_donnees_piece_courante()
+
+    def drop_distance(self):
+        """
+        Calcule de combien de lignes la pièce courante peut encore tomber.
+
+        Le calcul utilise la hauteur des colonnes tenue à jour par le plateau
+        et le profil bas de la pièce, en O(largeur de la pièce). Si la pièce
+        est glissée sous un surplomb, elle est descendue ligne par ligne.
+        Sert à la chute immédiate, à la gravité et peut servir à afficher
+        une pièce fantôme.
+
+        Returns:
+            int: Le nombre de lignes de chute possibles depuis la position
+                courante, supposée valide.
+        """
+        x, y, rotation = self.position
+        distance = self.plateau.distance_chute(self.current[rotation].profil, x, y)
+        if distance is None:
+            distance = 0
+            while self._est_valide(y=distance + 1):
+                distance += 1
+        return distance
+
+    def snapshot(self):
+        """
+        Copie l'état de la partie, pour le remettre en place avec restore.
+
+        Seuls des objets immuables sont créés : le plateau (et sa clé de
+        Zobrist) sous forme de bytes et de tuples, les pièces par leur indice.
+        Une copie ne coûte que quelques microsecondes, bien moins que
+        copy.deepcopy du moteur.
+
+        Returns:
+            Etat: L'état de la partie.
+        """
+        etat = Etat()
+        etat.largeur, etat.hauteur = self.plateau.largeur, self.plateau.hauteur
+        etat.plateau, etat.classe_plateau = self.plateau.sauver(), self.classe_plateau
+        etat.zobrist = None if self.zobrist is None else self.zobrist.sauver()
+        etat.piece = -1 if self.current is None else self.current[0].indice
+        etat.suivante = self.next[0].indice
+        etat.position, etat.perdu = tuple(self.position), self.perdu
+        etat.niveau, etat.score, etat.pieces = self.niveau, self.score, self.pieces
+        etat.lignes, etat.tetris = self.lignes, self.tetris
+        etat.ticks, etat.attente_chute = self.ticks, self.attente_chute
+        etat.generateur, etat.graine = self.generateur.etat, self.graine
+        return etat
+
+    def restore(self, etat: Etat):
+        """
+        Remet la partie dans un état pris par snapshot (ou lu par Etat.from_bytes).
+
+        Args:
+            etat (Etat): L'état à remettre en place.
+
+        Returns:
+            Aucune valeur de retour.
+
+        Raises:
+            ValueError: Si l'état vient d'un plateau de dimensions différentes.
+        """
+        plateau = self.plateau
+        if (etat.largeur, etat.hauteur) != (plateau.largeur, plateau.hauteur):
+            raise ValueError(f"état d'un plateau {etat.largeur}x{etat.hauteur}, "
+                             f"le moteur a un plateau {plateau.largeur}x{plateau.hauteur}")
+        if etat.classe_plateau is self.classe_plateau:
+            plateau.restaurer(etat.plateau)
+        else:
+            plateau.charger(etat.cases)
+        if self.zobrist is not None:
+            if etat.zobrist is not None:
+                self.zobrist.restaurer(etat.zobrist)
+            else:
+                self.zobrist.charger(etat.cases)
+        self.next = FORMES[PIECES_KEYS[etat.suivante]]
+        self.position, self.perdu = list(etat.position), etat.perdu
+        self.niveau, self.score, self.pieces = etat.niveau, etat.score, etat.pieces
+        self.lignes, self.tetris = etat.lignes, etat.tetris
+        self.ticks, self.attente_chute = etat.ticks, etat.attente_chute
+        self.generateur.etat, self.graine = etat.generateur, etat.graine
+        if etat.piece < 0:
+            self.current, self.preparees, self.forme, self.coordonnees = None, (), None, []
+            self.version += 1
+        else:
+            self.current = FORMES[PIECES_KEYS[etat.piece]]
+            self.preparees = self._preparees[etat.piece]
+            self._calculer_donnees_piece_courante()
+
+    def reset(self, graine: int =None):
+        """
+        Recommence une nouvelle partie sur ce moteur.
+
+        Args:
+            graine (int, optional): La graine du tirage des pièces. Par défaut,
+                une nouvelle graine aléatoire.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        if graine is None:
+            graine = int.from_bytes(os.urandom(8), "little")
+        self.graine = graine & MASQUE_64
+        self.generateur = Generateur(self.graine)
+        self.ticks, self.attente_chute = 0, 0
+        self._first()
+
+    def action(self, action: int):
+        """
+        Applique une action du joueur à la pièce courante.
+
+        Args:
+            action (int): Une des constantes RIEN, GAUCHE, DROITE, BAS,
+                ROTATION ou CHUTE.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        if self.current is None:
+            self._next()
+        if action == RIEN:
+            # Rien n'a bougé : les données de la pièce restent valables
+            return
+        if action == GAUCHE:
+            journal.debug("Mouvement vers la gauche")
+            if self._est_valide(x=-1):
+                self.position[0] -= 1
+        elif action == DROITE:
+            journal.debug("Mouvement vers la droite")
+            if self._est_valide(x=1):
+                self.position[0] += 1
+        elif action == BAS:
+            journal.debug("Mouvement vers le bas")
+            if self._est_valide(y=1):
+                self.position[1] += 1
+        elif action == ROTATION:
+            journal.debug("Mouvement de rotation")
+            if self._est_valide(rotation=1):
+                self.position[2] = (self.position[2] + 1) % len(self.current)
+        elif action == CHUTE:
+            journal.debug("Mouvement de chute %s / %s", self.position, self.coordonnees)
+            if self.position[1] <= 0:
+                self.position[1] = 1
+                self._calculer_donnees_piece_courante()
+            if self._est_valide():
+                self.position[1] += self.drop_distance()
+            else:
+                self.position[1] -= 1
+        self._calculer_donnees_piece_courante()
+
+    def gravite(self):
+        """
+        Fait descendre la pièce courante d'une ligne, ou la pose si elle
+        ne peut plus descendre.
+
+        Returns:
+            int: Le nombre de lignes complétées si la pièce a été posée, sinon 0.
+        """
+        if self.current is None:
+            self._next()
+        if not self._est_valide():
+            journal.debug("On est dans une position invalide")
+            self.position[1] -= 1
+            self._calculer_donnees_piece_courante()
+            return self._poser_piece()
+        if self.drop_distance() == 0:
+            return self._poser_piece()
+        journal.debug("On déplace vers le bas")
+        self.position[1] += 1
+        self._calculer_donnees_piece_courante()
+        return 0
+
+    def step(self, action: int =RIEN):
+        """
+        Avance la simulation d'un pas : applique l'action puis la gravité.
+
+        Aucun temps réel n'est utilisé, un pas correspond à une chute d'une ligne.
+
+        Args:
+            action (int, optional): L'action du joueur pour ce pas.
+                Par défaut, RIEN.
+
+        Returns:
+            int: Le nombre de lignes complétées pendant ce pas.
+        """
+        if self.perdu:
+            return 0
+        self.action(action)
+        return self.gravite()
+
+    def tick(self, action: int =RIEN):
+        """
+        Avance la simulation d'un pas de temps fixe (1 / TICKS_PAR_SECONDE s).
+
+        L'action est appliquée, puis la pièce descend d'une ligne si elle a
+        attendu assez de pas depuis sa dernière chute ; ce délai diminue
+        avec le niveau (DELAIS_CHUTE). Avec la même graine et les mêmes
+        actions aux mêmes pas, deux parties sont identiques.
+
+        Args:
+            action (int, optional): L'action du joueur pour ce pas.
+                Par défaut, RIEN.
+
+        Returns:
+            int: Le nombre de lignes complétées pendant ce pas.
+        """
+        if self.perdu:
+            return 0
+        self.ticks += 1
+        self.action(action)
+        self.attente_chute += 1
+        if self.attente_chute < DELAIS_CHUTE[min(self.niveau, len(DELAIS_CHUTE)) - 1]:
+            return 0
+        self.attente_chute = 0
+        return self.gravite()
@@ -0,0 +1,702 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Représentations du plateau de jeu utilisées par le moteur.
+
+Trois implémentations partagent la même interface, celle de la classe Plateau :
+- PlateauListe : la grille historique, une liste de lignes de couleurs.
+- PlateauBits : chaque ligne est un entier dont les bits indiquent les cases
+  occupées. Les collisions se font par ET binaire, une ligne est complète
+  lorsqu'elle vaut le masque plein. Les couleurs sont gardées à part,
+  uniquement pour l'affichage.
+- PlateauCreux : pour les très grands plateaux, chaque ligne est un masque
+  de bits et un dictionnaire des seules cases occupées. La mémoire suit le
+  nombre de cases occupées, et tester ou poser une pièce ne coûte pas plus
+  cher sur un grand plateau.
+
+Une pièce est d'abord préparée par preparer() à partir de ses cases relatives,
+puis testée par est_libre() à n'importe quelle position.
+"""
+
+from constante import DIM_PLATEAU
+
+# Nombre de cases de mur autour d'un PlateauBits, au moins la taille d'une pièce
+MARGE = 4
+
+
+def compacter(rangees, completees, nouvelles, decalage: int =0):
+    """
+    Retire des rangées et ajoute des rangées vides en haut, en une seule passe.
+
+    Les rangées sont retirées en partant du bas, ce qui ne décale que les
+    rangées situées en dessous (peu nombreuses, les lignes complétées étant
+    en bas du plateau) et garde les indices justes. Les rangées au-dessus ne
+    sont déplacées qu'une fois, par une unique insertion de tranche.
+
+    Args:
+        rangees (list): La liste des rangées, modifiée sur place.
+        completees (list): Les indices des rangées à retirer, triés par ordre croissant.
+        nouvelles (list): Les rangées vides à insérer en haut, une par rangée retirée.
+        decalage (int, optional): L'indice, dans rangees, de la rangée 0 du plateau.
+            Par défaut, 0.
+
+    Returns:
+        Aucune valeur de retour.
+    """
+    for i in reversed(completees):
+        del rangees[i + decalage]
+    rangees[decalage:decalage] = nouvelles
+
+
+class Plateau:
+    """
+    Partie commune aux plateaux : dimensions, couleurs des cases et hauteur
+    de chaque colonne (la « ligne d'horizon »).
+
+    La hauteur d'une colonne est le nombre de lignes entre le bas du plateau
+    et sa case occupée la plus haute (0 si la colonne est vide). Elle est mise
+    à jour à chaque pièce posée et à chaque ligne retirée, sans parcourir
+    tout le plateau.
+    """
+
+    def __init__(self, largeur: int =DIM_PLATEAU[0], hauteur: int =DIM_PLATEAU[1]):
+        """
+        Crée un plateau vide.
+
+        Args:
+            largeur (int, optional): Le nombre de colonnes. Par défaut, DIM_PLATEAU[0].
+            hauteur (int, optional): Le nombre de lignes. Par défaut, DIM_PLATEAU[1].
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.largeur, self.hauteur = largeur, hauteur
+        self.couleurs = [self._nouvelle_ligne() for i in range(hauteur)]
+        self.hauteurs = [0] * largeur
+
+    def _nouvelle_ligne(self):
+        """
+        Retourne une ligne de couleurs vide.
+
+        Returns:
+            list: Une case à 0 par colonne.
+        """
+        return [0] * self.largeur
+
+    def fenetre(self, x: int, y: int, largeur: int, hauteur: int):
+        """
+        Retourne les couleurs d'un rectangle du plateau, pour l'affichage.
+
+        Args:
+            x (int): La première colonne.
+            y (int): La première ligne.
+            largeur (int): Le nombre de colonnes.
+            hauteur (int): Le nombre de lignes.
+
+        Returns:
+            list: Les lignes de couleurs, à ne pas modifier : les lignes du
+                plateau elles-mêmes quand elles sont demandées en entier.
+        """
+        lignes = self.couleurs[y:y + hauteur]
+        if x == 0 and largeur == self.largeur:
+            return lignes
+        return [ligne[x:x + largeur] for ligne in lignes]
+
+    def _mettre_a_jour_hauteurs(self, coordonnees, lignes: int):
+        """
+        Met à jour la hauteur des colonnes après la pose d'une pièce.
+
+        Args:
+            coordonnees (list): Les coordonnées absolues (x, y) des cases posées.
+            lignes (int): Le nombre de lignes retirées après la pose.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        hauteurs = self.hauteurs
+        for cx, cy in coordonnees:
+            if cy >= 0 and self.hauteur - cy > hauteurs[cx]:
+                hauteurs[cx] = self.hauteur - cy
+        if lignes:
+            # Les lignes retirées sont pleines, donc sous le sommet de chaque
+            # colonne : chaque colonne perd au moins lignes cases de hauteur,
+            # et davantage si son sommet était dans une ligne retirée.
+            couleurs = self.couleurs
+            for x in range(self.largeur):
+                h = hauteurs[x] - lignes
+                while h > 0 and couleurs[self.hauteur - h][x] == 0:
+                    h -= 1
+                hauteurs[x] = h
+
+    def sauver(self):
+        """
+        Retourne une copie immuable du plateau, pour restaurer.
+
+        Returns:
+            tuple: Les couleurs des cases (bytes, ligne par ligne) et la hauteur
+                des colonnes, suivies des données propres à chaque plateau.
+        """
+        return b"".join(map(bytes, self.couleurs)), tuple(self.hauteurs)
+
+    def restaurer(self, donnees: tuple):
+        """
+        Remet le plateau dans l'état retourné par sauver.
+
+        Args:
+            donnees (tuple): Le résultat de sauver sur un plateau de même classe
+                et de mêmes dimensions.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        cases, largeur = donnees[0], self.largeur
+        self.couleurs = [list(cases[i:i + largeur]) for i in range(0, len(cases), largeur)]
+        self.hauteurs = list(donnees[1])
+
+    def charger(self, cases: bytes):
+        """
+        Remplit le plateau à partir des seules couleurs de ses cases.
+
+        Plus lent que restaurer : la hauteur des colonnes est recalculée.
+
+        Args:
+            cases (bytes): La couleur de chaque case, ligne par ligne.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        largeur = self.largeur
+        self.couleurs = [list(cases[i:i + largeur]) for i in range(0, len(cases), largeur)]
+        self.hauteurs = [0] * largeur
+        for y, ligne in enumerate(self.couleurs):
+            for x, case in enumerate(ligne):
+                if case and not self.hauteurs[x]:
+                    self.hauteurs[x] = self.hauteur - y
+
+    def distance_chute(self, profil, x: int, y: int):
+        """
+        Calcule de combien de lignes une pièce peut tomber, à partir de la
+        hauteur des colonnes et du profil bas de la pièce.
+
+        Le calcul ne vaut que si la pièce est au-dessus du sommet de chaque
+        colonne qu'elle occupe ; sinon (pièce glissée sous un surplomb), None
+        est renvoyé et il faut descendre la pièce ligne par ligne.
+
+        Args:
+            profil (tuple): Le profil bas de la pièce (Forme.profil).
+            x (int): La position horizontale de la pièce.
+            y (int): La position verticale de la pièce, supposée valide.
+
+        Returns:
+            int or None: Le nombre de lignes de chute, ou None si la hauteur
+                des colonnes ne suffit pas à le calculer.
+        """
+        distance = None
+        for dx, dy in profil:
+            sommet = self.hauteur - self.hauteurs[x + dx]
+            if y + dy >= sommet:
+                return None
+            if distance is None or sommet - 1 - y - dy < distance:
+                distance = sommet - 1 - y - dy
+        return distance
+
+
+class PlateauListe(Plateau):
+    """
+    Plateau stocké comme une liste de lignes, chaque case contenant sa couleur.
+    """
+
+    def __init__(self, largeur: int =DIM_PLATEAU[0], hauteur: int =DIM_PLATEAU[1]):
+        """
+        Crée un plateau vide.
+
+        Args:
+            largeur (int, optional): Le nombre de colonnes. Par défaut, DIM_PLATEAU[0].
+            hauteur (int, optional): Le nombre de lignes. Par défaut, DIM_PLATEAU[1].
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        super().__init__(largeur, hauteur)
+        # Nombre de cases occupées sur chaque ligne
+        self.remplissage = [0] * hauteur
+
+    def preparer(self, cases):
+        """
+        Prépare les cases relatives d'une pièce pour est_libre.
+
+        Args:
+            cases (list): Les coordonnées (x, y) des cases de la pièce.
+
+        Returns:
+            tuple: Les cases de la pièce.
+        """
+        return tuple(cases)
+
+    def sauver(self):
+        """
+        Retourne une copie immuable du plateau, pour restaurer.
+
+        Returns:
+            tuple: Les données de Plateau.sauver et le remplissage des lignes.
+        """
+        return super().sauver() + (tuple(self.remplissage),)
+
+    def restaurer(self, donnees: tuple):
+        """
+        Remet le plateau dans l'état retourné par sauver.
+
+        Args:
+            donnees (tuple): Le résultat de sauver.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        super().restaurer(donnees)
+        self.remplissage = list(donnees[2])
+
+    def charger(self, cases: bytes):
+        """
+        Remplit le plateau à partir des seules couleurs de ses cases.
+
+        Args:
+            cases (bytes): La couleur de chaque case, ligne par ligne.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        super().charger(cases)
+        self.remplissage = [self.largeur - ligne.count(0) for ligne in self.couleurs]
+
+    def est_libre(self, piece, x: int, y: int):
+        """
+        Vérifie qu'une pièce préparée peut être placée en (x, y).
+
+        Les cases situées au-dessus du plateau sont considérées comme libres.
+
+        Args:
+            piece (tuple): La pièce retournée par preparer.
+            x (int): Le décalage horizontal de la pièce.
+            y (int): Le décalage vertical de la pièce.
+
+        Returns:
+            bool: True si la position est valide, sinon False.
+        """
+        for cx, cy in piece:
+            cx, cy = cx + x, cy + y
+            if not 0 <= cx < self.largeur:
+                return False
+            if cy < 0:
+                continue
+            if cy >= self.hauteur or self.couleurs[cy][cx] != 0:
+                return False
+        return True
+
+    def poser(self, coordonnees, couleur: int):
+        """
+        Pose une pièce sur le plateau et retire les lignes complétées.
+
+        Le nombre de cases de chaque ligne est tenu à jour : seules les lignes
+        touchées par la pièce peuvent être complétées.
+
+        Args:
+            coordonnees (list): Les coordonnées absolues (x, y) des cases de la pièce.
+            couleur (int): L'indice de couleur de la pièce.
+
+        Returns:
+            int: Le nombre de lignes complétées.
+        """
+        couleurs, remplissage = self.couleurs, self.remplissage
+        for cx, cy in coordonnees:
+            if cy >= 0:
+                # La pose qui termine la partie peut recouvrir des cases occupées
+                if couleurs[cy][cx] == 0:
+                    remplissage[cy] += 1
+                couleurs[cy][cx] = couleur
+        completees = sorted({cy for cx, cy in coordonnees
+                             if cy >= 0 and remplissage[cy] == self.largeur})
+        n = len(completees)
+        if n:
+            compacter(couleurs, completees, [[0] * self.largeur for i in range(n)])
+            compacter(remplissage, completees, [0] * n)
+        self._mettre_a_jour_hauteurs(coordonnees, n)
+        return n
+
+
+class PlateauBits(Plateau):
+    """
+    Plateau stocké comme une liste d'entiers, un bit par case occupée.
+
+    Chaque ligne est entourée de MARGE bits de mur à gauche et à droite, et le
+    plateau de MARGE lignes vides en haut et MARGE lignes pleines en bas :
+    les sorties du plateau sont ainsi détectées par le même ET binaire que
+    les collisions avec les pièces posées. Les lignes sont aussi concaténées
+    dans un seul entier, bits, pour tester une pièce entière en un seul ET.
+    """
+
+    def __init__(self, largeur: int =DIM_PLATEAU[0], hauteur: int =DIM_PLATEAU[1]):
+        """
+        Crée un plateau vide.
+
+        Args:
+            largeur (int, optional): Le nombre de colonnes. Par défaut, DIM_PLATEAU[0].
+            hauteur (int, optional): Le nombre de lignes. Par défaut, DIM_PLATEAU[1].
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        super().__init__(largeur, hauteur)
+        self.pas = largeur + 2 * MARGE
+        self.plein = (1 << self.pas) - 1
+        self.vide = self.plein ^ ((1 << largeur) - 1) << MARGE
+        self.murs = 0
+        for i in range(MARGE):
+            self.murs |= self.vide << i * self.pas
+        self.lignes = [self.vide] * (hauteur + MARGE) + [self.plein] * MARGE
+        self.bits = 0
+        for ligne in reversed(self.lignes):
+            self.bits = self.bits << self.pas | ligne
+
+    def preparer(self, cases):
+        """
+        Convertit les cases relatives d'une pièce en un masque de bits.
+
+        Les coordonnées relatives doivent être comprises entre 0 et MARGE - 1,
+        comme celles des matrices 4x4 de PIECES.
+
+        Args:
+            cases (list): Les coordonnées (x, y) des cases de la pièce.
+
+        Returns:
+            int: Le masque de la pièce, avec le même pas de ligne que bits.
+        """
+        masque = 0
+        for cx, cy in cases:
+            masque |= 1 << cy * self.pas + cx
+        return masque
+
+    def sauver(self):
+        """
+        Retourne une copie immuable du plateau, pour restaurer.
+
+        Les entiers de bits sont immuables : ils sont partagés, pas copiés.
+
+        Returns:
+            tuple: Les données de Plateau.sauver, bits et les lignes de bits.
+        """
+        return super().sauver() + (self.bits, tuple(self.lignes))
+
+    def restaurer(self, donnees: tuple):
+        """
+        Remet le plateau dans l'état retourné par sauver.
+
+        Args:
+            donnees (tuple): Le résultat de sauver.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        super().restaurer(donnees)
+        self.bits, self.lignes = donnees[2], list(donnees[3])
+
+    def charger(self, cases: bytes):
+        """
+        Remplit le plateau à partir des seules couleurs de ses cases.
+
+        Args:
+            cases (bytes): La couleur de chaque case, ligne par ligne.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        super().charger(cases)
+        self.lignes = [self.vide] * MARGE
+        for ligne in self.couleurs:
+            masque = self.vide
+            for x, case in enumerate(ligne):
+                if case:
+                    masque |= 1 << x + MARGE
+            self.lignes.append(masque)
+        self.lignes += [self.plein] * MARGE
+        self.bits = 0
+        for ligne in reversed(self.lignes):
+            self.bits = self.bits << self.pas | ligne
+
+    def est_libre(self, piece, x: int, y: int):
+        """
+        Vérifie qu'une pièce préparée peut être placée en (x, y).
+
+        Les cases situées au-dessus du plateau sont considérées comme libres.
+
+        Args:
+            piece (int): La pièce retournée par preparer.
+            x (int): Le décalage horizontal de la pièce.
+            y (int): Le décalage vertical de la pièce.
+
+        Returns:
+            bool: True si la position est valide, sinon False.
+        """
+        if -MARGE <= y <= self.hauteur and -MARGE <= x < self.largeur:
+            return not self.bits >> (y + MARGE) * self.pas + x + MARGE & piece
+        if y < -MARGE and -MARGE <= x < self.largeur:
+            # Toute la pièce est au-dessus du plateau : seuls les murs comptent.
+            return not self.murs >> x + MARGE & piece
+        # Toutes les cases de la pièce sont hors du plateau.
+        return False
+
+    def poser(self, coordonnees, couleur: int):
+        """
+        Pose une pièce sur le plateau et retire les lignes complétées.
+
+        Seules les lignes touchées par la pièce sont comparées au masque plein,
+        et les lignes complétées sont retirées en une passe par compacter.
+
+        Args:
+            coordonnees (list): Les coordonnées absolues (x, y) des cases de la pièce.
+            couleur (int): L'indice de couleur de la pièce.
+
+        Returns:
+            int: Le nombre de lignes complétées.
+        """
+        lignes, couleurs, pas = self.lignes, self.couleurs, self.pas
+        ajout = 0
+        for cx, cy in coordonnees:
+            if cy >= 0:
+                lignes[cy + MARGE] |= 1 << cx + MARGE
+                ajout |= 1 << (cy + MARGE) * pas + cx + MARGE
+                couleurs[cy][cx] = couleur
+        self.bits |= ajout
+        plein = self.plein
+        completees = sorted({cy for cx, cy in coordonnees
+                             if cy >= 0 and lignes[cy + MARGE] == plein})
+        n = len(completees)
+        if n:
+            compacter(lignes, completees, [self.vide] * n, MARGE)
+            compacter(couleurs, completees, [[0] * self.largeur for i in range(n)])
+            # Dans bits, chaque bloc de lignes retirées fait descendre tout ce
+            # qui est au-dessus ; en partant du haut, les indices restent justes.
+            bits, debut = self.bits, completees[0]
+            for k, i in enumerate(completees):
+                if k + 1 == n or completees[k + 1] != i + 1:
+                    bas, haut = (i + 1 + MARGE) * pas, (debut + MARGE) * pas
+                    nombre = i + 1 - debut
+                    bits = (bits >> bas << bas
+                            | (bits & (1 << haut) - 1) << nombre * pas
+                            | self.murs & (1 << nombre * pas) - 1)
+                    if k + 1 < n:
+                        debut = completees[k + 1]
+            self.bits = bits
+        self._mettre_a_jour_hauteurs(coordonnees, n)
+        return n
+
+
+class LigneCreuse(dict):
+    """
+    Ligne de couleurs d'un PlateauCreux : un dictionnaire des cases occupées,
+    indexé par colonne. Une case absente vaut 0, comme une case vide d'une liste.
+    """
+
+    def __missing__(self, x):
+        return 0
+
+
+class PlateauCreux(Plateau):
+    """
+    Plateau creux, pour des plateaux de milliers de lignes et de colonnes.
+
+    Chaque ligne est un masque de bits des cases occupées (sans mur) et une
+    LigneCreuse de leurs couleurs. Contrairement à PlateauBits, il n'y a pas
+    d'entier pour tout le plateau : une pièce est testée ligne par ligne,
+    sur ses 4 lignes au plus, et une ligne vide ne coûte qu'un entier nul et
+    un dictionnaire vide.
+    """
+
+    def __init__(self, largeur: int =DIM_PLATEAU[0], hauteur: int =DIM_PLATEAU[1]):
+        """
+        Crée un plateau vide.
+
+        Args:
+            largeur (int, optional): Le nombre de colonnes. Par défaut, DIM_PLATEAU[0].
+            hauteur (int, optional): Le nombre de lignes. Par défaut, DIM_PLATEAU[1].
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        super().__init__(largeur, hauteur)
+        self.plein = (1 << largeur) - 1
+        self.lignes = [0] * hauteur
+
+    def _nouvelle_ligne(self):
+        """
+        Retourne une ligne de couleurs vide.
+
+        Returns:
+            LigneCreuse: Un dictionnaire vide.
+        """
+        return LigneCreuse()
+
+    def fenetre(self, x: int, y: int, largeur: int, hauteur: int):
+        """
+        Retourne les couleurs d'un rectangle du plateau, pour l'affichage.
+
+        Args:
+            x (int): La première colonne.
+            y (int): La première ligne.
+            largeur (int): Le nombre de colonnes.
+            hauteur (int): Le nombre de lignes.
+
+        Returns:
+            list: Les lignes de couleurs, une liste par ligne.
+        """
+        colonnes = range(x, x + largeur)
+        return [[ligne[c] for c in colonnes] if ligne else [0] * largeur
+                for ligne in self.couleurs[y:y + hauteur]]
+
+    def preparer(self, cases):
+        """
+        Convertit les cases relatives d'une pièce en masques de lignes.
+
+        Args:
+            cases (list): Les coordonnées (x, y) des cases de la pièce.
+
+        Returns:
+            tuple: La plus petite et la plus grande colonne relative de la
+                pièce, puis les couples (ligne relative, masque de bits), le
+                bit 0 des masques étant la plus petite colonne.
+        """
+        xmin = min(cx for cx, cy in cases)
+        masques = {}
+        for cx, cy in cases:
+            masques[cy] = masques.get(cy, 0) | 1 << cx - xmin
+        return xmin, max(cx for cx, cy in cases), tuple(sorted(masques.items()))
+
+    def sauver(self):
+        """
+        Retourne une copie immuable du plateau, pour restaurer.
+
+        Returns:
+            tuple: Les couleurs des cases (bytes, ligne par ligne), la hauteur
+                des colonnes et les masques des lignes.
+        """
+        cases = bytearray(self.largeur * self.hauteur)
+        for y, ligne in enumerate(self.couleurs):
+            debut = y * self.largeur
+            for x, couleur in ligne.items():
+                cases[debut + x] = couleur
+        return bytes(cases), tuple(self.hauteurs), tuple(self.lignes)
+
+    def restaurer(self, donnees: tuple):
+        """
+        Remet le plateau dans l'état retourné par sauver.
+
+        Args:
+            donnees (tuple): Le résultat de sauver.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self._remplir(donnees[0], donnees[2])
+        self.hauteurs = list(donnees[1])
+
+    def charger(self, cases: bytes):
+        """
+        Remplit le plateau à partir des seules couleurs de ses cases.
+
+        Args:
+            cases (bytes): La couleur de chaque case, ligne par ligne.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        largeur = self.largeur
+        lignes = []
+        for y in range(self.hauteur):
+            masque = 0
+            for x, couleur in enumerate(cases[y * largeur:(y + 1) * largeur]):
+                if couleur:
+                    masque |= 1 << x
+            lignes.append(masque)
+        self._remplir(cases, lignes)
+        self.hauteurs = [0] * largeur
+        cumul = 0
+        for y, masque in enumerate(lignes):
+            nouvelles = masque & ~cumul
+            cumul |= masque
+            while nouvelles:
+                bas = nouvelles & -nouvelles
+                self.hauteurs[bas.bit_length() - 1] = self.hauteur - y
+                nouvelles ^= bas
+
+    def _remplir(self, cases: bytes, lignes):
+        """
+        Remplace les lignes du plateau, sans toucher à la hauteur des colonnes.
+
+        Args:
+            cases (bytes): La couleur de chaque case, ligne par ligne.
+            lignes (list): Le masque de bits de chaque ligne.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        largeur = self.largeur
+        self.lignes = list(lignes)
+        self.couleurs = []
+        for y, masque in enumerate(self.lignes):
+            ligne = LigneCreuse()
+            while masque:
+                bas = masque & -masque
+                x = bas.bit_length() - 1
+                ligne[x] = cases[y * largeur + x]
+                masque ^= bas
+            self.couleurs.append(ligne)
+
+    def est_libre(self, piece, x: int, y: int):
+        """
+        Vérifie qu'une pièce préparée peut être placée en (x, y).
+
+        Les cases situées au-dessus du plateau sont considérées comme libres.
+
+        Args:
+            piece (tuple): La pièce retournée par preparer.
+            x (int): Le décalage horizontal de la pièce.
+            y (int): Le décalage vertical de la pièce.
+
+        Returns:
+            bool: True si la position est valide, sinon False.
+        """
+        xmin, xmax, masques = piece
+        if x + xmin < 0 or x + xmax >= self.largeur:
+            return False
+        lignes = self.lignes
+        for cy, masque in masques:
+            cy += y
+            if cy < 0:
+                continue
+            if cy >= self.hauteur or lignes[cy] >> x + xmin & masque:
+                return False
+        return True
+
+    def poser(self, coordonnees, couleur: int):
+        """
+        Pose une pièce sur le plateau et retire les lignes complétées.
+
+        Args:
+            coordonnees (list): Les coordonnées absolues (x, y) des cases de la pièce.
+            couleur (int): L'indice de couleur de la pièce.
+
+        Returns:
+            int: Le nombre de lignes complétées.
+        """
+        lignes, couleurs = self.lignes, self.couleurs
+        for cx, cy in coordonnees:
+            if cy >= 0:
+                lignes[cy] |= 1 << cx
+                couleurs[cy][cx] = couleur
+        completees = sorted({cy for cx, cy in coordonnees
+                             if cy >= 0 and lignes[cy] == self.plein})
+        n = len(completees)
+        if n:
+            compacter(lignes, completees, [0] * n)
+            compacter(couleurs, completees, [LigneCreuse() for i in range(n)])
+        self._mettre_a_jour_hauteurs(coordonnees, n)
+        return n
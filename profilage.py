@@ -0,0 +1,178 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Mesure du temps passé dans chaque phase d'une image du jeu.
+
+Une image de Jeu.play se découpe en phases successives : lecture des
+événements, gravité (pas de simulation), dessin, envoi à l'écran
+(pygame.display.update) et attente de la limite d'images par seconde.
+Le Profileur date la fin de chaque phase avec perf_counter_ns et garde les
+durées des dernières images dans des anneaux de taille fixe, pour calculer
+des centiles glissants sans allouer de mémoire pendant la partie. La trace
+complète, image par image, peut être écrite en CSV ou au format JSON des
+traces d'événements de Chrome (chrome://tracing, Perfetto).
+"""
+
+import time
+from array import array
+
+PHASES = ("evenements", "gravite", "dessin", "affichage", "attente")
+# Nombre d'images gardées pour les centiles glissants
+TAILLE_ANNEAU = 600
+
+
+class Profileur:
+    """
+    Cette classe chronomètre les phases de chaque image.
+
+    Une image commence par debut_image, chaque phase se termine par
+    marquer(phase) et l'image se termine par fin_image. Une phase marquée
+    plusieurs fois dans la même image cumule ses durées.
+    """
+
+    def __init__(self, taille: int =TAILLE_ANNEAU, trace: bool =False):
+        """
+        Crée un profileur vide.
+
+        Args:
+            taille (int, optional): Le nombre d'images gardées pour les centiles.
+                Par défaut, TAILLE_ANNEAU.
+            trace (bool, optional): Garde aussi toutes les images pour
+                ecrire_trace. Par défaut, False.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.taille = taille
+        # Un anneau par phase, plus un pour la durée totale de l'image
+        self.anneaux = [array("q", bytes(8 * taille)) for i in range(len(PHASES) + 1)]
+        self.images = 0
+        self.trace = [] if trace else None
+        self._indices = {phase: i for i, phase in enumerate(PHASES)}
+        self._debut, self._dernier, self._courante = None, None, [0] * len(PHASES)
+
+    def debut_image(self):
+        """
+        Commence une nouvelle image, en abandonnant l'image en cours s'il y en a une.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self._debut = self._dernier = time.perf_counter_ns()
+        self._courante = [0] * len(PHASES)
+
+    def marquer(self, phase: str):
+        """
+        Termine une phase de l'image en cours : le temps écoulé depuis la
+        marque précédente lui est attribué.
+
+        Args:
+            phase (str): Le nom de la phase, dans PHASES.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        if self._debut is None:
+            return
+        maintenant = time.perf_counter_ns()
+        self._courante[self._indices[phase]] += maintenant - self._dernier
+        self._dernier = maintenant
+
+    def fin_image(self):
+        """
+        Termine l'image en cours et range ses durées dans les anneaux.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        if self._debut is None:
+            return
+        total = time.perf_counter_ns() - self._debut
+        i = self.images % self.taille
+        for anneau, duree in zip(self.anneaux, self._courante + [total]):
+            anneau[i] = duree
+        if self.trace is not None:
+            self.trace.append((self._debut, total, *self._courante))
+        self.images += 1
+        self._debut = None
+
+    def centiles(self, phase: str =None, centiles: tuple =(50, 90, 99)):
+        """
+        Calcule des centiles de durée sur les dernières images.
+
+        Args:
+            phase (str, optional): La phase mesurée. Par défaut, l'image entière.
+            centiles (tuple, optional): Les centiles voulus. Par défaut, (50, 90, 99).
+
+        Returns:
+            tuple: Les durées en millisecondes, une par centile (0 sans image).
+        """
+        anneau = self.anneaux[-1 if phase is None else self._indices[phase]]
+        valeurs = sorted(anneau[:min(self.images, self.taille)])
+        if not valeurs:
+            return (0.0,) * len(centiles)
+        return tuple(valeurs[min(len(valeurs) - 1, len(valeurs) * c // 100)] / 1e6
+                     for c in centiles)
+
+    def fps(self):
+        """
+        Calcule le nombre d'images par seconde sur les dernières images.
+
+        Returns:
+            float: Les images par seconde (0 sans image).
+        """
+        n = min(self.images, self.taille)
+        total = sum(self.anneaux[-1][:n])
+        return n * 1e9 / total if total else 0.0
+
+    def resume(self):
+        """
+        Résume les centiles de chaque phase sur les dernières images.
+
+        Returns:
+            str: Une ligne par phase : p50, p90 et p99 en millisecondes.
+        """
+        lignes = [f"{self.fps():.1f} images/s sur {min(self.images, self.taille)} images"]
+        for phase in PHASES + (None,):
+            p50, p90, p99 = self.centiles(phase)
+            lignes.append(f"{phase or 'image':12} p50 {p50:7.3f} ms  p90 {p90:7.3f} ms  "
+                          f"p99 {p99:7.3f} ms")
+        return "\n".join(lignes)
+
+    def ecrire_trace(self, chemin: str):
+        """
+        Écrit la trace de toutes les images, en JSON de Chrome si le chemin
+        finit par .json, sinon en CSV (une ligne par image, en nanosecondes).
+
+        Args:
+            chemin (str): Le chemin du fichier.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        # csv et json ne sont chargés que si une trace est écrite
+        import csv
+        import json
+        trace = self.trace or []
+        if chemin.endswith(".json"):
+            evenements = []
+            origine = trace[0][0] if trace else 0
+            for numero, (debut, total, *durees) in enumerate(trace):
+                debut -= origine
+                evenements.append({"name": "image", "ph": "X", "pid": 1, "tid": 1,
+                                   "ts": debut / 1000, "dur": total / 1000,
+                                   "args": {"image": numero}})
+                for phase, duree in zip(PHASES, durees):
+                    if duree:
+                        evenements.append({"name": phase, "ph": "X", "pid": 1, "tid": 1,
+                                           "ts": debut / 1000, "dur": duree / 1000})
+                    debut += duree
+            with open(chemin, "w", encoding="utf-8") as fichier:
+                json.dump({"traceEvents": evenements, "displayTimeUnit": "ms"}, fichier)
+        else:
+            with open(chemin, "w", newline="", encoding="utf-8") as fichier:
+                ecrivain = csv.writer(fichier)
+                ecrivain.writerow(("image", "debut_ns", "image_ns") +
+                                  tuple(f"{phase}_ns" for phase in PHASES))
+                for numero, ligne in enumerate(trace):
+                    ecrivain.writerow((numero,) + ligne)
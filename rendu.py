@@ -0,0 +1,872 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Rendus du jeu : ce qui affiche les images de Jeu et lit les touches.
+
+Jeu calcule lui-même ce qui a changé d'une image à l'autre (cases,
+statistiques) et ne demande au rendu que de dessiner ces changements :
+- RenduPygame : la fenêtre Pygame, avec envoi à l'écran des seuls
+  rectangles modifiés. La fenêtre peut être redimensionnable : la
+  disposition (taille des cases, positions des textes, polices) est alors
+  recalculée à chaque changement de taille.
+- RenduImage : le même dessin dans une image en mémoire, sans fenêtre,
+  pour exporter les images d'une partie (export.py).
+- RenduTerminal : un terminal compatible ANSI. Seuls les caractères des
+  cases modifiées sont écrits, et les touches sont lues sur l'entrée standard.
+- Rendu : le rendu nul, qui n'affiche rien et ne lit aucune touche, pour
+  simuler une partie sans payer de dessin. Les écrans d'attente passent
+  d'eux-mêmes, et Jeu joue alors la partie au plus vite, sans suivre le
+  temps réel.
+
+Les touches sont rendues sous forme d'événements Pygame (KEYDOWN, KEYUP),
+quel que soit le rendu : le module d'affichage de Pygame n'est initialisé
+que par RenduPygame (et pas par RenduImage).
+"""
+
+import functools
+import logging
+import os
+import re
+import sys
+from collections import namedtuple
+import pygame
+from pygame.locals import KEYDOWN, KEYUP, NOEVENT, RESIZABLE, VIDEORESIZE, K_DOWN, K_ESCAPE, \
+    K_F3, K_LEFT, K_RIGHT, K_SPACE, K_UP, K_p
+from constante import (BORDURE_PLATEAU, CENTRE_FENETRE, COULEURS, DIM_PLATEAU, HAUTEUR_STAT,
+                       LARGEUR_CASE_TERMINAL, ORIGINE_TERMINAL, POLICES, POS, POSITIONS_PROFIL,
+                       POSITIONS_STATS, TAILLE_BLOC, TAILLE_CACHE_TEXTES, TAILLE_FENETRE,
+                       ZONE_PROFIL)
+
+journal = logging.getLogger(__name__)
+
+# Disposition de la fenêtre Pygame pour une taille donnée :
+#   taille      : largeur et hauteur de la fenêtre
+#   bloc        : taille d'une case
+#   plateau     : coin haut gauche de la case (0, 0)
+#   bordure     : rectangle de la bordure du plateau, et son épaisseur
+#   stats       : centres des statistiques, et hauteur de la bande de chacune
+#   zone_stats  : zone des statistiques, à droite du plateau
+#   zone_profil : zone des mesures du profileur, et centres de ses lignes
+#   centre, pos : centres du titre et du texte des écrans de message
+#   polices     : polices (fichier, taille), comme POLICES
+Disposition = namedtuple("Disposition", "taille bloc plateau bordure epaisseur stats "
+                         "hauteur_stat zone_stats zone_profil profil centre pos polices")
+
+# Séquences envoyées par le terminal pour les touches spéciales
+SEQUENCES = {b"\x1b[A": K_UP, b"\x1b[B": K_DOWN, b"\x1b[C": K_RIGHT, b"\x1b[D": K_LEFT,
+             b"\x1bOR": K_F3, b"\x1b[13~": K_F3}
+# Caractères simples qui correspondent à une touche de Pygame
+CARACTERES = {b" ": K_SPACE, b"p": K_p, b"q": K_ESCAPE, b"\x1b": K_ESCAPE}
+# Séquence de contrôle ANSI (CSI), qui n'occupe aucune colonne du terminal
+SEQUENCE_CSI = re.compile("\x1b\\[[0-?]*[ -/]*[@-~]")
+
+
+def disposer(taille: tuple):
+    """
+    Calcule la disposition de la fenêtre pour une taille donnée.
+
+    Les tailles et positions de constante.py, prévues pour TAILLE_FENETRE,
+    sont mises à l'échelle du côté le plus contraint de la fenêtre, et le
+    plateau reste centré en bas. Les cases gardent une taille entière en
+    pixels. À TAILLE_FENETRE, la disposition est celle de constante.py.
+
+    Args:
+        taille (tuple): La largeur et la hauteur de la fenêtre, en pixels.
+
+    Returns:
+        Disposition: La disposition de la fenêtre.
+    """
+    echelle = min(taille[0] / TAILLE_FENETRE[0], taille[1] / TAILLE_FENETRE[1])
+    bloc = tuple(max(1, int(cote * echelle)) for cote in TAILLE_BLOC)
+    epaisseur = max(1, round(BORDURE_PLATEAU * echelle))
+    plateau = tuple(DIM_PLATEAU[i] * bloc[i] for i in range(2))
+    marge = tuple(taille[i] - plateau[i] - epaisseur * 2 for i in range(2))
+    bordure = (int(marge[0] / 2) - epaisseur, marge[1] + epaisseur,
+               plateau[0] + epaisseur * 2, plateau[1] + epaisseur * 2)
+    stats = tuple((taille[0] - bordure[0] / 2, y * echelle) for x, y in POSITIONS_STATS)
+    hauteur_stat = HAUTEUR_STAT * echelle
+    zone_stats = (bordure[0] + bordure[2], stats[0][1] - hauteur_stat / 2,
+                  taille[0] - bordure[0] - bordure[2],
+                  stats[-1][1] - stats[0][1] + hauteur_stat)
+    centre = taille[0] / 2, taille[1] / 2
+    return Disposition(
+        tuple(taille), bloc, (int(marge[0] / 2), marge[1] + epaisseur * 2), bordure, epaisseur,
+        stats, hauteur_stat, zone_stats,
+        (0, ZONE_PROFIL[1] * echelle, bordure[0], ZONE_PROFIL[3] * echelle),
+        tuple((bordure[0] / 2, y * echelle) for x, y in POSITIONS_PROFIL), centre,
+        (centre[0], centre[1] + (POS[1] - CENTRE_FENETRE[1]) * echelle),
+        {nom: (fichier, max(1, int(corps * echelle))) for nom, (fichier, corps) in POLICES.items()})
+
+
+class Rendu:
+    """
+    Cette classe définit l'interface des rendus ; elle-même n'affiche rien.
+
+    Les coordonnées des cases sont relatives à la partie visible du plateau,
+    et une ligne négative est au-dessus du plateau.
+    """
+
+    # Faux pour le rendu nul : Jeu ne calcule alors pas les changements
+    affiche = False
+
+    def evenements(self):
+        """
+        Retourne les événements arrivés depuis le dernier appel.
+
+        Returns:
+            list: Les événements (pygame.event.Event).
+        """
+        return []
+
+    def attendre(self, delai: int):
+        """
+        Attend un événement, au plus delai millisecondes.
+
+        Le rendu nul n'attend pas : il n'a aucune touche à lire.
+
+        Args:
+            delai (int): Le délai maximal d'attente, en millisecondes.
+
+        Returns:
+            pygame.event.Event or None: L'événement, de type NOEVENT si le délai
+                est écoulé, ou None si le rendu ne lit aucune touche.
+        """
+        del delai  # Inutilisé
+
+    def invalider(self):
+        """
+        Oublie l'image affichée : la prochaine sera envoyée en entier.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+
+    def cadre(self, largeur: int, hauteur: int):
+        """
+        Efface l'écran et dessine le cadre de la partie visible du plateau.
+
+        Args:
+            largeur (int): Le nombre de colonnes visibles.
+            hauteur (int): Le nombre de lignes visibles.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+
+    def case(self, x: int, y: int, couleur: int):
+        """
+        Dessine une case.
+
+        Args:
+            x (int): La colonne de la case dans la partie visible.
+            y (int): La ligne de la case (négative au-dessus du plateau).
+            couleur (int): L'indice de couleur de la case.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+
+    def statistique(self, numero: int, texte: str):
+        """
+        Remplace le texte d'une statistique (score, pièces...).
+
+        Args:
+            numero (int): Le numéro de la statistique, dans POSITIONS_STATS.
+            texte (str): Le texte.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+
+    def profil(self, textes):
+        """
+        Remplace les mesures du profileur affichées.
+
+        Args:
+            textes (tuple): Les lignes de texte, une par position de POSITIONS_PROFIL.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+
+    def message(self, titre: str, texte: str =None, effacer: bool =True):
+        """
+        Affiche un écran de message (démarrage, pause, fin de partie).
+
+        Args:
+            titre (str): Le titre, en grand au centre.
+            texte (str, optional): Le texte sous le titre. Par défaut, aucun.
+            effacer (bool, optional): Efface l'écran avant. Par défaut, True.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+
+    def presenter(self):
+        """
+        Envoie à l'écran ce qui a été dessiné depuis le dernier appel.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+
+    def fermer(self):
+        """
+        Libère l'écran et rend la main au système.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+
+
+class RenduPygame(Rendu):
+    """
+    Cette classe affiche le jeu dans une fenêtre Pygame.
+
+    Les textes rendus sont gardés dans un cache LRU, et seuls les rectangles
+    modifiés depuis le dernier envoi sont envoyés à l'écran. Chaque couleur
+    de case est une tuile rendue d'avance à la taille des cases : les cases
+    d'une image sont copiées depuis ces tuiles en un seul appel à
+    Surface.blits, juste avant l'envoi à l'écran.
+    """
+
+    affiche = True
+
+    def __init__(self, redimensionnable: bool =False, surface: pygame.Surface =None):
+        """
+        Initialise le seul module d'affichage de Pygame (pas le son ni les
+        manettes) et ouvre la fenêtre, ou dessine dans une surface donnée.
+        Les polices sont chargées à leur première utilisation.
+
+        Args:
+            redimensionnable (bool, optional): La fenêtre peut changer de
+                taille, et la disposition suit sa taille. Par défaut, False.
+            surface (pygame.Surface, optional): La surface où dessiner, sans
+                ouvrir de fenêtre ni initialiser le module d'affichage.
+                Par défaut, la fenêtre.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.redimensionnable = redimensionnable and surface is None
+        if surface is None:
+            pygame.display.init()
+            surface = pygame.display.set_mode(TAILLE_FENETRE,
+                                              RESIZABLE if redimensionnable else 0)
+            pygame.display.set_caption("Application Tetris")
+        self.surface = surface
+        self._message = None
+        self._preparer()
+
+    def _preparer(self):
+        """
+        Calcule la disposition à la taille de la surface, et vide ce qui en
+        dépend : polices, textes rendus et tuiles des cases.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.disposition = disposer(self.surface.get_size())
+        self.fonts = {}
+        self._textes = functools.lru_cache(maxsize=TAILLE_CACHE_TEXTES)(self._rendre_texte)
+        self._tuiles = {}
+        for couleur, rgb in COULEURS.items():
+            # Même format de pixels que la surface : la copie est directe
+            self._tuiles[couleur] = pygame.Surface(self.disposition.bloc, 0, self.surface)
+            self._tuiles[couleur].fill(rgb)
+        # Cases à copier (tuile, position), et cases effacées au-dessus du plateau
+        self._cases, self._cases_haut = [], []
+        self._rects_sales, self._ecran_complet = [], True
+
+    def _redimensionner(self, taille: tuple):
+        """
+        Adapte la fenêtre à sa nouvelle taille et recalcule la disposition.
+
+        L'écran de message affiché, s'il y en a un, est redessiné ; sinon la
+        fenêtre reste vide jusqu'à ce que Jeu redessine toute la partie.
+
+        Args:
+            taille (tuple): La nouvelle largeur et hauteur de la fenêtre.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.surface = pygame.display.set_mode(taille, RESIZABLE)
+        self._preparer()
+        journal.info("Fenêtre de %d x %d, cases de %d pixels", *taille,
+                     self.disposition.bloc[0])
+        self.surface.fill(COULEURS.get(0))
+        if self._message is not None:
+            self.message(*self._message)
+        self.presenter()
+
+    def evenements(self):
+        """
+        Retourne les événements arrivés depuis le dernier appel.
+
+        Un changement de taille de la fenêtre est appliqué ici, avant d'être
+        renvoyé comme les autres événements.
+
+        Returns:
+            list: Les événements de la file de Pygame, qui est vidée.
+        """
+        evenements = pygame.event.get()
+        for event in evenements:
+            if event.type == VIDEORESIZE:
+                self._redimensionner(event.size)
+        return evenements
+
+    def attendre(self, delai: int):
+        """
+        Dort jusqu'au prochain événement, au plus delai millisecondes.
+
+        Args:
+            delai (int): Le délai maximal d'attente, en millisecondes.
+
+        Returns:
+            pygame.event.Event: L'événement, de type NOEVENT si le délai est écoulé.
+        """
+        event = pygame.event.wait(delai)
+        if event.type == VIDEORESIZE:
+            self._redimensionner(event.size)
+        return event
+
+    def invalider(self):
+        """
+        Oublie l'image affichée : la prochaine met à jour toute la fenêtre.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self._rects_sales, self._ecran_complet = [], True
+
+    def _afficher_texte(self, text: str, position: tuple, couleur: int =9,
+                        font: str ="defaut"):
+        """
+        Affiche du texte à l'écran, centré sur une position.
+
+        Args:
+            text (str): Le texte à afficher.
+            position (tuple): Les coordonnées (x, y) du centre du texte.
+            couleur (int, optional): La couleur du texte (indice de couleur).
+                Par défaut, 9.
+            font (str, optional): Le nom de la police. Par défaut, 'defaut'.
+
+        Returns:
+            pygame.Rect: Le rectangle de l'écran occupé par le texte.
+        """
+        rendu = self._textes(text, font, couleur)
+        rect = rendu.get_rect()
+        rect.center = position
+        return self.surface.blit(rendu, rect)
+
+    def _rendre_texte(self, text: str, font: str, couleur: int):
+        """
+        Transforme un texte en surface Pygame, sans passer par le cache.
+
+        Cette méthode est appelée par le cache _textes (LRU) qui garde les
+        surfaces déjà rendues, identifiées par le texte, la police et la couleur.
+
+        Args:
+            text (str): Le texte à rendre.
+            font (str): Le nom de la police à utiliser.
+            couleur (int): La couleur du texte (indice de couleur).
+
+        Returns:
+            pygame.Surface: Le texte rendu.
+        """
+        font = self._police(font)
+        couleur = COULEURS.get(couleur, COULEURS[9])
+        return font.render(text, True, couleur)
+
+    def _police(self, nom: str):
+        """
+        Retourne une police de POLICES, à la taille de la disposition, en la
+        chargeant à sa première utilisation.
+
+        Args:
+            nom (str): Le nom de la police. Un nom inconnu donne la police 'defaut'.
+
+        Returns:
+            pygame.font.Font: La police.
+        """
+        if nom not in POLICES:
+            nom = "defaut"
+        if nom not in self.fonts:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self.fonts[nom] = pygame.font.Font(*self.disposition.polices[nom])
+        return self.fonts[nom]
+
+    def _poser_cases(self):
+        """
+        Copie les cases dessinées depuis le dernier appel, en un seul appel à
+        Surface.blits qui renvoie aussi leurs rectangles modifiés, puis
+        redessine la bordure sous les cases effacées au-dessus du plateau.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        if self._cases:
+            self._rects_sales += self.surface.blits(self._cases)
+            self._cases = []
+        if self._cases_haut:
+            d = self.disposition
+            for rect in self._cases_haut:
+                # Au-dessus du plateau, la case effacée peut recouvrir la bordure
+                self.surface.set_clip(rect)
+                pygame.draw.rect(self.surface, COULEURS[8], d.bordure, d.epaisseur)
+            self.surface.set_clip(None)
+            self._cases_haut = []
+
+    def cadre(self, largeur: int, hauteur: int):
+        """
+        Efface la fenêtre et dessine la bordure du plateau.
+
+        Args:
+            largeur (int): Le nombre de colonnes visibles.
+            hauteur (int): Le nombre de lignes visibles.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.surface.fill(COULEURS.get(0))
+        pygame.draw.rect(self.surface, COULEURS[8], self.disposition.bordure,
+                         self.disposition.epaisseur)
+        self._cases, self._cases_haut, self._message = [], [], None
+        self._ecran_complet = True
+
+    def case(self, x: int, y: int, couleur: int):
+        """
+        Dessine une case du plateau : la tuile de sa couleur sera copiée par
+        _poser_cases, avec les autres cases de l'image.
+
+        Args:
+            x (int): La colonne de la case dans la partie visible.
+            y (int): La ligne de la case (négative au-dessus du plateau).
+            couleur (int): L'indice de couleur de la case.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        bloc, plateau = self.disposition.bloc, self.disposition.plateau
+        position = plateau[0] + x * bloc[0], plateau[1] + y * bloc[1]
+        self._cases.append((self._tuiles[couleur], position))
+        if y < 0 and couleur == 0:
+            self._cases_haut.append(pygame.Rect(position, bloc))
+
+    def statistique(self, numero: int, texte: str):
+        """
+        Efface puis réaffiche une statistique, à droite du plateau.
+
+        Args:
+            numero (int): Le numéro de la statistique, dans POSITIONS_STATS.
+            texte (str): Le texte.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        d = self.disposition
+        position = d.stats[numero]
+        self._rects_sales.append(self.surface.fill(
+            COULEURS.get(0), (d.zone_stats[0], position[1] - d.hauteur_stat / 2,
+                              d.zone_stats[2], d.hauteur_stat)))
+        self._afficher_texte(texte, position)
+
+    def profil(self, textes):
+        """
+        Remplace les mesures du profileur, à gauche du plateau.
+
+        Args:
+            textes (tuple): Les lignes de texte, une par position de POSITIONS_PROFIL.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self._rects_sales.append(self.surface.fill(COULEURS.get(0),
+                                                   self.disposition.zone_profil))
+        for texte, position in zip(textes, self.disposition.profil):
+            self._afficher_texte(texte, position)
+
+    def message(self, titre: str, texte: str =None, effacer: bool =True):
+        """
+        Affiche un titre au centre de la fenêtre et un texte en dessous.
+
+        Args:
+            titre (str): Le titre.
+            texte (str, optional): Le texte sous le titre. Par défaut, aucun.
+            effacer (bool, optional): Efface la fenêtre avant. Par défaut, True.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        if effacer:
+            self._cases, self._cases_haut = [], []
+            self.surface.fill(COULEURS.get(0))
+        else:
+            self._poser_cases()
+        self._afficher_texte(titre, self.disposition.centre, font="titre")
+        if texte:
+            self._afficher_texte(texte, self.disposition.pos)
+        # Gardé pour être redessiné si la fenêtre change de taille
+        self._message = titre, texte
+        self._ecran_complet = True
+
+    def presenter(self):
+        """
+        Envoie à l'écran les rectangles modifiés, ou toute la fenêtre après
+        un appel à invalider, cadre ou message.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self._poser_cases()
+        if self._ecran_complet:
+            pygame.display.update()
+        elif self._rects_sales:
+            pygame.display.update(self._rects_sales)
+        self._rects_sales, self._ecran_complet = [], False
+
+    def fermer(self):
+        """
+        Ferme la fenêtre et Pygame.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        journal.info("Cache des textes : %s", self._textes.cache_info())
+        pygame.quit()
+
+
+class RenduImage(RenduPygame):
+    """
+    Cette classe dessine le jeu comme RenduPygame, dans une image en mémoire.
+
+    Aucune fenêtre n'est ouverte : l'image est dans l'attribut surface, et
+    presenter ne fait qu'oublier les rectangles modifiés.
+    """
+
+    def __init__(self):
+        """
+        Crée l'image, de la taille de la fenêtre du jeu, sans initialiser
+        le module d'affichage de Pygame.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        super().__init__(surface=pygame.Surface(TAILLE_FENETRE))
+
+    def evenements(self):
+        """
+        Retourne les événements : une image ne lit aucune touche.
+
+        Returns:
+            list: Une liste vide.
+        """
+        return []
+
+    def attendre(self, delai: int):
+        """
+        N'attend pas : une image ne lit aucune touche, comme le rendu nul.
+
+        Args:
+            delai (int): Le délai maximal d'attente (inutilisé).
+
+        Returns:
+            None: Aucun événement.
+        """
+        return Rendu.attendre(self, delai)
+
+    def presenter(self):
+        """
+        Copie les cases de l'image et oublie les rectangles modifiés.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self._poser_cases()
+        self._rects_sales, self._ecran_complet = [], False
+
+    def fermer(self):
+        """
+        Libère les polices chargées.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        journal.info("Cache des textes : %s", self._textes.cache_info())
+        self.fonts.clear()
+
+
+class RenduTerminal(Rendu):
+    """
+    Cette classe affiche le jeu dans un terminal, avec des séquences ANSI.
+
+    Une case est un couple d'espaces sur un fond de sa couleur (couleurs
+    24 bits). Chaque image n'écrit que les cases modifiées, en omettant le
+    déplacement du curseur et le changement de couleur quand ils sont
+    inutiles. L'entrée standard est lue sans attente, caractère par caractère.
+    """
+
+    affiche = True
+
+    def __init__(self, sortie=None, entree=None):
+        """
+        Prépare le terminal : lecture des touches sans écho ni attente de
+        la touche Entrée, curseur caché.
+
+        Args:
+            sortie (file, optional): Le flux de sortie. Par défaut, sys.stdout.
+            entree (file, optional): Le flux des touches. Par défaut, sys.stdin.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.sortie = sortie or sys.stdout
+        self.entree = entree or sys.stdin
+        self._tampon, self._curseur, self._couleur = [], None, None
+        self._evenements, self._reglages = [], None
+        self.largeur, self.hauteur = 0, 0
+        # Nombre total de caractères écrits, pour vérifier qu'une image
+        # n'écrit que ses changements
+        self.ecrits = 0
+        if self.entree.isatty():
+            # Les modules du terminal ne sont chargés que pour ce rendu
+            import termios
+            import tty
+            self._reglages = termios.tcgetattr(self.entree)
+            tty.setcbreak(self.entree)
+        self._tampon.append("\x1b[?25l\x1b[2J")
+
+    def _ecrire(self, colonne: int, ligne: int, couleur, texte: str):
+        """
+        Ajoute du texte au tampon de l'image, à une position du terminal.
+
+        Args:
+            colonne (int): La colonne du premier caractère (à partir de 1).
+            ligne (int): La ligne (à partir de 1).
+            couleur (tuple or None): La couleur de fond (r, v, b), ou None pour
+                les couleurs du terminal.
+            texte (str): Le texte, qui peut contenir des séquences de contrôle.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        if self._curseur != (colonne, ligne):
+            self._tampon.append(f"\x1b[{ligne};{colonne}H")
+        if couleur != self._couleur:
+            if couleur is None:
+                self._tampon.append("\x1b[0m")
+            else:
+                rouge, vert, bleu = couleur
+                self._tampon.append(f"\x1b[48;2;{rouge};{vert};{bleu}m")
+            self._couleur = couleur
+        self._tampon.append(texte)
+        # Le curseur n'avance que des caractères affichés
+        largeur = len(SEQUENCE_CSI.sub("", texte)) if "\x1b" in texte else len(texte)
+        self._curseur = (colonne + largeur, ligne)
+
+    def _lire(self, delai: float):
+        """
+        Lit les touches disponibles sur l'entrée et les range en événements.
+
+        Args:
+            delai (float): Le temps maximal d'attente d'une touche, en secondes.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        import select
+        try:
+            descripteur = self.entree.fileno()
+            prets, _, _ = select.select([descripteur], [], [], delai)
+        except (OSError, ValueError):
+            return
+        if not prets:
+            return
+        donnees = os.read(descripteur, 1024)
+        i = 0
+        while i < len(donnees):
+            for sequence, touche in SEQUENCES.items():
+                if donnees.startswith(sequence, i):
+                    i += len(sequence)
+                    break
+            else:
+                if donnees.startswith((b"\x1b[", b"\x1bO"), i):
+                    # Séquence d'une autre touche spéciale : ignorée jusqu'à
+                    # son dernier caractère, pour ne pas être lue comme Échap
+                    i += 2
+                    while i < len(donnees) and not 0x40 <= donnees[i] <= 0x7e:
+                        i += 1
+                    i += 1
+                    continue
+                caractere = donnees[i:i + 1]
+                touche = CARACTERES.get(caractere, donnees[i])
+                i += 1
+            # Un terminal ne signale pas les touches relâchées : chaque
+            # caractère est une touche pressée puis relâchée
+            self._evenements += [pygame.event.Event(KEYDOWN, key=touche),
+                                 pygame.event.Event(KEYUP, key=touche)]
+
+    def evenements(self):
+        """
+        Retourne les touches lues depuis le dernier appel.
+
+        Returns:
+            list: Les événements KEYDOWN et KEYUP.
+        """
+        self._lire(0)
+        evenements, self._evenements = self._evenements, []
+        return evenements
+
+    def attendre(self, delai: int):
+        """
+        Attend une touche, au plus delai millisecondes.
+
+        Args:
+            delai (int): Le délai maximal d'attente, en millisecondes.
+
+        Returns:
+            pygame.event.Event: L'événement, de type NOEVENT si le délai est écoulé.
+        """
+        if not self._evenements:
+            self._lire(delai / 1000)
+        if not self._evenements:
+            return pygame.event.Event(NOEVENT)
+        return self._evenements.pop(0)
+
+    def invalider(self):
+        """
+        Oublie la position du curseur et la couleur courante du terminal.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self._curseur, self._couleur = None, None
+
+    def cadre(self, largeur: int, hauteur: int):
+        """
+        Efface le terminal et dessine le cadre du plateau.
+
+        Args:
+            largeur (int): Le nombre de colonnes visibles.
+            hauteur (int): Le nombre de lignes visibles.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.largeur, self.hauteur = largeur, hauteur
+        colonne, ligne = ORIGINE_TERMINAL
+        interieur = largeur * LARGEUR_CASE_TERMINAL
+        self._tampon.append("\x1b[0m\x1b[2J")
+        self._curseur, self._couleur = None, None
+        self._ecrire(colonne - 1, ligne - 1, None, "┌" + "─" * interieur + "┐")
+        for y in range(hauteur):
+            self._ecrire(colonne - 1, ligne + y, None, "│")
+            self._ecrire(colonne + interieur, ligne + y, None, "│")
+        self._ecrire(colonne - 1, ligne + hauteur, None, "└" + "─" * interieur + "┘")
+
+    def case(self, x: int, y: int, couleur: int):
+        """
+        Dessine une case du plateau.
+
+        Args:
+            x (int): La colonne de la case dans la partie visible.
+            y (int): La ligne de la case (négative au-dessus du plateau).
+            couleur (int): L'indice de couleur de la case.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        colonne = ORIGINE_TERMINAL[0] + x * LARGEUR_CASE_TERMINAL
+        ligne = ORIGINE_TERMINAL[1] + y
+        if ligne < 1:
+            return
+        if y == -1 and couleur == 0:
+            # La case effacée juste au-dessus du plateau est sur le cadre
+            self._ecrire(colonne, ligne, None, "─" * LARGEUR_CASE_TERMINAL)
+        elif y < 0 and couleur == 0:
+            self._ecrire(colonne, ligne, None, " " * LARGEUR_CASE_TERMINAL)
+        else:
+            self._ecrire(colonne, ligne, COULEURS[couleur], " " * LARGEUR_CASE_TERMINAL)
+
+    def statistique(self, numero: int, texte: str):
+        """
+        Remplace une statistique, à droite du plateau.
+
+        Args:
+            numero (int): Le numéro de la statistique.
+            texte (str): Le texte.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        colonne = ORIGINE_TERMINAL[0] + self.largeur * LARGEUR_CASE_TERMINAL + 3
+        self._ecrire(colonne, ORIGINE_TERMINAL[1] + 2 * numero, None, texte + "\x1b[K")
+
+    def profil(self, textes):
+        """
+        Remplace les mesures du profileur, sous les statistiques.
+
+        Args:
+            textes (tuple): Les lignes de texte.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        colonne = ORIGINE_TERMINAL[0] + self.largeur * LARGEUR_CASE_TERMINAL + 3
+        for i, texte in enumerate(textes):
+            self._ecrire(colonne, ORIGINE_TERMINAL[1] + 2 * len(POSITIONS_STATS) + i, None,
+                         texte + "\x1b[K")
+
+    def message(self, titre: str, texte: str =None, effacer: bool =True):
+        """
+        Affiche un titre en gras et un texte en dessous, à gauche du terminal.
+
+        Args:
+            titre (str): Le titre.
+            texte (str, optional): Le texte sous le titre. Par défaut, aucun.
+            effacer (bool, optional): Efface le terminal avant. Par défaut, True.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        if effacer:
+            self._tampon.append("\x1b[0m\x1b[2J")
+            self._curseur, self._couleur = None, None
+        ligne = ORIGINE_TERMINAL[1] + 8
+        self._ecrire(ORIGINE_TERMINAL[0], ligne, None, f"\x1b[1m {titre} \x1b[22m")
+        if texte:
+            self._ecrire(ORIGINE_TERMINAL[0], ligne + 2, None, f" {texte} ")
+
+    def presenter(self):
+        """
+        Écrit le tampon de l'image sur le terminal en une seule fois.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        if self._tampon:
+            texte = "".join(self._tampon)
+            self.ecrits += len(texte)
+            self.sortie.write(texte)
+            self.sortie.flush()
+            self._tampon = []
+
+    def fermer(self):
+        """
+        Remet le terminal dans son état de départ, curseur sous le plateau.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        ligne = ORIGINE_TERMINAL[1] + self.hauteur + 2
+        self._tampon.append(f"\x1b[0m\x1b[{ligne};1H\x1b[?25h")
+        self.presenter()
+        if self._reglages is not None:
+            import termios
+            termios.tcsetattr(self.entree, termios.TCSADRAIN, self._reglages)
+
+
+# Rendus disponibles, par nom (option --rendu de tetris.py)
+RENDUS = {"pygame": RenduPygame, "terminal": RenduTerminal, "aucun": Rendu}
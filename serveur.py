@@ -0,0 +1,520 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Serveur de parties en direct, pour des spectateurs et des duels.
+
+Le serveur (asyncio, TCP) héberge des salles. Chaque salle fait tourner une
+ou deux parties (Moteur) au rythme de TICKS_PAR_SECONDE, reçoit les actions
+de ses joueurs et diffuse l'état des parties à tous ses clients.
+
+Le protocole est une suite de messages JSON, un par ligne. Un client envoie
+d'abord {"rejoindre": "salle", "role": "joueur" ou "spectateur"} (avec
+"joueurs": 2 pour créer un duel), puis, s'il joue, {"action": n} avec les
+constantes de moteur. Le serveur répond par "bienvenue", puis envoie à
+chaque pas où une partie a changé un message "pas" qui ne contient que les
+différences : cases modifiées, pièce courante et compteurs modifiés. Un
+message "complet" redonne tout l'état d'une partie à l'arrivée d'un client.
+
+Chaque client a une file d'envoi bornée. Un client trop lent ne ralentit
+ni la partie ni les autres clients : quand sa file déborde, les messages
+en retard sont remplacés par un seul état complet des parties. Une ligne
+trop longue (plus de 64 Kio) déconnecte le client, et une salle est
+fermée quand son dernier client part.
+
+    python serveur.py --port 8765
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import logging
+from constante import TICKS_PAR_SECONDE
+from moteur import Moteur, ACTIONS, RIEN
+import journalisation
+
+# Nombre maximal de messages en attente d'envoi pour un client
+TAILLE_FILE = 256
+# Nombre maximal d'actions en attente pour un joueur
+TAILLE_FILE_ACTIONS = 16
+# Compteurs d'une partie envoyés aux clients
+COMPTEURS = ("score", "pieces", "lignes", "tetris", "niveau", "perdu")
+
+journal = logging.getLogger(__name__)
+
+
+def encoder(message: dict):
+    """
+    Encode un message du protocole : du JSON compact sur une ligne.
+
+    Args:
+        message (dict): Le message.
+
+    Returns:
+        bytes: Le message encodé, terminé par un saut de ligne.
+    """
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+class Partie:
+    """
+    Cette classe représente une partie d'une salle et ce qui en a déjà été
+    diffusé, pour n'envoyer que les différences.
+    """
+
+    def __init__(self, graine: int):
+        """
+        Crée une partie.
+
+        Args:
+            graine (int): La graine de la partie.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.moteur = Moteur(graine=graine)
+        self.actions = collections.deque(maxlen=TAILLE_FILE_ACTIONS)
+        self._cases, self._piece, self._compteurs, self._version = None, None, None, None
+
+    def _etat(self):
+        """
+        Retourne l'état diffusé de la partie.
+
+        Returns:
+            tuple: Les couleurs des cases (bytes), la pièce courante
+                [indice, x, y, rotation] ou None, et les compteurs.
+        """
+        moteur = self.moteur
+        piece = None
+        if moteur.current is not None:
+            piece = [moteur.current[0].indice, *moteur.position]
+        return (moteur.plateau.sauver()[0], piece,
+                {nom: getattr(moteur, nom) for nom in COMPTEURS})
+
+    def complet(self):
+        """
+        Retourne tout l'état de la partie, sans tenir compte de ce qui a été diffusé.
+
+        Returns:
+            dict: La partie : largeur, hauteur, cases (un chiffre de couleur
+                par case, ligne par ligne), pièce et compteurs.
+        """
+        cases, piece, compteurs = self._etat()
+        plateau = self.moteur.plateau
+        return {"largeur": plateau.largeur, "hauteur": plateau.hauteur,
+                "cases": "".join(map(str, cases)), "piece": piece, "compteurs": compteurs}
+
+    def delta(self):
+        """
+        Retourne ce qui a changé depuis le dernier appel, et le retient comme diffusé.
+
+        Returns:
+            dict or None: Les cases modifiées ([indice, couleur], l'indice
+                comptant les cases ligne par ligne), la pièce si elle a changé
+                et les compteurs modifiés ; None si rien n'a changé.
+        """
+        if self.moteur.version == self._version:
+            return None
+        self._version = self.moteur.version
+        cases, piece, compteurs = self._etat()
+        delta = {}
+        if cases != self._cases:
+            anciennes = self._cases or bytes(len(cases))
+            delta["cases"] = [[i, c] for i, (c, a) in enumerate(zip(cases, anciennes)) if c != a]
+            self._cases = cases
+        if piece != self._piece:
+            delta["piece"] = self._piece = piece
+        modifies = {nom: valeur for nom, valeur in compteurs.items()
+                    if self._compteurs is None or self._compteurs[nom] != valeur}
+        if modifies:
+            delta["compteurs"] = modifies
+            self._compteurs = compteurs
+        return delta or None
+
+
+class Client:
+    """
+    Cette classe représente une connexion et sa file d'envoi bornée.
+    """
+
+    def __init__(self, lecteur: asyncio.StreamReader, ecrivain: asyncio.StreamWriter):
+        """
+        Crée un client à partir de sa connexion.
+
+        Args:
+            lecteur (asyncio.StreamReader): Le flux de lecture de la connexion.
+            ecrivain (asyncio.StreamWriter): Le flux d'écriture de la connexion.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.lecteur, self.ecrivain = lecteur, ecrivain
+        self.file = asyncio.Queue(maxsize=TAILLE_FILE)
+        # Vrai quand des messages ont été perdus : un état complet est attendu
+        self.resynchroniser = False
+        self.perdus = 0
+        self.joueur = None
+
+    def envoyer(self, donnees: bytes):
+        """
+        Met un message dans la file d'envoi, sans jamais attendre.
+
+        Si la file est pleine, elle est vidée et le client est marqué à
+        resynchroniser : les messages suivants sont ignorés jusqu'à ce que
+        la salle lui renvoie un état complet, à la fin du pas.
+
+        Args:
+            donnees (bytes): Le message encodé.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        if self.resynchroniser:
+            return
+        try:
+            self.file.put_nowait(donnees)
+        except asyncio.QueueFull:
+            self.vider()
+
+    def vider(self):
+        """
+        Vide la file d'envoi et marque le client à resynchroniser.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        while not self.file.empty():
+            self.file.get_nowait()
+            self.perdus += 1
+        self.resynchroniser = True
+
+    async def ecrire(self):
+        """
+        Envoie les messages de la file, au rythme que la connexion permet.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        while True:
+            donnees = await self.file.get()
+            self.ecrivain.write(donnees)
+            await self.ecrivain.drain()
+
+
+class Salle:
+    """
+    Cette classe représente une salle : ses parties, ses joueurs et ses spectateurs.
+    """
+
+    def __init__(self, nom: str, joueurs: int =1, graine: int =None):
+        """
+        Crée une salle. Les parties d'un duel ont la même graine, donc les mêmes pièces.
+
+        Args:
+            nom (str): Le nom de la salle.
+            joueurs (int, optional): Le nombre de parties (1 ou 2). Par défaut, 1.
+            graine (int, optional): La graine des parties. Par défaut, aléatoire.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.nom = nom
+        premiere = Partie(graine)
+        self.parties = [premiere] + [Partie(premiere.moteur.graine) for i in range(joueurs - 1)]
+        self.clients = set()
+        self.places = list(range(joueurs))
+        self.ticks = 0
+        self.demarree = asyncio.Event()
+        self.tache = None
+
+    def ajouter(self, client: Client, role: str):
+        """
+        Ajoute un client à la salle, comme joueur s'il reste une place.
+
+        Le client reçoit l'état complet de chaque partie. La salle démarre
+        quand toutes ses places de joueur sont prises.
+
+        Args:
+            client (Client): Le client.
+            role (str): "joueur" ou "spectateur".
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        if role == "joueur" and self.places:
+            client.joueur = self.places.pop(0)
+        self.clients.add(client)
+        client.envoyer(encoder({"type": "bienvenue", "salle": self.nom, "joueur": client.joueur,
+                                "parties": len(self.parties)}))
+        self._envoyer_complet(client)
+        if not self.places:
+            self.demarree.set()
+
+    def retirer(self, client: Client):
+        """
+        Retire un client de la salle. La place d'un joueur parti n'est pas reprise.
+
+        Args:
+            client (Client): Le client.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.clients.discard(client)
+
+    def _envoyer_complet(self, client: Client):
+        """
+        Envoie à un client l'état complet de chaque partie.
+
+        Args:
+            client (Client): Le client.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        client.resynchroniser = False
+        for i, partie in enumerate(self.parties):
+            client.envoyer(encoder({"type": "complet", "partie": i, "pas": self.ticks,
+                                    **partie.complet()}))
+
+    def pas(self):
+        """
+        Avance chaque partie d'un pas et diffuse les différences.
+
+        Le message est encodé une seule fois pour tous les clients.
+
+        Returns:
+            bool: True tant qu'une partie au moins n'est pas perdue.
+        """
+        self.ticks += 1
+        deltas = {}
+        for i, partie in enumerate(self.parties):
+            action = partie.actions.popleft() if partie.actions else RIEN
+            partie.moteur.tick(action)
+            delta = partie.delta()
+            if delta is not None:
+                deltas[i] = delta
+        if deltas:
+            donnees = encoder({"type": "pas", "pas": self.ticks, "parties": deltas})
+            for client in self.clients:
+                client.envoyer(donnees)
+        for client in self.clients:
+            if client.resynchroniser:
+                self._envoyer_complet(client)
+        return not all(partie.moteur.perdu for partie in self.parties)
+
+    async def boucle(self):
+        """
+        Fait tourner la salle à pas fixes de 1 / TICKS_PAR_SECONDE seconde.
+
+        Un retard (boucle d'événements chargée) est rattrapé en enchaînant
+        plusieurs pas, comme Jeu._gerer_gravite.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        await self.demarree.wait()
+        boucle = asyncio.get_running_loop()
+        periode = 1 / TICKS_PAR_SECONDE
+        prochain = boucle.time()
+        en_cours = True
+        while en_cours:
+            while en_cours and boucle.time() >= prochain:
+                en_cours = self.pas()
+                prochain += periode
+            await asyncio.sleep(max(0, prochain - boucle.time()))
+        scores = [partie.moteur.score for partie in self.parties]
+        gagnant = scores.index(max(scores)) if len(scores) > 1 else None
+        donnees = encoder({"type": "fin", "scores": scores, "gagnant": gagnant})
+        for client in self.clients:
+            # Le message de fin n'est jamais perdu : s'il n'y a plus la place
+            # pour lui et un état complet, la file est remplacée par les deux
+            if client.file.maxsize - client.file.qsize() <= len(self.parties):
+                client.vider()
+                self._envoyer_complet(client)
+            client.envoyer(donnees)
+        journal.info("Salle %s terminée, scores %s", self.nom, scores)
+
+
+class Serveur:
+    """
+    Cette classe représente le serveur et ses salles.
+    """
+
+    def __init__(self):
+        """
+        Crée un serveur sans salle.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.salles = {}
+
+    def _salle(self, nom: str, joueurs: int):
+        """
+        Retourne la salle d'un nom donné, en la créant si besoin.
+
+        Args:
+            nom (str): Le nom de la salle.
+            joueurs (int): Le nombre de joueurs d'une salle créée.
+
+        Returns:
+            Salle: La salle.
+        """
+        salle = self.salles.get(nom)
+        if salle is None:
+            salle = self.salles[nom] = Salle(nom, joueurs)
+            salle.tache = asyncio.create_task(salle.boucle())
+            salle.tache.add_done_callback(lambda tache: self._oublier(salle))
+        return salle
+
+    def _oublier(self, salle: Salle):
+        """
+        Retire une salle terminée ou abandonnée, si son nom n'a pas été repris.
+
+        Args:
+            salle (Salle): La salle.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        if self.salles.get(salle.nom) is salle:
+            del self.salles[salle.nom]
+
+    async def gerer_client(self, lecteur: asyncio.StreamReader, ecrivain: asyncio.StreamWriter):
+        """
+        Gère une connexion : inscription dans une salle puis lecture des actions.
+
+        Args:
+            lecteur (asyncio.StreamReader): Le flux de lecture de la connexion.
+            ecrivain (asyncio.StreamWriter): Le flux d'écriture de la connexion.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        client, salle = Client(lecteur, ecrivain), None
+        envoi = asyncio.create_task(client.ecrire())
+        try:
+            async for ligne in lecteur:
+                try:
+                    message = json.loads(ligne)
+                except ValueError:
+                    journal.warning("Message illisible ignoré : %r", ligne[:80])
+                    continue
+                if not isinstance(message, dict):
+                    journal.warning("Message qui n'est pas un objet ignoré : %r", ligne[:80])
+                    continue
+                action = message.get("action")
+                if salle is None and "rejoindre" in message:
+                    joueurs = 2 if message.get("joueurs") == 2 else 1
+                    salle = self._salle(str(message["rejoindre"]), joueurs)
+                    salle.ajouter(client, message.get("role", "spectateur"))
+                elif salle is not None and client.joueur is not None \
+                        and isinstance(action, int) and not isinstance(action, bool) \
+                        and action in ACTIONS:
+                    # true et false seraient sinon pris pour les actions 1 et 0
+                    salle.parties[client.joueur].actions.append(action)
+        except ConnectionError:
+            pass
+        except ValueError:
+            # Ligne plus longue que la limite du lecteur
+            journal.warning("Ligne trop longue, client déconnecté")
+        finally:
+            if salle is not None:
+                salle.retirer(client)
+                if not salle.clients:
+                    # Plus personne : la salle s'arrête, même si elle attend un joueur
+                    salle.tache.cancel()
+                    self._oublier(salle)
+            envoi.cancel()
+            try:
+                # Récupère la fin de la tâche d'envoi, annulée ou coupée par le client
+                await envoi
+            except (asyncio.CancelledError, ConnectionError):
+                pass
+            ecrivain.close()
+
+    async def servir(self, hote: str ="127.0.0.1", port: int =8765):
+        """
+        Accepte des connexions jusqu'à l'arrêt du programme.
+
+        Args:
+            hote (str, optional): L'adresse d'écoute. Par défaut, "127.0.0.1".
+            port (int, optional): Le port d'écoute. Par défaut, 8765.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        serveur = await asyncio.start_server(self.gerer_client, hote, port)
+        journal.info("Serveur à l'écoute sur %s:%d", hote, port)
+        async with serveur:
+            await serveur.serve_forever()
+
+
+class Spectateur:
+    """
+    Cette classe reconstruit, côté client, l'état des parties à partir des
+    messages du serveur.
+    """
+
+    def __init__(self):
+        """
+        Crée un spectateur sans partie.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.parties = {}
+        self.pas = 0
+
+    def appliquer(self, message: dict):
+        """
+        Met à jour les parties avec un message du serveur.
+
+        Args:
+            message (dict): Le message décodé.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        if message["type"] == "complet":
+            self.parties[message["partie"]] = {
+                "largeur": message["largeur"],
+                "cases": bytearray(int(c) for c in message["cases"]),
+                "piece": message["piece"], "compteurs": dict(message["compteurs"])}
+            self.pas = message["pas"]
+        elif message["type"] == "pas":
+            self.pas = message["pas"]
+            for i, delta in message["parties"].items():
+                partie = self.parties[int(i)]
+                for indice, couleur in delta.get("cases", ()):
+                    partie["cases"][indice] = couleur
+                if "piece" in delta:
+                    partie["piece"] = delta["piece"]
+                partie["compteurs"].update(delta.get("compteurs", {}))
+
+
+def main():
+    """
+    Lance le serveur avec les options de la ligne de commande.
+
+    Returns:
+        Aucune valeur de retour.
+    """
+    parser = argparse.ArgumentParser(description="Serveur de parties en direct.")
+    parser.add_argument("--hote", default="127.0.0.1", help="adresse d'écoute")
+    parser.add_argument("--port", type=int, default=8765, help="port d'écoute")
+    parser.add_argument("--journal", metavar="NIVEAU", default="INFO", type=str.upper,
+                        choices=journalisation.NIVEAUX,
+                        help="niveau du journal : " + ", ".join(journalisation.NIVEAUX)
+                        + " (par défaut, INFO)")
+    args = parser.parse_args()
+    journalisation.configurer(args.journal)
+    try:
+        asyncio.run(Serveur().servir(args.hote, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
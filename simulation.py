@@ -0,0 +1,315 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Simulation de parties en lot, sans fenêtre, pour évaluer une politique de jeu.
+
+Les parties sont réparties sur un groupe de processus : chacune est jouée
+par le Moteur à partir de sa propre graine, et son résultat est renvoyé au
+processus principal dès qu'elle est finie. Le débit (parties et pièces par
+seconde) et la distribution des scores sont affichés à la fin :
+
+    python simulation.py --parties 1000 --politique aleatoire
+
+Avec --donnees, chaque pas des parties est aussi écrit dans un dossier de
+données d'entraînement (donnees.py), un fichier par lot de parties.
+"""
+
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from constante import DIM_PLATEAU
+from moteur import Moteur, Generateur, ACTIONS, CHUTE
+from plateau import PlateauBits, PlateauCreux, PlateauListe
+
+PLATEAUX = {"bits": PlateauBits, "liste": PlateauListe, "creux": PlateauCreux}
+
+# Champs du résultat d'une partie, dans l'ordre de l'affichage détaillé
+CHAMPS = ("graine", "score", "lignes", "tetris", "pieces", "niveau", "duree")
+# Nombre maximal de parties envoyées d'un coup à un processus
+LOT_MAX = 64
+
+
+class PolitiqueAleatoire:
+    """
+    Politique qui choisit une action au hasard à chaque pas.
+    """
+
+    def __init__(self, graine: int):
+        """
+        Crée la politique avec son propre générateur.
+
+        Args:
+            graine (int): La graine de la partie.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.generateur = Generateur(~graine)
+
+    def action(self, moteur: Moteur):
+        """
+        Choisit une action au hasard.
+
+        Args:
+            moteur (Moteur): Le moteur de la partie.
+
+        Returns:
+            int: L'action choisie.
+        """
+        del moteur  # Inutilisé : le hasard ne regarde pas la partie
+        return ACTIONS[self.generateur.suivant(len(ACTIONS))]
+
+
+class PolitiqueChute:
+    """
+    Politique qui fait tomber chaque pièce directement, sans la déplacer.
+    """
+
+    def __init__(self, graine: int):
+        """
+        Crée la politique.
+
+        Args:
+            graine (int): La graine de la partie (inutilisée).
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        del graine  # Inutilisée
+
+    def action(self, moteur: Moteur):
+        """
+        Retourne toujours l'action CHUTE.
+
+        Args:
+            moteur (Moteur): Le moteur de la partie.
+
+        Returns:
+            int: L'action CHUTE.
+        """
+        del moteur  # Inutilisé
+        return CHUTE
+
+
+def politique_ia(graine: int):
+    """
+    Crée le joueur automatique du module ia.
+
+    Args:
+        graine (int): La graine de la partie (inutilisée).
+
+    Returns:
+        IA: Le joueur automatique.
+    """
+    del graine  # Inutilisée
+    # Importé ici : NumPy n'est chargé que si cette politique est utilisée
+    from ia import IA
+    return IA()
+
+
+# Chaque politique est créée à partir de la graine de la partie, puis
+# sa méthode action(moteur) donne l'action de chaque pas
+POLITIQUES = {"aleatoire": PolitiqueAleatoire, "chute": PolitiqueChute, "ia": politique_ia}
+# Nombre maximal de pièces par défaut des politiques qui peuvent ne jamais
+# perdre : le joueur automatique retire ses lignes presque indéfiniment
+MAX_PIECES = {"ia": 1000}
+
+
+def jouer_partie(graine: int, politique: str ="aleatoire", *, plateau: str ="bits",
+                 max_pieces: int =None, dimensions: tuple =DIM_PLATEAU, ecrivain=None):
+    """
+    Joue une partie complète sans affichage.
+
+    Cette fonction est exécutée dans les processus du groupe : ses arguments
+    et son résultat ne sont que des types simples, faciles à transmettre.
+
+    Args:
+        graine (int): La graine du moteur et de la politique.
+        politique (str, optional): Le nom de la politique dans POLITIQUES.
+            Par défaut, "aleatoire".
+        plateau (str, optional): Le nom du plateau dans PLATEAUX. Par défaut, "bits".
+        max_pieces (int, optional): Arrête la partie après ce nombre de pièces,
+            0 pour jouer jusqu'à la défaite. Par défaut, la limite de la
+            politique dans MAX_PIECES, sinon 0.
+        dimensions (tuple, optional): La largeur et la hauteur du plateau.
+            Par défaut, DIM_PLATEAU.
+        ecrivain (donnees.Ecrivain, optional): Écrit chaque pas de la partie.
+            Par défaut, aucun.
+
+    Returns:
+        dict: Le résultat de la partie, avec les clés de CHAMPS.
+    """
+    debut = time.perf_counter()
+    if max_pieces is None:
+        max_pieces = MAX_PIECES.get(politique, 0)
+    moteur = Moteur(PLATEAUX[plateau], graine=graine, largeur=dimensions[0],
+                    hauteur=dimensions[1])
+    joueur = POLITIQUES[politique](graine)
+    while not moteur.perdu and not (max_pieces and moteur.pieces >= max_pieces
+                                    and moteur.current is None):
+        action = joueur.action(moteur)
+        if ecrivain is not None:
+            ecrivain.ajouter(moteur, action)
+        moteur.step(action)
+    if ecrivain is not None:
+        ecrivain.terminer(moteur)
+    return {"graine": graine, "score": moteur.score, "lignes": moteur.lignes,
+            "tetris": moteur.tetris, "pieces": moteur.pieces, "niveau": moteur.niveau,
+            "duree": time.perf_counter() - debut}
+
+
+def jouer_lot(graines, politique: str, *, plateau: str, max_pieces: int, dimensions: tuple,
+              donnees: str =None):
+    """
+    Joue plusieurs parties à la suite dans un même processus.
+
+    Regrouper les parties courtes limite le coût des échanges entre processus.
+    Chaque lot écrit ses propres données : les processus n'écrivent jamais
+    dans le même fichier.
+
+    Args:
+        graines (range): Les graines des parties.
+        politique (str): Le nom de la politique.
+        plateau (str): Le nom du plateau.
+        max_pieces (int): Le nombre maximal de pièces par partie, 0 pour sans
+            limite, None pour la limite de la politique (voir jouer_partie).
+        dimensions (tuple): La largeur et la hauteur du plateau.
+        donnees (str, optional): Le dossier des données d'entraînement.
+            Par défaut, aucun.
+
+    Returns:
+        list: Les résultats des parties (voir jouer_partie).
+    """
+    if donnees is None:
+        return [jouer_partie(graine, politique, plateau=plateau, max_pieces=max_pieces,
+                             dimensions=dimensions) for graine in graines]
+    # NumPy n'est chargé que pour écrire des données
+    from donnees import EXTENSION, Ecrivain
+    chemin = os.path.join(donnees, f"parties_{graines[0]:012d}{EXTENSION}")
+    with Ecrivain(chemin, *dimensions) as ecrivain:
+        return [jouer_partie(graine, politique, plateau=plateau, max_pieces=max_pieces,
+                             dimensions=dimensions, ecrivain=ecrivain) for graine in graines]
+
+
+def simuler(parties: int, graine: int =0, politique: str ="aleatoire", *, plateau: str ="bits",
+            max_pieces: int =None, processus: int =None, dimensions: tuple =DIM_PLATEAU,
+            donnees: str =None):
+    """
+    Joue des parties en parallèle et renvoie leurs résultats au fur et à mesure.
+
+    Les graines des parties sont graine, graine + 1, ..., graine + parties - 1 :
+    une simulation est reproductible quel que soit le nombre de processus.
+
+    Args:
+        parties (int): Le nombre de parties à jouer.
+        graine (int, optional): La graine de la première partie. Par défaut, 0.
+        politique (str, optional): Le nom de la politique. Par défaut, "aleatoire".
+        plateau (str, optional): Le nom du plateau. Par défaut, "bits".
+        max_pieces (int, optional): Le nombre maximal de pièces par partie,
+            0 pour sans limite. Par défaut, la limite de la politique (voir
+            jouer_partie).
+        processus (int, optional): Le nombre de processus. Par défaut, un par cœur.
+        dimensions (tuple, optional): La largeur et la hauteur du plateau.
+            Par défaut, DIM_PLATEAU.
+        donnees (str, optional): Le dossier où écrire chaque pas des parties
+            (donnees.py), créé si besoin. Par défaut, aucun.
+
+    Yields:
+        dict: Le résultat de chaque partie, par lots dans l'ordre où ils se terminent.
+    """
+    processus = processus or os.cpu_count() or 1
+    if donnees is not None:
+        os.makedirs(donnees, exist_ok=True)
+    # Quelques lots par processus, pour équilibrer la charge sans trop d'échanges
+    taille = max(1, min(LOT_MAX, parties // (processus * 4)))
+    with ProcessPoolExecutor(max_workers=processus) as groupe:
+        futures = [groupe.submit(jouer_lot, range(debut, min(debut + taille, graine + parties)),
+                                 politique, plateau=plateau, max_pieces=max_pieces,
+                                 dimensions=dimensions, donnees=donnees)
+                   for debut in range(graine, graine + parties, taille)]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def resumer(resultats, duree: float):
+    """
+    Calcule le débit et la distribution des scores d'une simulation.
+
+    Args:
+        resultats (list): Les résultats des parties (voir jouer_partie).
+        duree (float): La durée totale de la simulation, en secondes.
+
+    Returns:
+        str: Le résumé, prêt à être affiché.
+    """
+    scores = sorted(r["score"] for r in resultats)
+    pieces = sum(r["pieces"] for r in resultats)
+    quartiles = statistics.quantiles(scores, n=4) if len(scores) > 1 else scores * 3
+    return "\n".join([
+        f"Parties: {len(resultats)}  Durée: {duree:.2f} s  "
+        f"Débit: {len(resultats) / duree:.1f} parties/s, {pieces / duree:.0f} pièces/s",
+        f"Score: moyenne {statistics.fmean(scores):.2f}  min {scores[0]}  "
+        f"q1 {quartiles[0]:g}  médiane {quartiles[1]:g}  q3 {quartiles[2]:g}  max {scores[-1]}",
+        f"Lignes: moyenne {statistics.fmean(r['lignes'] for r in resultats):.2f}  "
+        f"Pièces: moyenne {pieces / len(resultats):.2f}  "
+        f"Tetris: total {sum(r['tetris'] for r in resultats)}",
+    ])
+
+
+def main():
+    """
+    Lit les options de la ligne de commande, joue les parties et affiche
+    leur résumé.
+
+    Returns:
+        Aucune valeur de retour.
+    """
+    parser = argparse.ArgumentParser(description="Joue des parties en lot, sans fenêtre.")
+    parser.add_argument("--parties", type=int, default=100, help="nombre de parties")
+    parser.add_argument("--graine", type=int, default=0, help="graine de la première partie")
+    parser.add_argument("--politique", choices=sorted(POLITIQUES), default="aleatoire",
+                        help="politique de jeu")
+    parser.add_argument("--plateau", choices=sorted(PLATEAUX), default="bits",
+                        help="représentation du plateau")
+    parser.add_argument("--largeur", type=int, default=DIM_PLATEAU[0],
+                        help="nombre de colonnes du plateau (au moins 4)")
+    parser.add_argument("--hauteur", type=int, default=DIM_PLATEAU[1],
+                        help="nombre de lignes du plateau")
+    parser.add_argument("--max-pieces", type=int, default=None,
+                        help="nombre maximal de pièces par partie (0 : sans limite ; "
+                        f"par défaut, {MAX_PIECES['ia']} pour ia, sans limite sinon)")
+    parser.add_argument("--processus", type=int, default=os.cpu_count(),
+                        help="nombre de processus")
+    parser.add_argument("--detail", action="store_true", help="affiche chaque partie finie")
+    parser.add_argument("--donnees", metavar="DOSSIER", default=None,
+                        help="écrit chaque pas des parties dans ce dossier (donnees.py)")
+    args = parser.parse_args()
+    if args.parties < 1:
+        parser.error("--parties doit être au moins 1")
+    if args.largeur < 4 or args.hauteur < 1:
+        parser.error("le plateau doit avoir au moins 4 colonnes et 1 ligne")
+    if args.politique == "ia" and (args.largeur, args.hauteur) != DIM_PLATEAU:
+        parser.error(f"la politique ia ne joue que sur le plateau par défaut "
+                     f"({DIM_PLATEAU[0]} x {DIM_PLATEAU[1]})")
+    if args.politique in MAX_PIECES and args.max_pieces == 0:
+        parser.error(f"la politique {args.politique} peut ne jamais perdre : "
+                     f"--max-pieces doit être au moins 1")
+    if args.max_pieces is not None and args.max_pieces < 0:
+        parser.error("--max-pieces ne peut pas être négatif")
+
+    debut = time.perf_counter()
+    resultats = []
+    for resultat in simuler(args.parties, args.graine, args.politique, plateau=args.plateau,
+                            max_pieces=args.max_pieces, processus=args.processus,
+                            dimensions=(args.largeur, args.hauteur), donnees=args.donnees):
+        resultats.append(resultat)
+        if args.detail:
+            print("  ".join(f"{champ}={resultat[champ]:.4f}" if champ == "duree"
+                            else f"{champ}={resultat[champ]}" for champ in CHAMPS))
+    print(resumer(resultats, time.perf_counter() - debut))
+
+
+if __name__ == "__main__":
+    main()
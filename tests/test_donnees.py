@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du jeu de données : les pas écrits par Ecrivain doivent être relus à
+l'identique par Trajectoires, et le mélange de lots doit rendre chaque
+enregistrement exactement une fois.
+"""
+
+import random
+import pytest
+from moteur import Moteur, ACTIONS
+
+np = pytest.importorskip("numpy")
+# pylint: disable=wrong-import-position
+import donnees
+from donnees import (Ecrivain, Trajectoires, ENTETE, SIGNATURE, VERSION, format_enregistrement,
+                     lire_entete)
+
+
+def ecrire(chemin, graines, largeur: int =10, hauteur: int =20, taille_lot: int =100):
+    """
+    Joue des parties au hasard et écrit leurs pas, comme simulation.py.
+
+    Args:
+        chemin (pathlib.Path): Le fichier de données.
+        graines (iterable): Les graines des parties.
+        largeur (int, optional): Le nombre de colonnes. Par défaut, 10.
+        hauteur (int, optional): Le nombre de lignes. Par défaut, 20.
+        taille_lot (int, optional): Le nombre d'enregistrements écrits à la
+            fois. Par défaut, 100.
+
+    Returns:
+        list: Un tuple par pas : graine, pas, plateau (liste de lignes de
+            booléens), pièce et action.
+    """
+    pas = []
+    with Ecrivain(chemin, largeur, hauteur, taille_lot) as ecrivain:
+        for graine in graines:
+            moteur, hasard, numero = Moteur(graine=graine, largeur=largeur,
+                                            hauteur=hauteur), random.Random(graine), 0
+            while not moteur.perdu:
+                action = hasard.choice(ACTIONS)
+                cases = moteur.plateau.fenetre(0, 0, largeur, hauteur)
+                pas.append((graine, numero, [[bool(c) for c in ligne] for ligne in cases],
+                            moteur.current[0].indice if moteur.current else -1, action))
+                ecrivain.ajouter(moteur, action)
+                moteur.step(action)
+                numero += 1
+            ecrivain.terminer(moteur)
+    return pas
+
+
+@pytest.mark.parametrize("largeur, hauteur", [(10, 20), (7, 9)])
+def test_aller_retour(tmp_path, largeur, hauteur):
+    """Les pas relus sont ceux qui ont été écrits, dans l'ordre."""
+    chemin = tmp_path / "a.traj"
+    pas = ecrire(chemin, range(3), largeur, hauteur)
+    trajectoires = Trajectoires(str(chemin))
+    assert len(trajectoires) == len(pas)
+    lot = trajectoires.lire(np.arange(len(pas)))
+    assert lot["plateau"].shape == (len(pas), hauteur, largeur)
+    for i, (graine, numero, plateau, piece, action) in enumerate(pas):
+        assert (lot["partie"][i], lot["pas"][i], lot["piece"][i], lot["action"][i]) == \
+            (graine, numero, piece, action)
+        assert lot["plateau"][i].tolist() == plateau
+    fins = np.flatnonzero(lot["fin"])
+    assert fins.tolist() == [i for i in range(len(pas)) if i + 1 == len(pas)
+                             or pas[i + 1][1] == 0]
+
+
+def test_entete_et_format(tmp_path):
+    """L'en-tête donne les dimensions, et la taille du fichier suit le format."""
+    chemin = tmp_path / "b.traj"
+    pas = ecrire(chemin, [5], 7, 9)
+    contenu = chemin.read_bytes()
+    assert ENTETE.unpack_from(contenu) == (SIGNATURE, VERSION, 7, 9)
+    assert lire_entete(chemin) == (7, 9)
+    assert len(contenu) == ENTETE.size + len(pas) * format_enregistrement(7, 9).itemsize
+    # Un fichier existant n'est complété que pour le même plateau
+    with pytest.raises(ValueError):
+        Ecrivain(chemin, 10, 20)
+    chemin.write_bytes(b"XXXX" + contenu[4:])
+    with pytest.raises(ValueError):
+        Trajectoires(str(chemin))
+
+
+def test_enregistrement_incomplet_ignore(tmp_path):
+    """Un enregistrement coupé à la fin du fichier n'est pas lu."""
+    chemin = tmp_path / "c.traj"
+    pas = ecrire(chemin, [6])
+    with open(chemin, "ab") as fichier:
+        fichier.write(b"\x00" * 10)
+    assert len(Trajectoires(str(chemin))) == len(pas)
+
+
+@pytest.mark.parametrize("taille", [1, 256, 1000])
+def test_lots_melanges_complets(tmp_path, monkeypatch, taille):
+    """Mélangés, les lots de plusieurs fichiers rendent chaque pas une seule fois."""
+    # Des blocs petits, pour en mélanger plusieurs groupes
+    monkeypatch.setattr(donnees, "TAILLE_BLOC", 64)
+    monkeypatch.setattr(donnees, "BLOCS_MELANGES", 4)
+    for k in range(3):
+        ecrire(tmp_path / f"{k}.traj", range(10 * k, 10 * k + 10))
+    trajectoires = Trajectoires(str(tmp_path))
+    n = len(trajectoires)
+    assert n > 64 * 4 * 2
+    cles = [(int(p), int(s)) for c in trajectoires.colonnes for p, s in zip(c["partie"],
+                                                                          c["pas"])]
+    vus = []
+    for lot in trajectoires.lots(taille, melanger=True, graine=1):
+        assert 0 < len(lot["pas"]) <= taille
+        vus += zip(lot["partie"].tolist(), lot["pas"].tolist())
+    assert sorted(vus) == sorted(cles) and len(set(vus)) == n
+    assert vus != cles
+    dans_l_ordre = [k for lot in trajectoires.lots(taille, melanger=False)
+                    for k in zip(lot["partie"].tolist(), lot["pas"].tolist())]
+    assert dans_l_ordre == cles
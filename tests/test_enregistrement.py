@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Tests des enregistrements : une partie enregistrée, écrite puis relue, doit
+être rejouée à l'identique par rejouer.
+"""
+
+import random
+import pytest
+from enregistrement import Enregistrement, ENTETE_V1, SIGNATURE, rejouer
+from moteur import Moteur, ACTIONS
+from plateau import PlateauBits, PlateauCreux, PlateauListe
+
+
+def enregistrer(graine: int, pas: int, largeur: int =10, hauteur: int =20):
+    """
+    Joue une partie au hasard en enregistrant chaque action, comme tetris.py.
+
+    Args:
+        graine (int): La graine des pièces et des actions.
+        pas (int): Le nombre maximal de pas joués.
+        largeur (int, optional): Le nombre de colonnes. Par défaut, 10.
+        hauteur (int, optional): Le nombre de lignes. Par défaut, 20.
+
+    Returns:
+        tuple: Le moteur à la fin de la partie et l'enregistrement.
+    """
+    moteur = Moteur(graine=graine, largeur=largeur, hauteur=hauteur)
+    enregistrement = Enregistrement(graine, largeur, hauteur)
+    hasard = random.Random(graine)
+    while moteur.ticks < pas and not moteur.perdu:
+        action = hasard.choice(ACTIONS)
+        enregistrement.ajouter(moteur.ticks, action)
+        moteur.tick(action)
+    enregistrement.fin = moteur.ticks
+    return moteur, enregistrement
+
+
+@pytest.mark.parametrize("classe", (PlateauListe, PlateauBits, PlateauCreux))
+@pytest.mark.parametrize("partie", [(1, 500, 10, 20), (2, 100000, 10, 20), (3, 100000, 7, 12)])
+def test_rejouer_a_l_identique(tmp_path, classe, partie):
+    """Écrit puis relu, l'enregistrement redonne exactement l'état final."""
+    graine, _, largeur, hauteur = partie
+    moteur, enregistrement = enregistrer(*partie)
+    chemin = tmp_path / "partie.tet"
+    enregistrement.sauver(chemin)
+    relu = Enregistrement.charger(chemin)
+    assert (relu.graine, relu.fin, relu.largeur, relu.hauteur) == \
+        (graine, moteur.ticks, largeur, hauteur)
+    assert rejouer(relu, classe).snapshot().to_bytes() == moteur.snapshot().to_bytes()
+
+
+def test_charger_invalide(tmp_path):
+    """Un fichier tronqué ou d'un autre format est refusé."""
+    _, enregistrement = enregistrer(4, 200)
+    chemin = tmp_path / "partie.tet"
+    enregistrement.sauver(chemin)
+    donnees = chemin.read_bytes()
+    for invalide in (donnees[:-1], b"XXXX" + donnees[4:], b""):
+        chemin.write_bytes(invalide)
+        with pytest.raises(ValueError):
+            Enregistrement.charger(chemin)
+
+
+def test_charger_version_1(tmp_path):
+    """Un enregistrement de la version 1, sans dimensions, est rejoué sur 10 x 20."""
+    moteur, enregistrement = enregistrer(5, 300)
+    n = len(enregistrement)
+    chemin = tmp_path / "partie.tet"
+    chemin.write_bytes(ENTETE_V1.pack(SIGNATURE, 1, 5, enregistrement.fin, n)
+                       + enregistrement.ticks.tobytes() + enregistrement.actions.tobytes())
+    relu = Enregistrement.charger(chemin)
+    assert (relu.largeur, relu.hauteur) == (10, 20)
+    assert rejouer(relu).snapshot().to_bytes() == moteur.snapshot().to_bytes()
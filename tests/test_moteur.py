@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de la copie de l'état du moteur : Moteur.snapshot et Moteur.restore,
+Etat.to_bytes et Etat.from_bytes.
+"""
+
+import random
+import pytest
+from moteur import Moteur, Etat, ACTIONS
+from plateau import PlateauBits, PlateauCreux, PlateauListe
+
+PLATEAUX = (PlateauListe, PlateauBits, PlateauCreux)
+
+
+def trajectoire(moteur: Moteur, actions):
+    """
+    Joue des actions et retourne l'état sérialisé après chacune.
+
+    Args:
+        moteur (Moteur): Le moteur.
+        actions (list): Les actions à jouer (tick, pour que ticks avance).
+
+    Returns:
+        list: Les états (bytes), un par action.
+    """
+    etats = []
+    for action in actions:
+        moteur.tick(action)
+        etats.append(moteur.snapshot().to_bytes())
+    return etats
+
+
+def partie_en_cours(classe, graine: int, pas: int):
+    """
+    Crée un moteur et joue des actions au hasard, sans perdre si possible.
+
+    Args:
+        classe (type): La classe du plateau.
+        graine (int): La graine des pièces et des actions.
+        pas (int): Le nombre d'actions jouées.
+
+    Returns:
+        tuple: Le moteur et le générateur d'actions.
+    """
+    moteur, hasard = Moteur(classe, graine=graine), random.Random(graine)
+    for _ in range(pas):
+        if moteur.perdu:
+            break
+        moteur.tick(hasard.choice(ACTIONS))
+    return moteur, hasard
+
+
+@pytest.mark.parametrize("classe", PLATEAUX)
+@pytest.mark.parametrize("graine", range(8))
+def test_restore_rejoue_la_meme_suite(classe, graine):
+    """Après restore, les mêmes actions redonnent exactement les mêmes états."""
+    moteur, hasard = partie_en_cours(classe, graine, 300)
+    etat = moteur.snapshot()
+    actions = [hasard.choice(ACTIONS) for _ in range(400)]
+    attendus = trajectoire(moteur, actions)
+    moteur.restore(etat)
+    assert moteur.snapshot().to_bytes() == etat.to_bytes()
+    assert trajectoire(moteur, actions) == attendus
+
+
+@pytest.mark.parametrize("classe", PLATEAUX)
+@pytest.mark.parametrize("graine", range(8))
+def test_to_bytes_aller_retour(classe, graine):
+    """
+    Un état relu par Etat.from_bytes se resérialise à l'identique et
+    continue la partie sur un autre moteur, quel que soit son plateau.
+    """
+    moteur, hasard = partie_en_cours(classe, graine, 300)
+    donnees = moteur.snapshot().to_bytes()
+    assert Etat.from_bytes(donnees).to_bytes() == donnees
+    actions = [hasard.choice(ACTIONS) for _ in range(400)]
+    attendus = trajectoire(moteur, actions)
+    for autre in PLATEAUX:
+        copie = Moteur(autre)
+        copie.restore(Etat.from_bytes(donnees))
+        assert trajectoire(copie, actions) == attendus, autre.__name__
+
+
+def test_restore_partie_perdue():
+    """L'état d'une partie perdue se remet en place sur une partie neuve."""
+    moteur = Moteur(graine=1)
+    while not moteur.perdu:
+        moteur.step(ACTIONS[-1])
+    donnees = moteur.snapshot().to_bytes()
+    copie = Moteur(graine=2)
+    copie.restore(Etat.from_bytes(donnees))
+    assert copie.perdu and copie.snapshot().to_bytes() == donnees
+
+
+def test_restore_dimensions_differentes():
+    """Un état ne se remet pas en place sur un plateau d'autres dimensions."""
+    etat = Moteur(largeur=8, hauteur=16).snapshot()
+    with pytest.raises(ValueError):
+        Moteur().restore(etat)
+
+
+@pytest.mark.parametrize("donnees", [b"", b"\x00" * 8])
+def test_from_bytes_invalide(donnees):
+    """Des données qui ne sont pas un état sont refusées."""
+    with pytest.raises(ValueError):
+        Etat.from_bytes(donnees)
+
+
+@pytest.mark.parametrize("classe", PLATEAUX)
+def test_from_bytes_tronque(classe):
+    """
+    Un état tronqué ou trop long est refusé, qu'il manque des couleurs, une
+    partie du masque ou de l'en-tête, y compris pour un plateau vide.
+    """
+    vide = Moteur(classe, graine=4).snapshot().to_bytes()
+    plein = partie_en_cours(classe, 4, 300)[0].snapshot().to_bytes()
+    for donnees in (vide, plein):
+        for taille in range(len(donnees)):
+            with pytest.raises(ValueError):
+                Etat.from_bytes(donnees[:taille])
+        with pytest.raises(ValueError):
+            Etat.from_bytes(donnees + b"\x00")
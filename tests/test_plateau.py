@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Tests d'équivalence des plateaux : PlateauListe, PlateauBits et PlateauCreux
+doivent jouer exactement les mêmes parties, jusqu'à la pose qui les termine.
+"""
+
+import random
+import pytest
+from moteur import Moteur, ACTIONS
+from plateau import PlateauBits, PlateauCreux, PlateauListe
+
+PLATEAUX = (PlateauListe, PlateauBits, PlateauCreux)
+
+
+def jouer_ensemble(graine: int, largeur: int, hauteur: int):
+    """
+    Joue la même partie au hasard sur chaque plateau, en comparant l'état
+    complet des moteurs (Etat.to_bytes) et la hauteur des colonnes à chaque pas.
+
+    Args:
+        graine (int): La graine des pièces et des actions.
+        largeur (int): Le nombre de colonnes.
+        hauteur (int): Le nombre de lignes.
+
+    Returns:
+        list: Les moteurs, un par plateau, à la fin de la partie.
+    """
+    moteurs = [Moteur(classe, graine=graine, largeur=largeur, hauteur=hauteur)
+               for classe in PLATEAUX]
+    hasard = random.Random(graine)
+    while not moteurs[0].perdu:
+        action = hasard.choice(ACTIONS)
+        for moteur in moteurs:
+            moteur.step(action)
+        reference = moteurs[0].snapshot().to_bytes()
+        for moteur in moteurs[1:]:
+            assert moteur.snapshot().to_bytes() == reference, moteur.classe_plateau.__name__
+            assert moteur.plateau.hauteurs == moteurs[0].plateau.hauteurs
+    return moteurs
+
+
+@pytest.mark.parametrize("largeur, hauteur", [(10, 20), (4, 20), (7, 9)])
+@pytest.mark.parametrize("graine", range(12))
+def test_memes_parties(graine, largeur, hauteur):
+    """Les trois plateaux jouent la même partie, pas à pas."""
+    moteurs = jouer_ensemble(graine, largeur, hauteur)
+    assert all(moteur.perdu for moteur in moteurs)
+
+
+def test_pose_finale_superposee():
+    """
+    La dernière pièce de la graine 67 (plateau 4 x 20) recouvre des cases
+    occupées : aucune ligne fantôme ne doit être retirée.
+    """
+    moteurs = jouer_ensemble(67, 4, 20)
+    assert {(moteur.score, moteur.lignes) for moteur in moteurs} == {(0, 0)}
+
+
+@pytest.mark.parametrize("classe", PLATEAUX)
+def test_poser_sur_cases_occupees(classe):
+    """Poser sur des cases occupées ne complète pas leur ligne."""
+    plateau = classe(4, 5)
+    assert plateau.poser([(0, 4), (1, 4), (2, 4)], 1) == 0
+    assert plateau.poser([(0, 4), (1, 4), (2, 4), (0, 3)], 2) == 0
+    assert plateau.fenetre(0, 3, 4, 2) == [[2, 0, 0, 0], [2, 2, 2, 0]]
+    assert plateau.poser([(3, 4)], 3) == 1
+    assert plateau.fenetre(0, 4, 4, 1) == [[2, 0, 0, 0]]
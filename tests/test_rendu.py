@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Tests des rendus sans écran : les séquences ANSI écrites par RenduTerminal
+pour un plateau connu, et l'image de RenduImage, sans fenêtre.
+"""
+
+import io
+import pytest
+
+pygame = pytest.importorskip("pygame")
+# pylint: disable=wrong-import-position
+from constante import COULEURS, TAILLE_FENETRE
+from rendu import RenduImage, RenduTerminal
+
+
+def test_terminal_plateau_connu():
+    """Cadre et cases d'un plateau de 2 x 2 donnent exactement ces séquences."""
+    sortie = io.StringIO()
+    rendu = RenduTerminal(sortie, io.StringIO())
+    rendu.cadre(2, 2)
+    rendu.case(0, 0, 1)
+    rendu.case(1, 0, 1)
+    rendu.case(1, 1, 0)
+    rendu.case(0, -1, 0)
+    rendu.presenter()
+    assert sortie.getvalue() == (
+        "\x1b[?25l\x1b[2J"
+        "\x1b[0m\x1b[2J"
+        "\x1b[5;2H┌────┐"
+        "\x1b[6;2H│\x1b[6;7H│"
+        "\x1b[7;2H│\x1b[7;7H│"
+        "\x1b[8;2H└────┘"
+        # Deux cases jaunes côte à côte : ni déplacement ni couleur pour la seconde
+        "\x1b[6;3H\x1b[48;2;255;255;0m    "
+        "\x1b[7;5H\x1b[48;2;0;0;0m  "
+        # Case effacée juste au-dessus du plateau : le bord du cadre
+        "\x1b[5;3H\x1b[0m──")
+    assert rendu.ecrits == len(sortie.getvalue())
+
+
+def test_terminal_image_sans_changement():
+    """Une image sans changement n'écrit rien, et fermer rend le curseur."""
+    sortie = io.StringIO()
+    rendu = RenduTerminal(sortie, io.StringIO())
+    rendu.cadre(2, 2)
+    rendu.presenter()
+    ecrits = rendu.ecrits
+    rendu.presenter()
+    assert rendu.ecrits == ecrits
+    rendu.fermer()
+    assert sortie.getvalue().endswith("\x1b[0m\x1b[10;1H\x1b[?25h")
+
+
+def test_image_sans_fenetre():
+    """RenduImage dessine dans une image en mémoire, sans module d'affichage."""
+    pygame.display.quit()
+    rendu = RenduImage()
+    assert not pygame.display.get_init()
+    assert rendu.surface.get_size() == TAILLE_FENETRE and not rendu.redimensionnable
+    rendu.case(0, 0, 3)
+    rendu.presenter()
+    x, y = rendu.disposition.plateau
+    assert rendu.surface.get_at((x, y))[:3] == COULEURS[3]
+    rendu.fermer()
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du serveur : un Spectateur qui applique les messages reçus doit
+reconstruire les parties du serveur, différences et resynchronisations
+comprises, et un message de fin n'est jamais perdu.
+"""
+
+import asyncio
+import json
+import serveur
+from constante import TICKS_PAR_SECONDE
+from moteur import CHUTE, DROITE, GAUCHE
+from serveur import Client, Salle, Serveur, Spectateur
+
+
+def verifier(spectateur: Spectateur, salle: Salle):
+    """
+    Compare les parties reconstruites par un spectateur à celles de la salle.
+
+    Args:
+        spectateur (Spectateur): Le spectateur.
+        salle (Salle): La salle.
+
+    Returns:
+        Aucune valeur de retour.
+    """
+    assert spectateur.pas == salle.ticks
+    for i, partie in enumerate(salle.parties):
+        complet = partie.complet()
+        reconstruite = spectateur.parties[i]
+        assert "".join(map(str, reconstruite["cases"])) == complet["cases"]
+        assert reconstruite["piece"] == complet["piece"]
+        assert reconstruite["compteurs"] == complet["compteurs"]
+
+
+async def lire_jusqua_fin(lecteur: asyncio.StreamReader, spectateur: Spectateur):
+    """
+    Applique les messages d'une connexion jusqu'au message de fin.
+
+    Args:
+        lecteur (asyncio.StreamReader): Le flux de lecture de la connexion.
+        spectateur (Spectateur): Le spectateur.
+
+    Returns:
+        dict: Le message de fin.
+    """
+    async for ligne in lecteur:
+        message = json.loads(ligne)
+        if message["type"] == "fin":
+            return message
+        spectateur.appliquer(message)
+    raise AssertionError("connexion fermée avant la fin")
+
+
+def test_spectateur_reconstruit_la_partie():
+    """Par le réseau, un spectateur et le joueur voient la partie du serveur."""
+
+    async def scenario():
+        instance = Serveur()
+        tcp = await asyncio.start_server(instance.gerer_client, "127.0.0.1", 0)
+        port = tcp.sockets[0].getsockname()[1]
+        async with tcp:
+            connexions = [await asyncio.open_connection("127.0.0.1", port) for _ in range(2)]
+            (lecteur_spectateur, ecrivain_spectateur), (lecteur_joueur, ecrivain_joueur) = \
+                connexions
+            ecrivain_spectateur.write(serveur.encoder({"rejoindre": "t"}))
+            await ecrivain_spectateur.drain()
+            await lecteur_spectateur.readline()
+            salle = instance.salles["t"]
+            ecrivain_joueur.write(serveur.encoder({"rejoindre": "t", "role": "joueur"}))
+            spectateurs = [Spectateur(), Spectateur()]
+            taches = [asyncio.create_task(lire_jusqua_fin(lecteur, spectateur))
+                      for lecteur, spectateur in zip((lecteur_spectateur, lecteur_joueur),
+                                                     spectateurs)]
+            while not all(tache.done() for tache in taches):
+                ecrivain_joueur.write(serveur.encoder({"action": CHUTE}))
+                await asyncio.sleep(0.05)
+            fins = [tache.result() for tache in taches]
+            for spectateur in spectateurs:
+                verifier(spectateur, salle)
+            assert fins[0] == fins[1] and fins[0]["scores"] == [salle.parties[0].moteur.score]
+            for _, ecrivain in connexions:
+                ecrivain.close()
+                await ecrivain.wait_closed()
+            await asyncio.sleep(0.05)
+            assert not instance.salles
+
+    asyncio.run(asyncio.wait_for(scenario(), 30))
+
+
+def test_client_lent_resynchronise(monkeypatch):
+    """
+    Un client qui lit moins vite que la salle ne joue perd des messages, mais
+    l'état complet qui les remplace redonne la partie, et la fin arrive.
+    """
+    monkeypatch.setattr(serveur, "TAILLE_FILE", 8)
+
+    async def scenario():
+        salle, client, spectateur = Salle("lente", 2, graine=11), Client(None, None), Spectateur()
+        salle.ajouter(client, "joueur")
+        salle.ajouter(Client(None, None), "joueur")
+        tache = asyncio.create_task(salle.boucle())
+        tour = 0
+        while not tache.done():
+            # Un déplacement à chaque pas, pour un message à chaque pas
+            tour += 1
+            for partie in salle.parties:
+                partie.actions.append(CHUTE if tour % 4 == 0 else (GAUCHE, DROITE)[tour % 2])
+            await asyncio.sleep(1 / TICKS_PAR_SECONDE)
+            if tour % 4 == 0 and not client.file.empty():
+                spectateur.appliquer(json.loads(client.file.get_nowait()))
+            if tour == 100:
+                assert client.perdus > 0
+        messages = []
+        while not client.file.empty():
+            messages.append(json.loads(client.file.get_nowait()))
+        assert messages[-1]["type"] == "fin"
+        for message in messages[:-1]:
+            spectateur.appliquer(message)
+        verifier(spectateur, salle)
+
+    asyncio.run(asyncio.wait_for(scenario(), 30))
+
+
+def test_fin_avec_file_pleine():
+    """Le message de fin est envoyé même quand la file du client est pleine."""
+    salle, client, spectateur = Salle("pleine"), Client(None, None), Spectateur()
+    salle.ajouter(client, "joueur")
+    partie = salle.parties[0]
+    while not partie.moteur.perdu:
+        partie.moteur.step(CHUTE)
+    partie.delta()
+    while not client.file.full():
+        client.envoyer(serveur.encoder({"type": "rien"}))
+    asyncio.run(asyncio.wait_for(salle.boucle(), 10))
+    messages = [json.loads(client.file.get_nowait()) for _ in range(client.file.qsize())]
+    assert messages[-1]["type"] == "fin"
+    for message in messages[:-1]:
+        spectateur.appliquer(message)
+    verifier(spectateur, salle)
+
+
+def test_salle_abandonnee_fermee():
+    """Une salle qui attend son second joueur est fermée quand tous sont partis."""
+
+    async def scenario():
+        instance = Serveur()
+        tcp = await asyncio.start_server(instance.gerer_client, "127.0.0.1", 0)
+        port = tcp.sockets[0].getsockname()[1]
+        async with tcp:
+            lecteur, ecrivain = await asyncio.open_connection("127.0.0.1", port)
+            ecrivain.write(serveur.encoder({"rejoindre": "duel", "role": "joueur",
+                                            "joueurs": 2}))
+            await lecteur.readline()
+            tache = instance.salles["duel"].tache
+            ecrivain.close()
+            await ecrivain.wait_closed()
+            await asyncio.sleep(0.05)
+            assert not instance.salles and tache.cancelled()
+
+    asyncio.run(asyncio.wait_for(scenario(), 10))
+
+
+def test_ligne_trop_longue():
+    """Une ligne plus longue que la limite du lecteur déconnecte le client."""
+
+    async def scenario():
+        instance = Serveur()
+        tcp = await asyncio.start_server(instance.gerer_client, "127.0.0.1", 0)
+        port = tcp.sockets[0].getsockname()[1]
+        async with tcp:
+            lecteur, ecrivain = await asyncio.open_connection("127.0.0.1", port)
+            ecrivain.write(b"x" * 200000 + b"\n")
+            await ecrivain.drain()
+            assert await lecteur.read() == b""
+            ecrivain.close()
+
+    asyncio.run(asyncio.wait_for(scenario(), 10))
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Tests d'équivalence de MoteurVectoriel : chaque partie doit jouer comme un
+Moteur de même graine qui reçoit les mêmes actions.
+"""
+
+import pytest
+from moteur import Moteur, CHUTE
+
+np = pytest.importorskip("numpy")
+from vecteur import MoteurVectoriel  # pylint: disable=wrong-import-position
+
+COMPTEURS = ("score", "pieces", "lignes", "tetris", "niveau", "perdu")
+
+
+@pytest.mark.parametrize("largeur, hauteur", [(10, 20), (4, 20), (7, 9)])
+def test_memes_parties_que_moteur(largeur, hauteur):
+    """Plateaux, pièces et compteurs sont ceux des moteurs, à chaque pas."""
+    nombre = 16
+    graines = np.arange(100, 100 + nombre)
+    vecteur = MoteurVectoriel(nombre, graines, largeur, hauteur)
+    moteurs = [Moteur(graine=int(graine), largeur=largeur, hauteur=hauteur)
+               for graine in graines]
+    hasard = np.random.default_rng(0)
+    for _ in range(2000):
+        if vecteur.perdu.all():
+            break
+        actions = hasard.integers(0, 6, nombre)
+        vecteur.step(actions)
+        for i, moteur in enumerate(moteurs):
+            if not moteur.perdu:
+                moteur.step(int(actions[i]))
+            assert vecteur.plateaux[i].tobytes() == moteur.snapshot().cases, i
+            for compteur in COMPTEURS:
+                assert getattr(vecteur, compteur)[i] == getattr(moteur, compteur), compteur
+            if moteur.current is not None and not moteur.perdu:
+                x, y, rotation = moteur.position
+                assert vecteur.piece[i] == moteur.current[0].indice
+                assert (vecteur.x[i], vecteur.y[i], vecteur.rotation[i]) == (x, y, rotation)
+    assert vecteur.perdu.all()
+
+
+def test_observer_sans_copie():
+    """observer renvoie une vue en lecture seule, tenue à jour à chaque pas."""
+    vecteur = MoteurVectoriel(4)
+    vue = vecteur.observer()
+    assert vue.shape == (4, 20, 10) and not vue.flags.writeable
+    for _ in range(200):
+        vecteur.step(np.full(4, CHUTE))
+    assert np.array_equal(vue, vecteur.plateaux) and vue.any()
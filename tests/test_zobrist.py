@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Tests des clés de Zobrist : la clé tenue à jour par le moteur doit être
+celle recalculée sur tout le plateau, et la table de transposition doit
+respecter sa capacité et sa politique de remplacement.
+"""
+
+import random
+import pytest
+from moteur import Moteur, Etat, ACTIONS
+from plateau import PlateauBits, PlateauCreux, PlateauListe
+from zobrist import Zobrist, TableTransposition
+
+PLATEAUX = (PlateauListe, PlateauBits, PlateauCreux)
+
+
+def cle_recalculee(moteur: Moteur):
+    """
+    Recalcule la clé d'une position à partir de toutes ses cases.
+
+    Args:
+        moteur (Moteur): Le moteur.
+
+    Returns:
+        int: La clé de la position, comme Moteur.cle.
+    """
+    plateau = moteur.plateau
+    zobrist = Zobrist(plateau.largeur, plateau.hauteur)
+    cle = zobrist.charger(moteur.snapshot().cases)
+    if moteur.current is not None:
+        x, y, rotation = moteur.position
+        cle ^= zobrist.piece(moteur.current[0].indice, x, y, rotation)
+    return cle
+
+
+@pytest.mark.parametrize("largeur, hauteur", [(10, 20), (5, 12), (4, 20)])
+@pytest.mark.parametrize("classe", PLATEAUX)
+@pytest.mark.parametrize("graine", range(4))
+def test_cle_incrementale(classe, graine, largeur, hauteur):
+    """La clé tenue à jour pièce après pièce est celle du plateau entier."""
+    moteur = Moteur(classe, graine=graine, largeur=largeur, hauteur=hauteur)
+    moteur.hachage()
+    hasard = random.Random(graine)
+    while not moteur.perdu:
+        moteur.step(hasard.choice(ACTIONS))
+        assert moteur.cle == cle_recalculee(moteur)
+
+
+@pytest.mark.parametrize("classe", PLATEAUX)
+def test_cle_lignes_retirees(classe):
+    """La clé reste juste quand des lignes sont retirées (joueur automatique)."""
+    ia = pytest.importorskip("ia")
+    moteur, joueur = Moteur(classe, graine=7), ia.IA()
+    moteur.hachage()
+    while not moteur.perdu and moteur.pieces < 120:
+        moteur.step(joueur.action(moteur))
+        assert moteur.cle == cle_recalculee(moteur)
+    assert moteur.lignes > 0
+
+
+@pytest.mark.parametrize("classe", PLATEAUX)
+def test_cle_apres_restore(classe):
+    """
+    La clé reste juste après restore, d'un état pris avec ou sans clé de
+    plateau (Etat.from_bytes n'en garde pas).
+    """
+    moteur, hasard = Moteur(classe, graine=5), random.Random(5)
+    moteur.hachage()
+    for _ in range(200):
+        moteur.step(hasard.choice(ACTIONS))
+    etat, cle = moteur.snapshot(), moteur.cle
+    for _ in range(200):
+        if not moteur.perdu:
+            moteur.step(hasard.choice(ACTIONS))
+    moteur.restore(etat)
+    assert moteur.cle == cle
+    moteur.restore(Etat.from_bytes(etat.to_bytes()))
+    assert moteur.cle == cle == cle_recalculee(moteur)
+
+
+def test_positions_differentes():
+    """Deux positions différentes ont presque toujours des clés différentes."""
+    moteur, hasard = Moteur(graine=3), random.Random(3)
+    cles = {}
+    while not moteur.perdu:
+        moteur.step(hasard.choice(ACTIONS))
+        position = (moteur.snapshot().cases, moteur.current and moteur.current[0].indice,
+                    tuple(moteur.position))
+        assert cles.setdefault(moteur.cle, position) == position
+
+
+@pytest.mark.parametrize("politique", ["lru", "fifo", "remplacer"])
+def test_table_capacite(politique):
+    """La table ne dépasse pas sa capacité et retrouve ce qu'elle garde."""
+    table = TableTransposition(8, politique)
+    for cle in range(100):
+        table.ranger(cle, cle * 2)
+        assert table.chercher(cle) == cle * 2
+        assert len(table) <= 8
+    assert table.chercher(1000) is None
+    assert table.succes == 100 and table.echecs == 1
+
+
+def test_table_lru_garde_les_recentes():
+    """LRU remplace l'entrée la moins récemment lue, FIFO la plus ancienne."""
+    lru, fifo = TableTransposition(2, "lru"), TableTransposition(2, "fifo")
+    for table in (lru, fifo):
+        table.ranger(1, "a")
+        table.ranger(2, "b")
+        table.chercher(1)
+        table.ranger(3, "c")
+    assert lru.chercher(1) == "a" and lru.chercher(2) is None
+    assert fifo.chercher(1) is None and fifo.chercher(2) == "b"
+
+
+def test_table_invalide():
+    """Une politique inconnue ou une capacité négative sont refusées."""
+    with pytest.raises(ValueError):
+        TableTransposition(8, "aleatoire")
+    with pytest.raises(ValueError):
+        TableTransposition(-1)
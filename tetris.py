@@ -16,12 +16,36 @@ __maintainer__ = "Ethan Maridat"
 __email__ = "ethanmrdt@gmail.com"
 
 # Probleme de l'ordre des imports
-import random
+import argparse
+import logging
+import os
 import time
 import sys
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
 import pygame
-from pygame.locals import *
-from constante import *
+from pygame.locals import QUIT, KEYDOWN, KEYUP, VIDEORESIZE, K_ESCAPE, K_LEFT, K_RIGHT, K_DOWN, K_UP, \
+    K_SPACE, K_p, K_F3
+from constante import (DELAI_ATTENTE, DELAI_REPETITION, DIM_PLATEAU, IMAGES_PAR_SECONDE,
+                       MARGE_VUE, PERIODE_PROFIL, PERIODE_REPETITION, POSITIONS_STATS,
+                       RETARD_MAX, TICKS_PAR_SECONDE)
+from moteur import Moteur, RIEN, GAUCHE, DROITE, BAS, ROTATION, CHUTE
+from plateau import PlateauBits, PlateauCreux
+from enregistrement import Enregistrement
+from entrees import Entrees
+from profilage import Profileur
+from rendu import RENDUS, RenduPygame
+import journalisation
+
+journal = logging.getLogger("tetris")
+
+# Correspondance entre les touches du clavier et les actions du moteur
+TOUCHES = {
+    K_LEFT: GAUCHE,  #Appuie sur flèche de gauche pour deplacer vers la gauche
+    K_RIGHT: DROITE,  #Appuie sur flèche de droite pour deplacer vers la droite
+    K_DOWN: BAS,  #Appuie sur flèche du bas pour deplacer vers le bas
+    K_UP: ROTATION,  #Appuie sur flèche du haut pour tourner la pièce
+    K_SPACE: CHUTE,  #Appuie sur espace pour faire descendre la pièce
+}
 
 
 
@@ -32,31 +56,46 @@ class Jeu:
 	Cette classe représente le jeu Tetris.
 	"""
 
-    def __init__(self):
+    def __init__(self, largeur: int =DIM_PLATEAU[0], hauteur: int =DIM_PLATEAU[1],
+                 rendu=None):
         """
         Initialise une instance de la classe Jeu pour le jeu Tetris.
 
         Cette méthode effectue les actions suivantes :
-        - Initialise le module Pygame.
+        - Garde le rendu (rendu.py) qui affiche les images et lit les touches ;
+          par défaut, une fenêtre Pygame (RenduPygame).
         - Crée une horloge (Clock) pour contrôler la vitesse du jeu.
-        - Crée une surface pour afficher le jeu avec la taille spécifiée dans TAILLE_FENETRE.
-        - Charge les polices de caractères utilisées dans le jeu dans un dictionnaire (fonts).
-        - Définit le titre de la fenêtre du jeu comme 'Application Tetris'.
+        - Crée le moteur de règles (Moteur) qui porte l'état de la partie. Un
+          plateau plus grand que DIM_PLATEAU est un PlateauCreux, qui défile.
 
         Args:
-            Aucun argument n'est pris en compte lors de l'initialisation.
+            largeur (int, optional): Le nombre de colonnes du plateau.
+                Par défaut, DIM_PLATEAU[0].
+            hauteur (int, optional): Le nombre de lignes du plateau.
+                Par défaut, DIM_PLATEAU[1].
+            rendu (rendu.Rendu, optional): Le rendu du jeu. Par défaut, RenduPygame().
 
         Returns:
             Aucune valeur de retour.
         """
-        pygame.init()
+        self.rendu = rendu if rendu is not None else RenduPygame()
         self.clock = pygame.time.Clock()
-        self.surface = pygame.display.set_mode(TAILLE_FENETRE)
-        self.fonts = {
-            "defaut": pygame.font.Font("freesansbold.ttf", 18),
-            "titre": pygame.font.Font("freesansbold.ttf", 100),
-        }
-        pygame.display.set_caption("Application Tetris")
+        grand = largeur > DIM_PLATEAU[0] or hauteur > DIM_PLATEAU[1]
+        self.moteur = Moteur(PlateauCreux if grand else PlateauBits, largeur=largeur,
+                             hauteur=hauteur)
+        # Colonne et ligne du plateau affichées en haut à gauche
+        self.vue = [0, 0]
+        # Touches du joueur en attente, répétition des touches tenues et latence
+        self.entrees = Entrees(TOUCHES)
+        self._retard, self._dernier_pas = 0, time.monotonic()
+        self.enregistrement, self.fichier_enregistrement = None, None
+        self.fps = IMAGES_PAR_SECONDE
+        # Source d'actions automatique (par exemple ia.IA), None pour le clavier seul
+        self.joueur = None
+        # Profileur des phases de chaque image (profilage.Profileur), None si inactif
+        self.profileur, self.fichier_trace = None, None
+        self._afficher_profil = False
+        self._invalider()
 
     def start(self):
         """
@@ -72,8 +111,8 @@ class Jeu:
         Returns:
             Aucune valeur de retour.
         """
-        self._afficher_texte("Tetris", CENTRE_FENETRE, font="titre")
-        self._afficher_texte("Appuyer sur une touche...", POS)
+        self._invalider()
+        self.rendu.message("Tetris", "Appuyer sur une touche...", effacer=False)
         self._attente()
 
     def stop(self):
@@ -93,424 +132,357 @@ class Jeu:
             Aucune valeur de retour.
         """
         #Méthode permettant de stoper le jeu une fois perdu
-        self._afficher_texte("Perdu", CENTRE_FENETRE, font="titre")
+        self._invalider()
+        # Le message recouvre le plateau de la partie perdue
+        self.rendu.message("Perdu", effacer=False)
         self._attente()
         self._quitter()
 
-    def _afficher_texte(self, text: str, position:tuple, couleur: int =9, font: str ="defaut"):
+    def _get_event(self):
         """
-        Affiche du texte à l'écran.
+        Gère les événements lus par le rendu,
+        y compris la fermeture de la fenêtre et les touches du clavier.
 
-        Cette méthode affiche du texte à l'emplacement spécifié sur la surface du jeu. Vous pouvez
-        personnaliser la couleur du texte et la police utilisée.
+        Cette méthode vide la file des événements du rendu et les traite tous :
+        aucun n'est perdu, même si plusieurs touches arrivent dans la même
+        image. Les touches des actions du moteur (pressées et relâchées) sont
+        transmises à entrees, les autres touches pressées sont renvoyées.
+        Elle prend également en charge la fermeture de la fenêtre du jeu.
 
-        Args:
-            text (str): Le texte à afficher.
-            position (tuple): Les coordonnées (x, y) de l'emplacement où afficher le texte.
-            couleur (int): La couleur du texte (indice de couleur). 
-                Par défaut, la couleur est 9.
-            font (str): Le nom de la police à utiliser pour le texte. 
-                Par défaut, la police 'defaut' est utilisée.
         Returns:
-            Aucune valeur de retour.
+            list: Les constantes Pygame des autres touches pressées, dans l'ordre.
         """
-        #		print("Afficher Texte")
-        font = self.fonts.get(font, self.fonts["defaut"])
-        couleur = COULEURS.get(couleur, COULEURS[9])
-        rendu = font.render(text, True, couleur)
-        rect = rendu.get_rect()
-        rect.center = position
-        self.surface.blit(rendu, rect)
+        touches = []
+        for event in self.rendu.evenements():
+            touche = self._traiter_event(event)
+            if not self.entrees.traiter(event) and touche is not None:
+                touches.append(touche)
+        return touches
 
-    def _get_event(self):
+    def _traiter_event(self, event):
         """
-        Gère les événements Pygame, 
-        y compris la fermeture de la fenêtre et les touches du clavier.
+        Traite un événement Pygame.
 
-        Cette méthode parcourt les événements Pygame et 
-        renvoie la touche du clavier appuyée lorsqu'elle est détectée.
-        Elle prend également en charge la fermeture de la fenêtre du jeu.
+        Ferme le jeu sur QUIT ou sur Échap, et renvoie la touche pressée
+        pour un événement KEYDOWN. Après un changement de taille de la
+        fenêtre (déjà appliqué par le rendu), tout sera redessiné.
+
+        Args:
+            event (pygame.event.Event): L'événement à traiter.
 
         Returns:
-            int or None: La constante Pygame représentant la touche du clavier appuyée, 
-                        ou None si aucune touche n'a été pressée.
+            int or None: La touche pressée, ou None pour les autres événements.
         """
-        # Cette méthode gère les événements Pygame,
-        # notamment la fermeture de la fenêtre et les touches du clavier.
-        for event in pygame.event.get():
-            if event.type == QUIT:
-                self._quitter()
-            if event.type == KEYUP:
+        if event.type == QUIT:
+            self._quitter()
+        if event.type == VIDEORESIZE:
+            self._invalider()
+        if event.type == KEYUP:
 
-                if event.key == K_ESCAPE:
-                    self._quitter()
-            if event.type == KEYDOWN:
+            if event.key == K_ESCAPE:
+                self._quitter()
+        if event.type == KEYDOWN:
 
-                if event.key == K_ESCAPE:
-                    continue
+            if event.key != K_ESCAPE:
                 return event.key
+        return None
 
     def _quitter(self):
         """
         Ferme la fenêtre du jeu et quitte le programme.
 
-        Cette méthode ferme proprement la fenêtre du jeu en utilisant Pygame,
+        Cette méthode ferme proprement le rendu (fenêtre Pygame ou terminal),
         ce qui arrête le jeu et quitte le programme.
 
         Returns:
             Aucune valeur de retour.
         """
         #Fonction permettant de fermer la page du jeu
-        print("Quitter")
-        pygame.quit()
+        journal.info("Quitter")
+        self._sauver_enregistrement()
+        self._ecrire_trace()
+        journal.info("Entrées : %s", self.entrees.resume())
+        self.rendu.fermer()
         sys.exit()
 
     def _rendre(self):
         """
         Met à jour l'affichage du jeu.
 
-        Cette méthode met à jour l'affichage en utilisant Pygame et 
-        contrôle la vitesse de rafraîchissement du jeu en utilisant la clock.
+        Cette méthode envoie l'image dessinée à l'écran par le rendu et
+        contrôle la vitesse de rafraîchissement du jeu en utilisant la clock,
+        qui dort si besoin pour ne pas dépasser fps images par seconde.
+        Le rendu n'envoie que ce qui a été modifié depuis la dernière mise à
+        jour, ou tout l'écran après un appel à _invalider.
+        La latence des actions affichées par cette image est alors mesurée.
 
         Returns:
             Aucune valeur de retour.
         """
-        pygame.display.update()
-        self.clock.tick()
+        if self.profileur is not None:
+            self.profileur.marquer("dessin")
+        self.rendu.presenter()
+        self.entrees.affichee()
+        if self.profileur is not None:
+            self.profileur.marquer("affichage")
+        if self.rendu.affiche:
+            # Sans affichage, rien ne limite le nombre d'images par seconde
+            self.clock.tick(self.fps)
+        if self.profileur is not None:
+            self.profileur.marquer("attente")
 
     def _attente(self):
         """
         Attend un événement (comme une touche pressée) pour continuer.
 
         Cette méthode met le jeu en attente jusqu'à ce qu'un événement se produise, 
-        généralement une touche du clavier pressée.
+        généralement une touche du clavier pressée. L'écran n'est mis à jour
+        qu'une fois, puis le programme dort dans l'attente du rendu au lieu de
+        boucler : il ne consomme presque plus de processeur pendant l'attente.
+        Un rendu qui ne lit aucune touche (rendu.Rendu) n'attend pas.
 
         Returns:
             Aucune valeur de retour.
         """
-        print("Attente")
-        while self._get_event() is None:
-            self._rendre()
-
-
-    def _get_piece(self):
-        """
-        Retourne une pièce Tetris aléatoire parmi les pièces disponibles.
-
-        Cette méthode sélectionne aléatoirement une pièce Tetris parmi 
-        les pièces disponibles et la renvoie.
-
-        Returns:
-            dict: Un dictionnaire représentant une pièce Tetris 
-                avec sa structure et sa couleur.
-        """
-        # Cette méthode retourne une pièce Tetris aléatoire parmi les pièces disponibles.
-        return PIECES.get(random.choice(PIECES_KEYS))
-
-    def _get_current_piece_color(self):
-        """
-        Retourne la couleur de la pièce Tetris actuelle.
-
-        Cette méthode parcourt la matrice de la pièce Tetris actuelle et 
-        renvoie la couleur de la première case
-        non vide trouvée. La couleur est représentée par un entier.
+        journal.debug("Attente")
+        self._rendre()
+        while True:
+            event = self.rendu.attendre(DELAI_ATTENTE)
+            if event is None or self._traiter_event(event) is not None:
+                break
+        self.clock.tick()
+        # Le temps passé à attendre ne doit pas être rattrapé par la simulation
+        self._dernier_pas = time.monotonic()
+        if self.profileur is not None:
+            # L'attente ne compte pas dans la durée de l'image
+            self.profileur.debut_image()
 
-        Returns:
-            int: L'indice de couleur de la pièce Tetris actuelle, 
-                ou 0 si la pièce est vide.
-        """
-        # Cette méthode retourne la couleur de la pièce Tetris actuelle.
-        for ligne in self.current[0]:
-            for case in ligne:
-                if case != 0:
-                    return case
-        return 0
 
-    def _calculer_donnees_piece_courante(self):
+    def _gerer_evenements(self):
         """
-        Calcule les coordonnées de la pièce Tetris actuelle 
-        en fonction de sa position et de son orientation.
+        Gère les événements du jeu tels que les mouvements de la pièce et la pause.
 
-        Cette méthode calcule les coordonnées de toutes les cases occupées 
-        par la pièce Tetris actuelle en fonction
-        de sa position (x, y) et de son orientation (rotation). 
-        Ces coordonnées sont stockées dans l'attribut coordonnees.
+        Les touches du clavier sont traduites en actions du moteur
+        (déplacement, rotation, chute) par entrees, qui les garde en attente
+        jusqu'aux prochains pas de simulation ; cette méthode gère la mise en
+        pause du jeu et l'affichage du profileur.
 
         Returns:
             Aucune valeur de retour.
         """
-        # Cette méthode calcule les coordonnées de la pièce Tetris actuelle
-        # en fonction de sa position et de son orientation.
-        m = self.current[self.position[2]]
-        coords = []
-        for i, ligne in enumerate(m):
-            for ind, case in enumerate(ligne):
-                if case != 0:
-                    coords.append([i + self.position[0], ind + self.position[1]])
-        self.coordonnees = coords
+        # Cette méthode gère les événements du jeu, tels que les mouvements de la pièce et la pause.
+        for event in self._get_event():
+            if event == K_p:  #Appuie sur P pour mettre pause
+                journal.info("Pause")
+                self._invalider()
+                self.rendu.message("Pause", "Appuyer sur une touche...")
+                self._attente()
+                # Les touches ont pu être relâchées pendant la pause
+                self.entrees.vider()
+            if event == K_F3 and self.profileur is not None:
+                # F3 affiche ou cache les mesures du profileur
+                self._afficher_profil = not self._afficher_profil
+                self._invalider()
 
-    def _est_valide(self, x: int =0, y:int =0, rotation:int =0):
+    def _gerer_gravite(self):
         """
-        Vérifie si la position d'une pièce est valide sur le plateau.
+        Fait avancer la simulation au rythme du temps réel.
 
-        Cette méthode vérifie si la position d'une pièce Tetris est valide 
-        en prenant en compte ses coordonnées,sa rotation et les limites du plateau. 
-        Elle renvoie True si la position est valide, sinon False.
-
-        Args:
-            x (int, optional): Le décalage horizontal de la position. 
-                Par défaut, x = 0.
-            y (int, optional): Le décalage vertical de la position. 
-                Par défaut, y = 0.
-            rotation (int, optional): Le décalage de rotation de la pièce. Par défaut, 
-                rotation = 0.
+        Le moteur avance par pas fixes de 1 / TICKS_PAR_SECONDE seconde : on
+        exécute autant de pas que le temps écoulé (horloge monotone) le permet,
+        chaque pas consommant au plus une action en attente ou une répétition
+        d'une touche tenue. La gravité,
+        dont la vitesse dépend du niveau, est gérée par le moteur dans tick.
+        Avec un rendu qui n'affiche rien, la partie ne suit pas le temps réel :
+        chaque image exécute un pas.
 
         Returns:
-            bool: True si la position est valide, sinon False.
+            Aucune valeur de retour.
         """
-        # Cette méthode vérifie si la position d'une pièce est valide.
-        largeur_plateau, hauteur_plateau = DIM_PLATEAU
-
-        if rotation == 0:
-            coordonnees = self.coordonnees
+        if self.rendu.affiche:
+            maintenant = time.monotonic()
+            # Au-delà de RETARD_MAX, le retard est abandonné plutôt que rattrapé
+            self._retard = min(self._retard + maintenant - self._dernier_pas, RETARD_MAX)
+            self._dernier_pas = maintenant
         else:
-            couche_rotation = self.current[(self.position[2] + rotation) % len(self.current)]
-            coords = []
-
-            for i, ligne in enumerate(couche_rotation):
-                for ind, cellule in enumerate(ligne):
-                    if cellule != 0:
-                        coords.append([i + self.position[0], ind + self.position[1]])
-
-            coordonnees = coords
-
-        for cx, cy in coordonnees:
-            if not 0 <= x + cx < largeur_plateau:
-                # La pièce dépasse les limites horizontales du plateau.
-                return False
-            elif cy < 0:
-                # La pièce dépasse les limites verticales supérieures du plateau.
-                continue
-            elif y + cy >= hauteur_plateau:
-                # La pièce dépasse les limites verticales inférieures du plateau.
-                return False
-            else:
-                if self.plateau[cy + y][cx + x] != 0:
-                    # La position est déjà occupée sur le plateau.
-                    return False
-        # Si toutes les vérifications ont réussi, la position est valide.
-        return True
-
+            self._retard = 1 / TICKS_PAR_SECONDE
+        while self._retard >= 1 / TICKS_PAR_SECONDE and not self.moteur.perdu:
+            self._retard -= 1 / TICKS_PAR_SECONDE
+            action = self.entrees.action()
+            if action is None:
+                action = RIEN if self.joueur is None else self.joueur.action(self.moteur)
+            if self.enregistrement is not None:
+                self.enregistrement.ajouter(self.moteur.ticks, action)
+            self.moteur.tick(action)
 
-    def _poser_piece(self):
-        """
-        Place la pièce Tetris actuelle sur le plateau lorsque la chute est terminée.
-
-        Cette méthode est appelée lorsque la pièce atteint la fin de sa chute et 
-        doit être placée sur le plateau.
-        Elle met à jour le plateau en ajoutant la pièce aux bonnes coordonnées et 
-        calcule les lignes complétées,
-        met à jour le score, le niveau, etc.
-
-        Returns:
-            Aucune valeur de retour.
+    def _sauver_enregistrement(self):
         """
-        # Cette méthode est appelée lorsque la pièce atteint la fin de sa chute et
-        # doit être placée sur le plateau.
-        print("La pièce est posée")
-        if self.position[1] <= 0:
-            self.perdu = True
-        # Ajout de la pièce parmi le plateau
-        couleur = self._get_current_piece_color()
-        for cx, cy in self.coordonnees:
-            self.plateau[cy][cx] = couleur
-        completees = []
-        # calculer les lignes complétées
-        for i, line in enumerate(self.plateau[::-1]):
-            for case in line:
-                if case == 0:
-                    break
-            else:
-                print(self.plateau)
-                print(f">>> {(DIM_PLATEAU[1] - 1 - i)}" )
-                completees.append(DIM_PLATEAU[1] - 1 - i)
-        lignes = len(completees)
-        for i in completees:
-            self.plateau.pop(i)
-        for i in range(lignes):
-            self.plateau.insert(0, [0] * DIM_PLATEAU[0])
-        # calculer le score et autre
-        self.lignes += lignes
-        self.score += lignes * self.niveau
-        self.niveau = int(self.lignes / 10) + 1
-        if lignes >= 4:
-            self.tetris += 1
-            self.score += self.niveau * self.tetris
-        # Travail avec la pièce courante terminé
-        self.current = None
-
-    def _first(self):
-        """
-        Initialise le jeu en créant un plateau vide et en définissant les statistiques à zéro.
-
-        Cette méthode initialise le jeu en créant un plateau de jeu vide, 
-        en mettant à zéro les statistiques telles que le score, 
-        le nombre de pièces, les lignes complétées, le nombre de Tétris, et le niveau.
-        Elle prépare également la première pièce du jeu (current) et la pièce suivante (next).
+        Écrit l'enregistrement de la partie en cours, s'il y en a un.
 
         Returns:
             Aucune valeur de retour.
         """
+        if self.enregistrement is not None and self.fichier_enregistrement:
+            self.enregistrement.sauver(self.fichier_enregistrement)
+            journal.info("Partie enregistrée dans %s", self.fichier_enregistrement)
 
-        # Cette méthode initialise le jeu en créant un plateau vide et
-        # en définissant les statistiques à zéro.
-        self.plateau = [[0] * DIM_PLATEAU[0] for i in range(DIM_PLATEAU[1])]
-        self.score, self.pieces, self.lignes, self.tetris, self.niveau = 0, 0, 0, 0, 1
-        self.current, self.next, self.perdu = None, self._get_piece(), False
-
-    def _next(self):
+    def _invalider(self):
         """
-        Prépare la pièce Tetris suivante pour le jeu.
+        Force le prochain affichage à tout redessiner.
 
-        Cette méthode prépare la pièce Tetris suivante en la remplaçant par la 
-        pièce actuelle (current) et en générant une nouvelle pièce pour la pièce suivante (next). 
-        Elle met également à jour le nombre de pièces jouées (pieces),
-        réinitialise la position de la pièce actuelle et les données de la pièce, 
-        et enregistre le moment de la dernièreaction (mouvement ou chute) de la pièce.
+        À appeler quand l'écran a été modifié en dehors de _dessiner_plateau
+        (écran de démarrage, pause, fin de partie) : la prochaine image repart
+        d'un écran vide et le rendu met à jour tout l'écran.
 
         Returns:
             Aucune valeur de retour.
         """
-        #Prochaine Pièce
-        print("Piece suivante")
-        self.current, self.next = self.next, self._get_piece()
-        self.pieces += 1
-        self.position = [int(DIM_PLATEAU[0] / 2) - 2, -4, 0]
-        self._calculer_donnees_piece_courante()
-        self.dernier_mouvement = self.derniere_chute = time.time()
+        self._cases_affichees, self._version_affichee = None, None
+        self._cases_haut = set()
+        self._stats_affichees = (None,) * len(POSITIONS_STATS)
+        self._profil_affiche = False
+        self.rendu.invalider()
 
-    def _gerer_evenements(self):
+    def _dessiner_profil(self):
         """
-        Gère les événements du jeu tels que les mouvements de la pièce et la pause.
+        Affiche les images par seconde et la durée d'une image (médiane et
+        99e centile) mesurées par le profileur, à gauche du plateau.
 
-        Cette méthode gère les événements du jeu, notamment les touches du clavier, 
-        en effectuant différentes actions
-        en réponse aux touches pressées par le joueur. Par exemple, elle permet de 
-        déplacer la pièce vers la gauche, la droite,
-        de la faire tourner, de la faire descendre rapidement, de mettre le jeu en pause, etc.
+        Les mesures ne sont redessinées que toutes les PERIODE_PROFIL images,
+        ou après un appel à _invalider.
 
         Returns:
             Aucune valeur de retour.
         """
-        # Cette méthode gère les événements du jeu, tels que les mouvements de la pièce et la pause.
-        event = self._get_event()
-        if event == K_p:  #Appuie sur P pour mettre pause
-            print("Pause")
-            self.surface.fill(COULEURS.get(0))
-            self._afficher_texte("Pause", CENTRE_FENETRE, font="titre")
-            self._afficher_texte("Appuyer sur une touche...", POS)
-            self._attente()
-        elif event == K_LEFT:  #Appuie sur flèche de gauche pour deplacer vers la gauche
-            print("Mouvement vers la gauche")
-            if self._est_valide(x=-1):
-                self.position[0] -= 1
-        elif event == K_RIGHT:  #Appuie sur flèche de droite pour deplacer vers la droite
-            print("Mouvement vers la droite")
-            if self._est_valide(x=1):
-                self.position[0] += 1
-        elif event == K_DOWN:  #Appuie sur flèche du bas pour deplacer vers le bas
-            print("Mouvement vers le bas")
-            if self._est_valide(y=1):
-                self.position[1] += 1
-        elif event == K_UP:  #Appuie sur flèche du haut pour tourner la pièce
-            print("Mouvement de rotation")
-            if self._est_valide(rotation=1):
-                self.position[2] = (self.position[2] + 1) % len(self.current)
-        elif event == K_SPACE:  #Appuie sur espace pour faire descendre la pièce
-            print("Mouvement de chute {self.position} / {self.coordonnees}" )
-            if self.position[1] <= 0:
-                self.position[1] = 1
-                self._calculer_donnees_piece_courante()
-            a = 0
-            while self._est_valide(y=a):
-                a += 1
-            self.position[1] += a - 1
-        self._calculer_donnees_piece_courante()
+        profileur = self.profileur
+        if self._profil_affiche and profileur.images % PERIODE_PROFIL:
+            return
+        p50, p99 = profileur.centiles(centiles=(50, 99))
+        self.rendu.profil((f"FPS: {profileur.fps():.1f}",
+                           f"Image: {p50:.1f} / {p99:.1f} ms"))
+        self._profil_affiche = True
 
-    def _gerer_gravite(self):
+    def _ecrire_trace(self):
         """
-        Gère la gravité du jeu en faisant descendre la pièce Tetris actuelle automatiquement.
-
-        Cette méthode gère la gravité du jeu en faisant automatiquement 
-        descendre la pièce Tetris actuelle à intervalles
-        réguliers. Elle vérifie si la pièce peut continuer de descendre, 
-        et si elle atteint le bas ou une position invalide,
-        elle la pose sur le plateau. La méthode met également à jour
-        les données de jeu en conséquence.
+        Écrit la trace du profileur dans le fichier choisi, s'il y en a un.
 
         Returns:
             Aucune valeur de retour.
         """
-        if time.time() - self.derniere_chute > 0.35:
-            self.derniere_chute = time.time()
-            if not self._est_valide():
-                print("On est dans une position invalide")
-                self.position[1] -= 1
-                self._calculer_donnees_piece_courante()
-                self._poser_piece()
-            elif self._est_valide() and not self._est_valide(y=1):
-                self._calculer_donnees_piece_courante()
-                self._poser_piece()
-            else:
-                print("On déplace vers le bas")
-                self.position[1] += 1
-                self._calculer_donnees_piece_courante()
+        if self.profileur is None:
+            return
+        journal.info("Profil des images :\n%s", self.profileur.resume())
+        if self.fichier_trace:
+            self.profileur.ecrire_trace(self.fichier_trace)
+            journal.info("Trace des images écrite dans %s", self.fichier_trace)
+            self.fichier_trace = None
 
     def _dessiner_plateau(self):
         """
         Dessine le plateau de jeu et les éléments du jeu à l'écran.
 
-        Cette méthode dessine le plateau de jeu, les pièces Tetris actuelles et
-        précédentes, ainsi que les statistiques
-        du jeu telles que le score, le nombre de pièces, les lignes complétées,
-        les Tétris et le niveau. Elle met à jour
-        l'affichage à l'écran pour refléter l'état actuel du jeu.
+        L'affichage est incrémental : l'écran garde l'image précédente, seules
+        les cases dont la couleur a changé depuis la dernière image (pièce
+        déplacée, pièce posée, lignes retirées) sont redessinées, et les
+        statistiques ne le sont que lorsque l'une d'elles change. Le rendu
+        n'envoie ensuite à l'écran que ces changements, dans _rendre. Avec un
+        rendu qui n'affiche rien (rendu.Rendu), rien n'est comparé ni dessiné.
 
         Returns:
             Aucune valeur de retour.
         """
-        self.surface.fill(COULEURS.get(0))
-        pygame.draw.rect(self.surface, COULEURS[8],
-                         START_PLABORD + TAILLE_PLABORD, BORDURE_PLATEAU)
-        for i, ligne in enumerate(self.plateau):
-            for ind, case in enumerate(ligne):
-                couleur = COULEURS[case]
-                position = ind, i
-                coordonnees = tuple([
-                    START_PLATEAU[k] + position[k] * TAILLE_BLOC[k]
-                    for k in range(2)
-                ])
-                pygame.draw.rect(self.surface, couleur,
-                                 coordonnees + TAILLE_BLOC)
-        if self.current is not None:
-            for position in self.coordonnees:
-                couleur = COULEURS.get(self._get_current_piece_color())
-                coordonnees  = tuple([
-                    START_PLATEAU[k] + position[k] * TAILLE_BLOC[k]
-                    for k in range(2)
-                ])
-                pygame.draw.rect(self.surface, couleur,coordonnees + TAILLE_BLOC)
-        self._afficher_texte(f"Score: >{self.score}", POSITION_SCORE)
-        self._afficher_texte(f"Pièces: {self.pieces}", POSITION_PIECES)
-        self._afficher_texte(f"Lignes: {self.lignes}", POSITION_LIGNES)
-        self._afficher_texte(f"Tetris: {self.tetris}", POSITION_TETRIS)
-        self._afficher_texte(f"Niveau: {self.niveau}", POSITION_NIVEAU)
-
+        moteur, rendu = self.moteur, self.rendu
+        if moteur.version == self._version_affichee or not rendu.affiche:
+            # Mode veille : rien n'a changé depuis la dernière image
+            if self._afficher_profil:
+                self._dessiner_profil()
+            self._rendre()
+            return
+        self._suivre_piece()
+        self._version_affichee = moteur.version
+        plateau, (vx, vy) = moteur.plateau, self.vue
+        largeur = min(plateau.largeur, DIM_PLATEAU[0])
+        hauteur = min(plateau.hauteur, DIM_PLATEAU[1])
+        if self._cases_affichees is None:
+            rendu.cadre(largeur, hauteur)
+            self._cases_affichees = [[None] * largeur for i in range(hauteur)]
+
+        # Cases visibles de la pièce courante, par ligne de la vue, et celles
+        # au-dessus du plateau ; les coordonnées sont relatives à la vue
+        piece, haut, couleur = {}, set(), 0
+        if moteur.current is not None:
+            couleur = moteur._get_current_piece_color()
+            for cx, cy in moteur.coordonnees:
+                cx, cy = cx - vx, cy - vy
+                if not 0 <= cx < largeur:
+                    continue
+                if cy < 0:
+                    if vy == 0:
+                        haut.add((cx, cy))
+                elif cy < hauteur:
+                    piece.setdefault(cy, []).append(cx)
+        for cx, cy in self._cases_haut - haut:
+            rendu.case(cx, cy, 0)
+        for cx, cy in haut - self._cases_haut:
+            rendu.case(cx, cy, couleur)
+        self._cases_haut = haut
+
+        # Seules les cases visibles sont lues : le coût d'une image ne dépend
+        # pas de la taille du plateau
+        for i, ligne in enumerate(plateau.fenetre(vx, vy, largeur, hauteur)):
+            if i in piece:
+                ligne = ligne[:]
+                for cx in piece[i]:
+                    ligne[cx] = couleur
+            affichee = self._cases_affichees[i]
+            if ligne != affichee:
+                for ind, case in enumerate(ligne):
+                    if case != affichee[ind]:
+                        rendu.case(ind, i, case)
+                self._cases_affichees[i] = ligne[:]
+
+        stats = (f"Score: >{moteur.score}", f"Pièces: {moteur.pieces}",
+                 f"Lignes: {moteur.lignes}", f"Tetris: {moteur.tetris}",
+                 f"Niveau: {moteur.niveau}")
+        for k, texte in enumerate(stats):
+            if texte != self._stats_affichees[k]:
+                # Seul le compteur qui a changé est effacé puis réaffiché
+                rendu.statistique(k, texte)
+        self._stats_affichees = stats
+
+        if self._afficher_profil:
+            self._dessiner_profil()
+        self._rendre()
 
+    def _suivre_piece(self):
+        """
+        Fait défiler la vue d'un grand plateau pour garder la pièce courante visible.
 
-        self._rendre()
+        La vue est recentrée sur la pièce lorsque celle-ci arrive à moins de
+        MARGE_VUE cases d'un bord de la vue, sans sortir du plateau. Tout
+        l'écran est alors redessiné, ce qui ne coûte que les cases visibles.
 
-    def play(self):
+        Returns:
+            Aucune valeur de retour.
+        """
+        moteur = self.moteur
+        plateau = moteur.plateau
+        if moteur.current is None or (plateau.largeur <= DIM_PLATEAU[0]
+                                      and plateau.hauteur <= DIM_PLATEAU[1]):
+            return
+        vue = list(self.vue)
+        for axe, total in enumerate((plateau.largeur, plateau.hauteur)):
+            # La pièce occupe une matrice de 4 x 4 cases à partir de sa position
+            debut, taille = moteur.position[axe], DIM_PLATEAU[axe]
+            if not vue[axe] + MARGE_VUE <= debut <= vue[axe] + taille - MARGE_VUE - 4:
+                vue[axe] = debut + 2 - taille // 2
+            vue[axe] = max(0, min(vue[axe], total - taille))
+        if vue != self.vue:
+            self.vue = vue
+            self._invalider()
+
+    def play(self, fps: int =IMAGES_PAR_SECONDE, graine: int =None,
+             enregistrer: str =None, joueur=None, profileur=None, trace: str =None):
         """
         Gère le déroulement du jeu Tetris.
 
@@ -520,25 +492,124 @@ class Jeu:
         Le jeu continue jusqu'à ce que le joueur
         ait perdu, moment où la méthode affiche un écran de fin de jeu.
 
+        Args:
+            fps (int, optional): Le nombre maximal d'images par seconde.
+                Par défaut, IMAGES_PAR_SECONDE.
+            graine (int, optional): La graine du tirage des pièces.
+                Par défaut, une graine aléatoire.
+            enregistrer (str, optional): Le fichier où enregistrer la partie
+                pour la rejouer avec enregistrement.py. Par défaut, aucun.
+            joueur (optional): Un joueur automatique, dont la méthode
+                action(moteur) donne l'action de chaque pas lorsqu'aucune
+                touche n'est en attente. Par défaut, aucun.
+            profileur (Profileur, optional): Chronomètre les phases de chaque
+                image ; F3 affiche alors ses mesures. Par défaut, aucun.
+            trace (str, optional): Le fichier (.csv ou .json de Chrome) où
+                écrire la trace du profileur à la fin. Par défaut, aucun.
+
         Returns:
             Aucune valeur de retour.
         """
-        print("Jouer")
-        self.surface.fill(COULEURS.get(0))
-        self._first()
-        while not self.perdu:
-            if self.current is None:
-                self._next()
+        journal.info("Jouer")
+        self.fps = fps
+        self._invalider()
+        self.moteur.reset(graine)
+        self.entrees.vider()
+        self._retard, self._dernier_pas = 0, time.monotonic()
+        self.fichier_enregistrement = enregistrer
+        self.joueur = joueur
+        self.profileur, self.fichier_trace = profileur, trace
+        if enregistrer:
+            plateau = self.moteur.plateau
+            self.enregistrement = Enregistrement(self.moteur.graine, plateau.largeur,
+                                                 plateau.hauteur)
+        while not self.moteur.perdu:
+            if profileur is None:
+                self._gerer_evenements()
+                self._gerer_gravite()
+                self._dessiner_plateau()
+                continue
+            profileur.debut_image()
             self._gerer_evenements()
+            profileur.marquer("evenements")
             self._gerer_gravite()
+            profileur.marquer("gravite")
             self._dessiner_plateau()
+            profileur.fin_image()
+        self._sauver_enregistrement()
+        self._ecrire_trace()
+        self.enregistrement = None
 
-if __name__ == "__main__":
-    j = Jeu()
-    print("Jeu prêt")
+def main():
+    """
+    Lit les options de la ligne de commande, puis lance le jeu.
+
+    Returns:
+        Aucune valeur de retour.
+    """
+    parser = argparse.ArgumentParser(description="Un Tetris avec Pygame.")
+    parser.add_argument("--fps", type=int, default=IMAGES_PAR_SECONDE,
+                        help="nombre maximal d'images par seconde")
+    parser.add_argument("--graine", type=int, default=None,
+                        help="graine du tirage des pièces, pour rejouer la même partie")
+    parser.add_argument("--enregistrer", metavar="FICHIER", default=None,
+                        help="enregistre la partie pour la rejouer avec enregistrement.py")
+    parser.add_argument("--largeur", type=int, default=DIM_PLATEAU[0],
+                        help="nombre de colonnes du plateau (au moins 4)")
+    parser.add_argument("--hauteur", type=int, default=DIM_PLATEAU[1],
+                        help="nombre de lignes du plateau")
+    parser.add_argument("--das", type=int, default=DELAI_REPETITION,
+                        help="pas de simulation avant la répétition d'une touche tenue")
+    parser.add_argument("--arr", type=int, default=PERIODE_REPETITION,
+                        help="pas de simulation entre deux répétitions (au moins 1)")
+    parser.add_argument("--rendu", choices=sorted(RENDUS), default="pygame",
+                        help="affichage : fenêtre Pygame, terminal ANSI, ou aucun")
+    parser.add_argument("--redimensionnable", action="store_true",
+                        help="fenêtre Pygame redimensionnable, le jeu suit sa taille")
+    parser.add_argument("--ia", action="store_true",
+                        help="laisse le joueur automatique (ia.py) jouer la partie")
+    parser.add_argument("--profil", action="store_true",
+                        help="chronomètre chaque image (F3 affiche les mesures)")
+    parser.add_argument("--trace", metavar="FICHIER", default=None,
+                        help="écrit la trace des images à la fin (.csv, ou .json pour Chrome)")
+    parser.add_argument("--journal", metavar="NIVEAU", default="WARNING", type=str.upper,
+                        choices=journalisation.NIVEAUX,
+                        help="niveau du journal : " + ", ".join(journalisation.NIVEAUX)
+                        + " (par défaut, WARNING)")
+    parser.add_argument("--fichier-journal", metavar="FICHIER", default=None,
+                        help="écrit le journal dans ce fichier plutôt que sur la sortie d'erreur")
+    args = parser.parse_args()
+    if args.largeur < 4 or args.hauteur < 1:
+        parser.error("le plateau doit avoir au moins 4 colonnes et 1 ligne")
+    if args.das < 0 or args.arr < 1:
+        parser.error("--das doit être positif et --arr au moins 1")
+    if args.ia and (args.largeur, args.hauteur) != DIM_PLATEAU:
+        parser.error(f"--ia ne joue que sur le plateau par défaut "
+                     f"({DIM_PLATEAU[0]} x {DIM_PLATEAU[1]})")
+    if args.redimensionnable and args.rendu != "pygame":
+        parser.error("--redimensionnable ne s'applique qu'au rendu pygame")
+    journalisation.configurer(args.journal, args.fichier_journal)
+    if args.redimensionnable:
+        rendu = RenduPygame(redimensionnable=True)
+    else:
+        rendu = RENDUS[args.rendu]()
+    j = Jeu(args.largeur, args.hauteur, rendu)
+    j.entrees.delai, j.entrees.periode = args.das, args.arr
+    journal.info("Jeu prêt")
     j.start()
-    print("Partie démarée")
-    j.play()
-    print("Partie terminée")
+    journal.info("Partie démarée")
+    joueur = None
+    if args.ia:
+        # NumPy n'est chargé que pour le joueur automatique
+        from ia import IA
+        joueur = IA()
+    j.play(fps=args.fps, graine=args.graine, enregistrer=args.enregistrer, joueur=joueur,
+           profileur=Profileur(trace=bool(args.trace)) if args.profil or args.trace else None,
+           trace=args.trace)
+    journal.info("Partie terminée")
     j.stop()
-    print("Arrêt du programme")
+    journal.info("Arrêt du programme")
+
+
+if __name__ == "__main__":
+    main()
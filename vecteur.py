@@ -0,0 +1,288 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Environnement vectoriel : N parties de Tetris avancées ensemble avec NumPy.
+
+Les N plateaux tiennent dans un seul tableau (N, hauteur, largeur) d'octets,
+une couleur par case comme Plateau.couleurs, et l'état des pièces dans des
+tableaux de taille N. Un pas applique une action par partie puis la gravité,
+avec exactement les règles de Moteur.step : collisions, pose, lignes
+complétées, score, niveau et Tetris. Le tirage des pièces est le SplitMix64
+de moteur.Generateur : la partie i, avec la graine g, reçoit les mêmes
+pièces qu'un Moteur créé avec la graine g.
+
+Les observations sont des vues en lecture seule sur ces tableaux, sans copie.
+"""
+
+import numpy as np
+from constante import DIM_PLATEAU, FORMES, PIECES_KEYS
+from moteur import RIEN, GAUCHE, DROITE, BAS, ROTATION, CHUTE
+
+# Cases de chaque pièce et de chaque rotation, de forme (pièces, 4, 4 cases, 2).
+# Les pièces qui ont moins de 4 rotations répètent leurs rotations.
+CASES = np.array([[FORMES[nom][r % len(FORMES[nom])].cases for r in range(4)]
+                  for nom in PIECES_KEYS], dtype=np.int32)
+ROTATIONS = np.array([len(FORMES[nom]) for nom in PIECES_KEYS], dtype=np.int32)
+COULEURS_PIECES = np.array([FORMES[nom][0].couleur for nom in PIECES_KEYS], dtype=np.uint8)
+
+# Déplacement (x, y, rotation) tenté par chaque action
+DEPLACEMENTS = np.zeros((6, 3), dtype=np.int32)
+DEPLACEMENTS[GAUCHE] = -1, 0, 0
+DEPLACEMENTS[DROITE] = 1, 0, 0
+DEPLACEMENTS[BAS] = 0, 1, 0
+DEPLACEMENTS[ROTATION] = 0, 0, 1
+
+# Constantes de SplitMix64, comme dans moteur.Generateur
+_INCREMENT = np.uint64(0x9E3779B97F4A7C15)
+_MULTIPLICATEURS = np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB)
+
+
+class MoteurVectoriel:
+    """
+    Cette classe représente N parties avancées en même temps.
+
+    Les attributs par partie sont des tableaux de taille N : piece, suivante,
+    rotation, x, y (la pièce courante, -1 s'il faut la tirer), score, pieces,
+    lignes, tetris, niveau et perdu.
+    """
+
+    def __init__(self, nombre: int, graines=None, largeur: int =DIM_PLATEAU[0],
+                 hauteur: int =DIM_PLATEAU[1]):
+        """
+        Crée N parties prêtes à être jouées.
+
+        Args:
+            nombre (int): Le nombre de parties.
+            graines (array_like, optional): La graine de chaque partie.
+                Par défaut, 0, 1, ..., nombre - 1.
+            largeur (int, optional): Le nombre de colonnes. Par défaut, DIM_PLATEAU[0].
+            hauteur (int, optional): Le nombre de lignes. Par défaut, DIM_PLATEAU[1].
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.nombre, self.largeur, self.hauteur = nombre, largeur, hauteur
+        self.plateaux = np.zeros((nombre, hauteur, largeur), dtype=np.uint8)
+        self.etats = np.zeros(nombre, dtype=np.uint64)
+        self.piece, self.suivante = np.zeros((2, nombre), dtype=np.int32)
+        self.rotation, self.x, self.y = np.zeros((3, nombre), dtype=np.int32)
+        self.score, self.pieces, self.lignes, self.tetris, self.niveau = \
+            np.zeros((5, nombre), dtype=np.int32)
+        self.perdu = np.zeros(nombre, dtype=bool)
+        self._indices = np.arange(nombre)
+        self.reset(graines=np.arange(nombre) if graines is None else graines)
+
+    def reset(self, masque=None, graines=None):
+        """
+        Recommence des parties : plateau vide, compteurs à zéro, nouvelle graine.
+
+        Args:
+            masque (array_like, optional): Les parties à recommencer (booléens
+                ou indices). Par défaut, toutes.
+            graines (array_like, optional): Les graines des parties recommencées.
+                Par défaut, la graine suivante tirée par chacune d'elles.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        choisies = self._indices if masque is None else self._indices[masque]
+        if graines is None:
+            graines = self._tirer_entiers(choisies)
+        self.etats[choisies] = np.asarray(graines, dtype=np.uint64)
+        self.plateaux[choisies] = 0
+        for tableau in (self.score, self.pieces, self.lignes, self.tetris):
+            tableau[choisies] = 0
+        self.niveau[choisies] = 1
+        self.perdu[choisies] = False
+        self.piece[choisies] = -1
+        self.suivante[choisies] = self._tirer(choisies, len(PIECES_KEYS))
+
+    def _tirer_entiers(self, indices):
+        """
+        Avance le générateur des parties données et renvoie leur sortie sur 64 bits.
+
+        Args:
+            indices (numpy.ndarray): Les indices des parties.
+
+        Returns:
+            numpy.ndarray: Un entier de 64 bits par partie.
+        """
+        with np.errstate(over="ignore"):
+            etats = self.etats[indices] + _INCREMENT
+            self.etats[indices] = etats
+            z = (etats ^ (etats >> np.uint64(30))) * _MULTIPLICATEURS[0]
+            z = (z ^ (z >> np.uint64(27))) * _MULTIPLICATEURS[1]
+        return z ^ (z >> np.uint64(31))
+
+    def _tirer(self, indices, n: int):
+        """
+        Tire un entier entre 0 et n - 1 pour chaque partie, comme Generateur.suivant.
+
+        Le produit z * n, sur 128 bits, est calculé en deux moitiés de 32 bits.
+
+        Args:
+            indices (numpy.ndarray): Les indices des parties.
+            n (int): Le nombre de valeurs possibles, inférieur à 2 ** 31.
+
+        Returns:
+            numpy.ndarray: L'entier tiré pour chaque partie.
+        """
+        z = self._tirer_entiers(indices)
+        n = np.uint64(n)
+        trente_deux = np.uint64(32)
+        haut = (z >> trente_deux) * n
+        bas = (z & np.uint64(0xFFFFFFFF)) * n
+        return ((haut + (bas >> trente_deux)) >> trente_deux).astype(np.int32)
+
+    def _valides(self, indices, rotation, x, y):
+        """
+        Vérifie, pour chaque partie donnée, qu'une position de sa pièce est libre.
+
+        Les cases situées au-dessus du plateau sont considérées comme libres.
+
+        Args:
+            indices (numpy.ndarray): Les indices des parties.
+            rotation (numpy.ndarray): La rotation de la pièce de chaque partie.
+            x (numpy.ndarray): La position horizontale de chaque pièce.
+            y (numpy.ndarray): La position verticale de chaque pièce.
+
+        Returns:
+            numpy.ndarray: True pour chaque position valide.
+        """
+        cases = CASES[self.piece[indices], rotation]
+        cx = cases[:, :, 0] + x[:, None]
+        cy = cases[:, :, 1] + y[:, None]
+        dedans = (cx >= 0) & (cx < self.largeur) & (cy < self.hauteur)
+        occupees = self.plateaux[indices[:, None], np.clip(cy, 0, self.hauteur - 1),
+                                 np.clip(cx, 0, self.largeur - 1)] != 0
+        return (dedans & ~(occupees & (cy >= 0))).all(axis=1)
+
+    def _suivantes(self, indices):
+        """
+        Fait entrer la pièce suivante des parties données et en tire une nouvelle.
+
+        Args:
+            indices (numpy.ndarray): Les indices des parties.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.piece[indices] = self.suivante[indices]
+        self.suivante[indices] = self._tirer(indices, len(PIECES_KEYS))
+        self.pieces[indices] += 1
+        self.rotation[indices] = 0
+        self.x[indices] = self.largeur // 2 - 2
+        self.y[indices] = -4
+
+    def _chute(self, indices):
+        """
+        Fait tomber la pièce des parties données, comme l'action CHUTE du Moteur.
+
+        Args:
+            indices (numpy.ndarray): Les indices des parties.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        self.y[indices] = np.maximum(self.y[indices], 1)
+        valides = self._valides(indices, self.rotation[indices], self.x[indices], self.y[indices])
+        self.y[indices[~valides]] -= 1
+        tombent = indices[valides]
+        while len(tombent):
+            peuvent = self._valides(tombent, self.rotation[tombent], self.x[tombent],
+                                    self.y[tombent] + 1)
+            tombent = tombent[peuvent]
+            self.y[tombent] += 1
+
+    def _poser(self, indices):
+        """
+        Pose la pièce des parties données, retire les lignes complétées et
+        met à jour le score, le niveau et le nombre de Tetris.
+
+        Args:
+            indices (numpy.ndarray): Les indices des parties.
+
+        Returns:
+            numpy.ndarray: Le nombre de lignes complétées par partie.
+        """
+        self.perdu[indices] |= self.y[indices] <= 0
+        piece = self.piece[indices]
+        cases = CASES[piece, self.rotation[indices]]
+        cx = cases[:, :, 0] + self.x[indices, None]
+        cy = cases[:, :, 1] + self.y[indices, None]
+        posees = cy >= 0
+        lignes_posees = np.broadcast_to(indices[:, None], cx.shape)[posees]
+        self.plateaux[lignes_posees, cy[posees], cx[posees]] = \
+            np.broadcast_to(COULEURS_PIECES[piece][:, None], cx.shape)[posees]
+        completes = (self.plateaux[indices] != 0).all(axis=2)
+        lignes = completes.sum(axis=1).astype(np.int32)
+        avec = lignes > 0
+        if avec.any():
+            # Les lignes complètes passent en haut par un tri stable, puis sont vidées
+            touches = indices[avec]
+            ordre = np.argsort(~completes[avec], axis=1, kind="stable")
+            plateaux = np.take_along_axis(self.plateaux[touches], ordre[:, :, None], axis=1)
+            plateaux[np.arange(self.hauteur) < lignes[avec, None]] = 0
+            self.plateaux[touches] = plateaux
+        self.lignes[indices] += lignes
+        self.score[indices] += lignes * self.niveau[indices]
+        self.niveau[indices] = self.lignes[indices] // 10 + 1
+        tetris = indices[lignes >= 4]
+        self.tetris[tetris] += 1
+        self.score[tetris] += self.niveau[tetris] * self.tetris[tetris]
+        self.piece[indices] = -1
+        return lignes
+
+    def step(self, actions):
+        """
+        Avance chaque partie d'un pas : applique son action puis la gravité.
+
+        Les parties perdues ne bougent plus jusqu'à leur reset.
+
+        Args:
+            actions (array_like): L'action de chaque partie (constantes de moteur).
+
+        Returns:
+            numpy.ndarray: Le nombre de lignes complétées par chaque partie.
+        """
+        actions = np.asarray(actions)
+        resultat = np.zeros(self.nombre, dtype=np.int32)
+        actives = self._indices[~self.perdu]
+        actions = actions[actives]
+        entrantes = actives[self.piece[actives] < 0]
+        if len(entrantes):
+            self._suivantes(entrantes)
+        # Déplacements d'une case ou rotation, acceptés si la position est libre
+        bouge = (actions != RIEN) & (actions != CHUTE)
+        mobiles, deplacements = actives[bouge], DEPLACEMENTS[actions[bouge]]
+        rotations = (self.rotation[mobiles] + deplacements[:, 2]) % ROTATIONS[self.piece[mobiles]]
+        x, y = self.x[mobiles] + deplacements[:, 0], self.y[mobiles] + deplacements[:, 1]
+        libres = self._valides(mobiles, rotations, x, y)
+        mobiles = mobiles[libres]
+        self.rotation[mobiles], self.x[mobiles], self.y[mobiles] = \
+            rotations[libres], x[libres], y[libres]
+        chutes = actives[actions == CHUTE]
+        if len(chutes):
+            self._chute(chutes)
+        # Gravité : une ligne plus bas, ou la pose si la pièce ne peut plus descendre
+        rotation, x, y = self.rotation[actives], self.x[actives], self.y[actives]
+        valides = self._valides(actives, rotation, x, y)
+        self.y[actives[~valides]] -= 1
+        descendent = valides & self._valides(actives, rotation, x, y + 1)
+        self.y[actives[descendent]] += 1
+        posees = actives[~descendent]
+        if len(posees):
+            resultat[posees] = self._poser(posees)
+        return resultat
+
+    def observer(self):
+        """
+        Retourne les plateaux des parties, sans copie.
+
+        Returns:
+            numpy.ndarray: Une vue en lecture seule des plateaux, de forme
+                (N, hauteur, largeur), mise à jour à chaque pas.
+        """
+        vue = self.plateaux.view()
+        vue.flags.writeable = False
+        return vue
@@ -0,0 +1,365 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Hachage de Zobrist des positions et table de transposition.
+
+Une position (cases occupées du plateau, pièce courante, rotation et
+position) est résumée par une clé de 64 bits : comparer deux positions ne
+demande plus de comparer toutes leurs cases. Seule la clé du plateau est
+tenue à jour, à chaque pièce posée et ligne retirée (Zobrist.poser) ; la
+clé de la pièce courante (Zobrist.piece) n'y est combinée qu'à la lecture
+de Moteur.cle. Les déplacements de la pièce, bien plus fréquents, ne
+coûtent ainsi aucun calcul de clé.
+
+Chaque colonne a une clé aléatoire, et une ligne est le OU exclusif des
+clés de ses cases occupées. La clé du plateau est le OU exclusif, pour
+chaque ligne non vide, d'un mélange de la clé de la ligne et d'une clé de
+son numéro. Poser une pièce ne change que ses lignes ; retirer des lignes
+complètes ne demande qu'un mélange par ligne déplacée, sans relire ses cases.
+
+La table de transposition garde des résultats (par exemple l'évaluation
+d'une position) par clé, avec un nombre d'entrées borné et des statistiques
+de réussite.
+"""
+
+import collections
+import random
+from constante import DIM_PLATEAU, GRAINE_ZOBRIST, PIECES_KEYS, TAILLE_TABLE_TRANSPOSITION
+from plateau import MARGE, compacter
+
+MASQUE_64 = (1 << 64) - 1
+# Politiques de remplacement de TableTransposition
+POLITIQUES = ("lru", "fifo", "remplacer")
+
+
+def melanger(valeur: int):
+    """
+    Mélange les bits d'un entier de 64 bits (finalisation de SplitMix64).
+
+    Le mélange est une bijection : deux valeurs différentes donnent deux
+    résultats différents, qui diffèrent en moyenne de la moitié de leurs bits.
+
+    Args:
+        valeur (int): L'entier à mélanger, entre 0 et 2**64 - 1.
+
+    Returns:
+        int: L'entier mélangé, entre 0 et 2**64 - 1.
+    """
+    valeur = (valeur ^ valeur >> 30) * 0xBF58476D1CE4E5B9 & MASQUE_64
+    valeur = (valeur ^ valeur >> 27) * 0x94D049BB133111EB & MASQUE_64
+    return valeur ^ valeur >> 31
+
+
+class Zobrist:
+    """
+    Cette classe tient à jour la clé de Zobrist d'un plateau.
+
+    Seule l'occupation des cases compte, pas leur couleur : deux plateaux de
+    mêmes cases occupées ont la même clé, quel que soit le type de plateau
+    du moteur.
+    """
+
+    def __init__(self, largeur: int =DIM_PLATEAU[0], hauteur: int =DIM_PLATEAU[1],
+                 graine: int =GRAINE_ZOBRIST):
+        """
+        Tire les clés aléatoires et part d'un plateau vide.
+
+        Args:
+            largeur (int, optional): Le nombre de colonnes. Par défaut, DIM_PLATEAU[0].
+            hauteur (int, optional): Le nombre de lignes. Par défaut, DIM_PLATEAU[1].
+            graine (int, optional): La graine des clés. Par défaut, GRAINE_ZOBRIST.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        tirage = random.Random(graine)
+        self.largeur, self.hauteur = largeur, hauteur
+        self.plein = (1 << largeur) - 1
+        self.colonnes = [tirage.getrandbits(64) for x in range(largeur)]
+        self.numeros = [tirage.getrandbits(64) for y in range(hauteur)]
+        # Clés de la pièce courante : par pièce et rotation, puis par position
+        # (décalée de MARGE, la matrice d'une pièce pouvant sortir du plateau)
+        self.pieces = [[tirage.getrandbits(64) for rotation in range(4)] for nom in PIECES_KEYS]
+        self.suivantes = [tirage.getrandbits(64) for nom in PIECES_KEYS]
+        self.abscisses = [tirage.getrandbits(64) for x in range(largeur + 2 * MARGE)]
+        self.ordonnees = [tirage.getrandbits(64) for y in range(hauteur + 2 * MARGE)]
+        self.vider()
+
+    def vider(self):
+        """
+        Revient à la clé du plateau vide (0).
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        # Par ligne : le masque des cases occupées, le OU exclusif de leurs
+        # clés et la part de la ligne dans la clé du plateau
+        self.occupees = [0] * self.hauteur
+        self.lignes = [0] * self.hauteur
+        self.termes = [0] * self.hauteur
+        # Toutes les lignes au-dessus de sommet sont vides
+        self.sommet = self.hauteur
+        self.valeur = 0
+
+    def _recalculer(self, rangees):
+        """
+        Recalcule la part de quelques lignes dans la clé du plateau.
+
+        Args:
+            rangees (iterable): Les numéros des lignes.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        lignes, numeros, termes = self.lignes, self.numeros, self.termes
+        valeur = self.valeur
+        for y in rangees:
+            ligne = lignes[y]
+            terme = melanger(ligne ^ numeros[y]) if ligne else 0
+            valeur ^= termes[y] ^ terme
+            termes[y] = terme
+        self.valeur = valeur
+
+    def poser(self, coordonnees):
+        """
+        Ajoute les cases d'une pièce posée, puis retire les lignes complétées,
+        comme le plateau du moteur.
+
+        Args:
+            coordonnees (list): Les coordonnées absolues (x, y) des cases de la pièce.
+
+        Returns:
+            int: La nouvelle clé du plateau.
+        """
+        occupees, lignes, colonnes = self.occupees, self.lignes, self.colonnes
+        touchees = []
+        for cx, cy in coordonnees:
+            if cy >= 0 and not occupees[cy] >> cx & 1:
+                occupees[cy] |= 1 << cx
+                lignes[cy] ^= colonnes[cx]
+                if cy not in touchees:
+                    touchees.append(cy)
+        if not touchees:
+            return self.valeur
+        self.sommet = min(self.sommet, *touchees)
+        plein = self.plein
+        completees = sorted(cy for cy in touchees if occupees[cy] == plein)
+        if not completees:
+            self._recalculer(touchees)
+            return self.valeur
+        # Les lignes complétées sont retirées ; celles du dessus descendent et
+        # changent de numéro, leur part est recalculée sans relire leurs cases
+        n, bas = len(completees), completees[-1]
+        for cy in completees:
+            self.valeur ^= self.termes[cy]
+        for rangees in (occupees, lignes, self.termes):
+            compacter(rangees, completees, [0] * n)
+        self.sommet = min(self.sommet + n, self.hauteur)
+        self._recalculer(range(self.sommet, bas + 1))
+        # Les lignes touchées sous la dernière ligne complétée ne bougent pas
+        self._recalculer(cy for cy in touchees if cy > bas)
+        return self.valeur
+
+    def charger(self, cases: bytes):
+        """
+        Recalcule la clé d'un plateau entier, à partir de la couleur de ses cases.
+
+        Args:
+            cases (bytes): Les couleurs, ligne par ligne (0 pour une case vide),
+                comme Etat.cases.
+
+        Returns:
+            int: La clé du plateau.
+        """
+        self.vider()
+        largeur, colonnes = self.largeur, self.colonnes
+        vide = bytes(largeur)
+        for y in range(self.hauteur):
+            rangee = cases[y * largeur:(y + 1) * largeur]
+            if rangee == vide:
+                continue
+            for x, couleur in enumerate(rangee):
+                if couleur:
+                    self.occupees[y] |= 1 << x
+                    self.lignes[y] ^= colonnes[x]
+            self.sommet = min(self.sommet, y)
+        self._recalculer(range(self.sommet, self.hauteur))
+        return self.valeur
+
+    def sauver(self):
+        """
+        Copie l'état de la clé, pour le remettre en place avec restaurer.
+
+        Returns:
+            tuple: Les masques, les clés et les parts des lignes, le sommet et la clé.
+        """
+        return (tuple(self.occupees), tuple(self.lignes), tuple(self.termes), self.sommet,
+                self.valeur)
+
+    def restaurer(self, donnees: tuple):
+        """
+        Remet en place un état pris par sauver.
+
+        Args:
+            donnees (tuple): L'état renvoyé par sauver.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        occupees, lignes, termes, self.sommet, self.valeur = donnees
+        self.occupees, self.lignes, self.termes = list(occupees), list(lignes), list(termes)
+
+    def piece(self, indice: int, x: int, y: int, rotation: int):
+        """
+        Retourne la clé d'une pièce à une position, à combiner avec celle du plateau.
+
+        Args:
+            indice (int): L'indice de la pièce dans PIECES_KEYS.
+            x (int): La position horizontale de la matrice de la pièce.
+            y (int): La position verticale (négative au-dessus du plateau).
+            rotation (int): Le numéro de la rotation.
+
+        Returns:
+            int: La clé de la pièce.
+        """
+        return (self.pieces[indice][rotation] ^ self.abscisses[x + MARGE]
+                ^ self.ordonnees[y + MARGE])
+
+
+class TableTransposition:
+    """
+    Cette classe garde des résultats par clé de position, en nombre borné.
+
+    Quand la table est pleine, la politique choisit l'entrée remplacée :
+    - 'lru' : la moins récemment lue ou rangée ;
+    - 'fifo' : la plus anciennement rangée ;
+    - 'remplacer' : chaque clé a une seule place possible (clé modulo la
+      capacité), et une nouvelle clé remplace l'entrée qui l'occupe, comme
+      les tables de transposition des programmes d'échecs.
+    """
+
+    def __init__(self, capacite: int =TAILLE_TABLE_TRANSPOSITION, politique: str ="lru"):
+        """
+        Crée une table vide.
+
+        Args:
+            capacite (int, optional): Le nombre maximal d'entrées ; 0 ne garde
+                rien. Par défaut, TAILLE_TABLE_TRANSPOSITION.
+            politique (str, optional): La politique de remplacement, parmi
+                POLITIQUES. Par défaut, 'lru'.
+
+        Returns:
+            Aucune valeur de retour.
+
+        Raises:
+            ValueError: Si la politique est inconnue ou la capacité négative.
+        """
+        if politique not in POLITIQUES:
+            raise ValueError(f"politique inconnue : {politique} (parmi {', '.join(POLITIQUES)})")
+        if capacite < 0:
+            raise ValueError("la capacité d'une table de transposition est positive")
+        self.capacite, self.politique = capacite, politique
+        self.vider()
+
+    def vider(self):
+        """
+        Retire toutes les entrées et remet les statistiques à zéro.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        if self.politique == "remplacer":
+            self._cases = [None] * self.capacite
+        else:
+            self._entrees = collections.OrderedDict()
+        self.nombre = 0
+        self.succes, self.echecs, self.evictions = 0, 0, 0
+
+    def __len__(self):
+        """
+        Retourne le nombre d'entrées de la table.
+
+        Returns:
+            int: Le nombre d'entrées.
+        """
+        return self.nombre
+
+    def chercher(self, cle: int, defaut=None):
+        """
+        Retourne le résultat rangé pour une clé.
+
+        Args:
+            cle (int): La clé de la position.
+            defaut (optional): La valeur renvoyée si la clé est absente.
+                Par défaut, None.
+
+        Returns:
+            Le résultat rangé, ou defaut.
+        """
+        if self.politique == "remplacer":
+            if self.capacite:
+                entree = self._cases[cle % self.capacite]
+                if entree is not None and entree[0] == cle:
+                    self.succes += 1
+                    return entree[1]
+        elif cle in self._entrees:
+            self.succes += 1
+            if self.politique == "lru":
+                self._entrees.move_to_end(cle)
+            return self._entrees[cle]
+        self.echecs += 1
+        return defaut
+
+    def ranger(self, cle: int, valeur):
+        """
+        Range le résultat d'une clé, en remplaçant une entrée si la table est pleine.
+
+        Args:
+            cle (int): La clé de la position.
+            valeur: Le résultat à garder.
+
+        Returns:
+            Aucune valeur de retour.
+        """
+        if not self.capacite:
+            return
+        if self.politique == "remplacer":
+            indice = cle % self.capacite
+            entree = self._cases[indice]
+            if entree is None:
+                self.nombre += 1
+            elif entree[0] != cle:
+                self.evictions += 1
+            self._cases[indice] = (cle, valeur)
+            return
+        entrees = self._entrees
+        if cle in entrees:
+            if self.politique == "lru":
+                entrees.move_to_end(cle)
+        elif self.nombre == self.capacite:
+            entrees.popitem(last=False)
+            self.evictions += 1
+        else:
+            self.nombre += 1
+        entrees[cle] = valeur
+
+    def taux(self):
+        """
+        Retourne la part des recherches qui ont trouvé leur clé.
+
+        Returns:
+            float: Le taux de réussite, entre 0 et 1 (0 sans recherche).
+        """
+        recherches = self.succes + self.echecs
+        return self.succes / recherches if recherches else 0.0
+
+    def resume(self):
+        """
+        Résume le remplissage et les statistiques de la table.
+
+        Returns:
+            str: Le résumé, sur une ligne.
+        """
+        return (f"{self.nombre} / {self.capacite} entrées ({self.politique}), "
+                f"{self.succes} trouvées, {self.echecs} absentes "
+                f"({100 * self.taux():.1f} %), {self.evictions} remplacées")